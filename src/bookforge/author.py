@@ -111,7 +111,7 @@ def generate_author(
         prompt_text = prompt_file.read_text(encoding='utf-8')
 
     config = load_config()
-    client = get_llm_client(config, phase="planner")
+    client = get_llm_client(config, phase="planner", workspace=workspace)
     model = resolve_model('planner', config)
 
     prompt = _build_prompt(influences, prompt_text, name, notes)
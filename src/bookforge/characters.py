@@ -1,5 +1,6 @@
 from __future__ import annotations
 
+from dataclasses import dataclass
 from pathlib import Path
 from typing import Any, Dict, List, Optional
 import ast
@@ -8,7 +9,8 @@ import re
 import hashlib
 
 from bookforge.config.env import load_config, read_int_env
-from bookforge.pipeline.config import _appearance_max_tokens
+from bookforge.pipeline.config import _appearance_concurrency, _appearance_max_tokens
+from bookforge.llm.aio import ChatCall, chat_many
 from bookforge.llm.client import LLMClient
 from bookforge.llm.errors import LLMRequestError
 from bookforge.llm.factory import get_llm_client, resolve_model
@@ -325,33 +327,35 @@ def _render_appearance_projection_prompt(
     )
 
 
-def _refresh_character_appearance_projection(
-    book_root: Path,
-    character_id: str,
-    *,
-    client: Optional[LLMClient] = None,
-    model: Optional[str] = None,
-    force: bool = False,
-) -> bool:
+@dataclass
+class _AppearanceJob:
+    character_id: str
+    state_path: Path
+    state: Dict[str, Any]
+    appearance_current: Dict[str, Any]
+    messages: List[Message]
+
+
+def _prepare_appearance_projection(book_root: Path, character_id: str, *, force: bool = False) -> Optional[_AppearanceJob]:
     state_path = resolve_character_state_path(book_root, character_id)
     if state_path is None or not state_path.exists():
-        return False
+        return None
     try:
         state = json.loads(state_path.read_text(encoding="utf-8"))
     except json.JSONDecodeError:
-        return False
+        return None
     if not isinstance(state, dict):
-        return False
+        return None
 
     _ensure_character_appearance_current(book_root, state, character_id, state_path)
     appearance_current = state.get("appearance_current")
     if not isinstance(appearance_current, dict):
-        return False
+        return None
 
     has_summary = isinstance(appearance_current.get("summary"), str) and appearance_current.get("summary", "").strip()
     pending = bool(state.get("appearance_projection_pending"))
     if not force and not pending and has_summary:
-        return False
+        return None
 
     canon = _load_character_canon(book_root, character_id) or {}
     appearance_base = canon.get("appearance_base") if isinstance(canon.get("appearance_base"), dict) else {}
@@ -363,53 +367,32 @@ def _refresh_character_appearance_projection(
 
     prompt = _render_appearance_projection_prompt(book_root, character, appearance_base, appearance_current)
 
-    if client is None:
-        config = load_config()
-        client = get_llm_client(config, phase="characters")
-        if model is None:
-            model = resolve_model("characters", config)
-    elif model is None:
-        model = "default"
-
     system_path = book_root / "prompts" / "system_v1.md"
     system_prompt = system_path.read_text(encoding="utf-8") if system_path.exists() else ""
     messages: List[Message] = [
         {"role": "system", "content": system_prompt},
         {"role": "user", "content": prompt},
     ]
+    return _AppearanceJob(character_id, state_path, state, appearance_current, messages)
 
-    request = {"model": model, "temperature": 0.3, "max_tokens": _appearance_max_tokens()}
-    workspace = _workspace_root_from_book_root(book_root)
-    key_slot = getattr(client, "key_slot", None)
-    log_extra: Dict[str, Any] = {"book_id": book_root.name, "character_id": character_id}
-    if key_slot:
-        log_extra["key_slot"] = key_slot
 
-    try:
-        response = client.chat(messages, model=model, temperature=0.3, max_tokens=_appearance_max_tokens())
-    except LLMRequestError as exc:
-        if should_log_llm():
-            log_llm_error(workspace, "appearance_projection_error", exc, request=request, messages=messages, extra=log_extra)
-        raise
-
-    if should_log_llm():
-        log_llm_response(workspace, "appearance_projection", response, request=request, messages=messages, extra=log_extra)
-
-    data = _extract_json(response.text)
+def _apply_appearance_projection(job: _AppearanceJob, response_text: str) -> None:
+    data = _extract_json(response_text)
     summary = data.get("summary") if isinstance(data, dict) else None
     if not isinstance(summary, str) or not summary.strip():
         raise ValueError("Appearance projection response missing required summary.")
 
+    appearance_current = job.appearance_current
     appearance_current["summary"] = summary.strip()
     appearance_art = data.get("appearance_art") if isinstance(data, dict) else None
     if isinstance(appearance_art, dict):
         appearance_current["appearance_art"] = appearance_art
 
+    state = job.state
     state["appearance_current"] = appearance_current
     state["appearance_projection_pending"] = False
     state["updated_at"] = _now_iso()
-    state_path.write_text(json.dumps(state, ensure_ascii=True, indent=2), encoding="utf-8")
-    return True
+    job.state_path.write_text(json.dumps(state, ensure_ascii=True, indent=2), encoding="utf-8")
 
 
 def refresh_appearance_projections(
@@ -422,20 +405,59 @@ def refresh_appearance_projections(
 ) -> List[str]:
     if not character_ids:
         return []
-    config = load_config() if client is None else None
-    if client is None:
-        client = get_llm_client(config, phase="characters")
-    if model is None:
-        model = resolve_model("characters", config)
-    refreshed: List[str] = []
+    jobs: List[_AppearanceJob] = []
     seen = set()
     for char_id in character_ids:
         cid = str(char_id).strip()
         if not cid or cid in seen:
             continue
         seen.add(cid)
-        if _refresh_character_appearance_projection(book_root, cid, client=client, model=model, force=force):
-            refreshed.append(cid)
+        job = _prepare_appearance_projection(book_root, cid, force=force)
+        if job is not None:
+            jobs.append(job)
+    if not jobs:
+        return []
+
+    config = load_config() if client is None else None
+    if client is None:
+        client = get_llm_client(config, phase="characters", workspace=_workspace_root_from_book_root(book_root))
+    if model is None:
+        model = resolve_model("characters", config) if config is not None else "default"
+
+    max_tokens = _appearance_max_tokens()
+    request = {"model": model, "temperature": 0.3, "max_tokens": max_tokens}
+    workspace = _workspace_root_from_book_root(book_root)
+    key_slot = getattr(client, "key_slot", None)
+
+    # Each character is an independent call; fan them out so an ensemble scene costs
+    # roughly one round trip. The client's rate limiter still gates every request.
+    calls = [ChatCall(client, job.messages, model=model, temperature=0.3, max_tokens=max_tokens) for job in jobs]
+    results = chat_many(calls, return_exceptions=True, limit=_appearance_concurrency())
+
+    refreshed: List[str] = []
+    failures: List[BaseException] = []
+    for job, result in zip(jobs, results):
+        log_extra: Dict[str, Any] = {"book_id": book_root.name, "character_id": job.character_id}
+        if key_slot:
+            log_extra["key_slot"] = key_slot
+        if isinstance(result, BaseException):
+            if isinstance(result, LLMRequestError) and should_log_llm():
+                log_llm_error(workspace, "appearance_projection_error", result, request=request, messages=job.messages, extra=log_extra)
+            failures.append(result)
+            continue
+        if should_log_llm():
+            log_llm_response(workspace, "appearance_projection", result, request=request, messages=job.messages, extra=log_extra)
+        try:
+            _apply_appearance_projection(job, result.text)
+        except ValueError as exc:
+            failures.append(exc)
+            continue
+        refreshed.append(job.character_id)
+
+    if failures:
+        # Successful projections are already on disk; surface quota errors first so the runner pauses.
+        quota_errors = [exc for exc in failures if isinstance(exc, LLMRequestError)]
+        raise (quota_errors or failures)[0]
     return refreshed
 
 def _unique_state_path(characters_dir: Path, character_id: str) -> Path:
@@ -668,7 +690,7 @@ def generate_characters(
 
     if client is None:
         config = load_config()
-        client = get_llm_client(config, phase="characters")
+        client = get_llm_client(config, phase="characters", workspace=workspace)
         if model is None:
             model = resolve_model("characters", config)
     elif model is None:
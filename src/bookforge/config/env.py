@@ -1,9 +1,13 @@
 from __future__ import annotations
 
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from pathlib import Path
-from typing import Dict, Optional
+from types import MappingProxyType
+from typing import Dict, Mapping, Optional, Tuple
 import os
+import re
+import threading
+import time
 
 from bookforge.util.paths import repo_root
 
@@ -36,6 +40,13 @@ class AppConfig:
     gemini_requests_per_minute: Optional[int]
     task_model_overrides: Dict[str, str]
     task_provider_overrides: Dict[str, str]
+    llm_cache_phases: Tuple[str, ...] = ()
+    llm_cache_dir: Optional[str] = None
+    llm_cache_max_mb: Optional[int] = None
+    gemini_context_cache_ttl_seconds: Optional[int] = None
+    rate_limits: Dict[str, int] = field(default_factory=dict)
+    rate_limit_shared: bool = True
+    rate_limit_dir: Optional[str] = None
 
 
 def _parse_env_file(path: Path) -> Dict[str, str]:
@@ -67,6 +78,20 @@ def _extract_prefixed(env: Dict[str, str], prefix: str) -> Dict[str, str]:
 
 
 
+_RATE_LIMIT_KEY = re.compile(r"^(OPENAI|GEMINI|OLLAMA)_(?:[A-Z_]+_)?(REQUESTS|TOKENS)_PER_(MINUTE|DAY)$")
+
+
+def _extract_rate_limits(env: Dict[str, str]) -> Dict[str, int]:
+    values: Dict[str, int] = {}
+    for key, value in env.items():
+        if not _RATE_LIMIT_KEY.match(key):
+            continue
+        parsed = _parse_int(value)
+        if parsed is not None:
+            values[key.lower()] = parsed
+    return values
+
+
 def _parse_int(value: Optional[str]) -> Optional[int]:
     if value is None:
         return None
@@ -78,8 +103,31 @@ def _parse_int(value: Optional[str]) -> Optional[int]:
     except ValueError:
         return None
 
+def _parse_bool(value: Optional[str], default: bool) -> bool:
+    if value is None:
+        return default
+    text = str(value).strip().lower()
+    if text in {"1", "true", "yes", "on"}:
+        return True
+    if text in {"0", "false", "no", "off"}:
+        return False
+    return default
+
+
+def _parse_csv(value: Optional[str]) -> Tuple[str, ...]:
+    if not value:
+        return ()
+    items = [item.strip().lower() for item in str(value).split(",")]
+    return tuple(item for item in items if item)
+
+_DEFAULT_ENV_PATH: Optional[Path] = None
+
+
 def _default_env_path() -> Path:
-    return repo_root(Path(__file__).resolve()) / ".env"
+    global _DEFAULT_ENV_PATH
+    if _DEFAULT_ENV_PATH is None:
+        _DEFAULT_ENV_PATH = repo_root(Path(__file__).resolve()) / ".env"
+    return _DEFAULT_ENV_PATH
 
 
 def load_config(env: Optional[Dict[str, str]] = None, env_path: Optional[str] = None) -> AppConfig:
@@ -93,7 +141,8 @@ def load_config(env: Optional[Dict[str, str]] = None, env_path: Optional[str] =
     if env is None:
         merged.update(os.environ)
     if env_file:
-        merged.update(_parse_env_file(env_file))
+        snapshot = env_snapshot()
+        merged.update(snapshot.file_values if env_file == snapshot.path else _parse_env_file(env_file))
     if env is not None:
         merged.update(env)
 
@@ -138,29 +187,82 @@ def load_config(env: Optional[Dict[str, str]] = None, env_path: Optional[str] =
         gemini_requests_per_minute=gemini_rpm_val,
         task_model_overrides=task_model_overrides,
         task_provider_overrides=task_provider_overrides,
+        llm_cache_phases=_parse_csv(merged.get("BOOKFORGE_LLM_CACHE_PHASES")),
+        llm_cache_dir=merged.get("BOOKFORGE_LLM_CACHE_DIR") or None,
+        llm_cache_max_mb=_parse_int(merged.get("BOOKFORGE_LLM_CACHE_MAX_MB")),
+        gemini_context_cache_ttl_seconds=_parse_int(merged.get("GEMINI_CONTEXT_CACHE_TTL_SECONDS")),
+        rate_limits=_extract_rate_limits(merged),
+        rate_limit_shared=_parse_bool(merged.get("BOOKFORGE_RATE_LIMIT_SHARED"), True),
+        rate_limit_dir=merged.get("BOOKFORGE_RATE_LIMIT_DIR") or None,
     )
 
 
 
+ENV_RECHECK_SECONDS = 1.0
+
+_EnvStamp = Optional[Tuple[int, int]]
+
+
+@dataclass(frozen=True)
+class EnvSnapshot:
+    path: Path
+    stamp: _EnvStamp
+    file_values: Mapping[str, str]
+
+    def get(self, name: str) -> Optional[str]:
+        # .env wins over the process environment, matching load_config.
+        if name in self.file_values:
+            return self.file_values[name]
+        return os.environ.get(name)
+
+    def get_int(self, name: str, default: int) -> int:
+        parsed = _parse_int(self.get(name))
+        return default if parsed is None else parsed
+
+    def get_bool(self, name: str, default: bool) -> bool:
+        return _parse_bool(self.get(name), default)
+
+
+_ENV_LOCK = threading.Lock()
+_ENV_SNAPSHOT: Optional[EnvSnapshot] = None
+_ENV_CHECKED_AT = 0.0
+
+
+def _env_stamp(path: Path) -> _EnvStamp:
+    try:
+        stat = path.stat()
+    except OSError:
+        return None
+    return stat.st_mtime_ns, stat.st_size
+
+
+def _load_env_snapshot(path: Path) -> EnvSnapshot:
+    stamp = _env_stamp(path)
+    values = _parse_env_file(path) if stamp is not None else {}
+    return EnvSnapshot(path=path, stamp=stamp, file_values=MappingProxyType(values))
+
+
+def env_snapshot() -> EnvSnapshot:
+    global _ENV_SNAPSHOT, _ENV_CHECKED_AT
+    now = time.monotonic()
+    with _ENV_LOCK:
+        snapshot = _ENV_SNAPSHOT
+        if snapshot is not None and now - _ENV_CHECKED_AT < ENV_RECHECK_SECONDS:
+            return snapshot
+        path = _default_env_path()
+        if snapshot is None or snapshot.path != path or _env_stamp(path) != snapshot.stamp:
+            snapshot = _load_env_snapshot(path)
+            _ENV_SNAPSHOT = snapshot
+        _ENV_CHECKED_AT = now
+        return snapshot
+
+
 def read_env_value(name: str) -> Optional[str]:
-    env_path = _default_env_path()
-    data = _parse_env_file(env_path)
-    if name in data:
-        return data.get(name)
-    return os.environ.get(name)
+    return env_snapshot().get(name)
 
 
 def read_int_env(name: str, default: int) -> int:
-    raw = read_env_value(name)
-    if raw is None:
-        return default
-    raw = str(raw).strip()
-    if not raw:
-        return default
-    try:
-        return int(raw)
-    except ValueError:
-        return default
+    return env_snapshot().get_int(name, default)
 
 
 
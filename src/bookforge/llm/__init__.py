@@ -1,8 +1,10 @@
+from .aio import ChatCall, achat_many, chat_many, run_sync
 from .client import LLMClient
 from .factory import get_llm_client, resolve_model
 from .types import LLMResponse
+from .stream import LLMStream
 from .errors import LLMRequestError, QuotaViolation
 from .rate_limiter import RateLimiter
-from .logging import log_llm_response, should_log_llm
+from .logging import flush_llm_logs, log_llm_response, should_log_llm
 
-__all__ = ["LLMClient", "LLMResponse", "get_llm_client", "resolve_model", "LLMRequestError", "QuotaViolation", "RateLimiter", "log_llm_response", "should_log_llm"]
+__all__ = ["ChatCall", "LLMClient", "LLMResponse", "LLMStream", "achat_many", "chat_many", "run_sync", "get_llm_client", "resolve_model", "LLMRequestError", "QuotaViolation", "RateLimiter", "flush_llm_logs", "log_llm_response", "should_log_llm"]
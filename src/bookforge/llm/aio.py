@@ -0,0 +1,96 @@
+from __future__ import annotations
+
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from functools import partial
+from typing import TYPE_CHECKING, Any, Awaitable, Callable, List, Optional, Sequence, TypeVar
+import asyncio
+import threading
+
+from bookforge.config.env import read_int_env
+from .types import Message
+
+if TYPE_CHECKING:
+    from .client import LLMClient
+
+T = TypeVar("T")
+
+DEFAULT_ASYNC_WORKERS = 8
+
+_LOCK = threading.Lock()
+_EXECUTOR: Optional[ThreadPoolExecutor] = None
+_LOOP: Optional[asyncio.AbstractEventLoop] = None
+_LOOP_THREAD: Optional[threading.Thread] = None
+
+
+def _executor() -> ThreadPoolExecutor:
+    global _EXECUTOR
+    with _LOCK:
+        if _EXECUTOR is None:
+            workers = max(1, read_int_env("BOOKFORGE_LLM_ASYNC_WORKERS", DEFAULT_ASYNC_WORKERS))
+            _EXECUTOR = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="bookforge-llm")
+        return _EXECUTOR
+
+
+async def run_blocking(fn: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+    # Provider HTTP is blocking stdlib I/O; it runs on a bounded pool so a large
+    # gather cannot open more sockets than the transport pool is sized for.
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_executor(), partial(fn, *args, **kwargs))
+
+
+def shared_loop() -> asyncio.AbstractEventLoop:
+    global _LOOP, _LOOP_THREAD
+    with _LOCK:
+        if _LOOP is None or _LOOP.is_closed():
+            loop = asyncio.new_event_loop()
+            thread = threading.Thread(target=loop.run_forever, name="bookforge-llm-loop", daemon=True)
+            thread.start()
+            _LOOP, _LOOP_THREAD = loop, thread
+        return _LOOP
+
+
+def run_sync(awaitable: Awaitable[T]) -> T:
+    loop = shared_loop()
+    if threading.current_thread() is _LOOP_THREAD:
+        raise RuntimeError("run_sync cannot be called from the shared LLM event loop; await the coroutine instead")
+
+    async def _await() -> T:
+        return await awaitable
+
+    return asyncio.run_coroutine_threadsafe(_await(), loop).result()
+
+
+@dataclass
+class ChatCall:
+    client: "LLMClient"
+    messages: List[Message]
+    model: str
+    temperature: float = 0.7
+    max_tokens: int = 1024
+
+
+async def _achat(call: ChatCall) -> Any:
+    client = call.client
+    kwargs = {"model": call.model, "temperature": call.temperature, "max_tokens": call.max_tokens}
+    if hasattr(client, "achat"):
+        return await client.achat(call.messages, **kwargs)
+    return await run_blocking(client.chat, call.messages, **kwargs)
+
+
+async def achat_many(calls: Sequence[ChatCall], return_exceptions: bool = False, limit: int = 0) -> List[Any]:
+    if limit <= 0:
+        return await asyncio.gather(*(_achat(call) for call in calls), return_exceptions=return_exceptions)
+    semaphore = asyncio.Semaphore(limit)
+
+    async def _bounded(call: ChatCall) -> Any:
+        async with semaphore:
+            return await _achat(call)
+
+    return await asyncio.gather(*(_bounded(call) for call in calls), return_exceptions=return_exceptions)
+
+
+def chat_many(calls: Sequence[ChatCall], return_exceptions: bool = False, limit: int = 0) -> List[Any]:
+    if not calls:
+        return []
+    return run_sync(achat_many(calls, return_exceptions=return_exceptions, limit=limit))
@@ -0,0 +1,294 @@
+from __future__ import annotations
+
+from collections import OrderedDict
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+import json
+import os
+import threading
+
+from bookforge.prompt.hashing import PromptHashes, hash_prompt_parts, hash_text
+from .client import LLMClient
+from .stream import LLMStream
+from .types import LLMResponse, Message, StreamChunk
+from .utils import split_system_messages
+
+DEFAULT_CACHE_MAX_BYTES = 512 * 1024 * 1024
+CACHE_FORMAT_VERSION = 1
+
+
+def _canonical_json(value: Any) -> str:
+    return json.dumps(value, ensure_ascii=True, sort_keys=True, separators=(",", ":"))
+
+
+def cache_key(
+    provider: str,
+    model: str,
+    temperature: float,
+    max_tokens: int,
+    messages: List[Message],
+) -> Tuple[str, PromptHashes]:
+    system_text, non_system = split_system_messages(messages)
+    hashes = hash_prompt_parts(system_text, _canonical_json(non_system), _canonical_json(messages))
+    material = _canonical_json({
+        "version": CACHE_FORMAT_VERSION,
+        "provider": provider,
+        "model": model,
+        "temperature": float(temperature),
+        "max_tokens": int(max_tokens),
+        "messages": hashes.assembled_prompt,
+    })
+    return hash_text(material), hashes
+
+
+@dataclass
+class CacheStats:
+    hits: int = 0
+    misses: int = 0
+    stores: int = 0
+    evictions: int = 0
+
+    def as_dict(self) -> Dict[str, int]:
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "stores": self.stores,
+            "evictions": self.evictions,
+        }
+
+
+class ResponseCache:
+    def __init__(self, root: Path, max_bytes: int = DEFAULT_CACHE_MAX_BYTES) -> None:
+        self.root = Path(root)
+        self.max_bytes = max(0, int(max_bytes))
+        self._lock = threading.Lock()
+        self._stats = CacheStats()
+        self._index: Optional[OrderedDict[str, int]] = None
+        self._total_bytes = 0
+
+    def stats(self) -> CacheStats:
+        with self._lock:
+            return CacheStats(**self._stats.as_dict())
+
+    def _entry_path(self, key: str) -> Path:
+        return self.root / key[:2] / f"{key}.json"
+
+    def _ensure_index(self) -> OrderedDict[str, int]:
+        if self._index is not None:
+            return self._index
+        entries: List[Tuple[float, str, int]] = []
+        if self.root.exists():
+            for path in self.root.glob("*/*.json"):
+                try:
+                    stat = path.stat()
+                except OSError:
+                    continue
+                entries.append((stat.st_mtime, path.stem, stat.st_size))
+        entries.sort()
+        self._index = OrderedDict((key, size) for _, key, size in entries)
+        self._total_bytes = sum(size for _, _, size in entries)
+        return self._index
+
+    def _forget(self, key: str) -> None:
+        index = self._ensure_index()
+        size = index.pop(key, None)
+        if size is not None:
+            self._total_bytes -= size
+
+    def get(self, key: str) -> Optional[LLMResponse]:
+        path = self._entry_path(key)
+        with self._lock:
+            index = self._ensure_index()
+            if key not in index:
+                # Another process may have stored it since the index was built.
+                if not path.exists():
+                    self._stats.misses += 1
+                    return None
+                size = path.stat().st_size
+                index[key] = size
+                self._total_bytes += size
+            try:
+                payload = json.loads(path.read_text(encoding="utf-8"))
+                stored = payload["response"]
+                response = LLMResponse(
+                    text=stored["text"],
+                    raw=stored.get("raw"),
+                    provider=stored["provider"],
+                    model=stored["model"],
+                    prompt_tokens=stored.get("prompt_tokens"),
+                    completion_tokens=stored.get("completion_tokens"),
+                    total_tokens=stored.get("total_tokens"),
+                    cached_tokens=stored.get("cached_tokens"),
+                    cache_hit=True,
+                )
+            except (OSError, ValueError, KeyError, TypeError):
+                self._forget(key)
+                self._stats.misses += 1
+                return None
+            try:
+                os.utime(path)
+            except OSError:
+                pass
+            index.move_to_end(key)
+            self._stats.hits += 1
+            return response
+
+    def put(self, key: str, response: LLMResponse, hashes: Optional[PromptHashes] = None, request: Optional[Dict[str, Any]] = None) -> None:
+        payload: Dict[str, Any] = {
+            "key": key,
+            "created_at": datetime.now(timezone.utc).replace(microsecond=0).isoformat().replace("+00:00", "Z"),
+            "response": {
+                "text": response.text,
+                "raw": response.raw,
+                "provider": response.provider,
+                "model": response.model,
+                "prompt_tokens": response.prompt_tokens,
+                "completion_tokens": response.completion_tokens,
+                "total_tokens": response.total_tokens,
+                "cached_tokens": response.cached_tokens,
+            },
+        }
+        if request:
+            payload["request"] = request
+        if hashes is not None:
+            payload["prompt_hashes"] = {
+                "stable_prefix": hashes.stable_prefix,
+                "dynamic_payload": hashes.dynamic_payload,
+                "assembled_prompt": hashes.assembled_prompt,
+            }
+        data = json.dumps(payload, ensure_ascii=True).encode("utf-8")
+        path = self._entry_path(key)
+        with self._lock:
+            index = self._ensure_index()
+            path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+            tmp_path.write_bytes(data)
+            os.replace(tmp_path, path)
+            self._forget(key)
+            index[key] = len(data)
+            self._total_bytes += len(data)
+            self._stats.stores += 1
+            self._evict(keep=key)
+
+    def _evict(self, keep: str) -> None:
+        index = self._ensure_index()
+        while self._total_bytes > self.max_bytes and index:
+            oldest = next(iter(index))
+            if oldest == keep:
+                break
+            self._forget(oldest)
+            try:
+                self._entry_path(oldest).unlink()
+            except FileNotFoundError:
+                pass
+            self._stats.evictions += 1
+
+
+class CachingLLMClient(LLMClient):
+    def __init__(self, inner: LLMClient, cache: ResponseCache) -> None:
+        super().__init__(provider=inner.provider, rate_limiter=inner.rate_limiter, key_slot=inner.key_slot, transport=inner.transport)
+        self.inner = inner
+        self.cache = cache
+
+    def _store(self, key: str, hashes: PromptHashes, response: LLMResponse, model: str, temperature: float, max_tokens: int) -> None:
+        if not str(response.text).strip():
+            return
+        request = {"model": model, "temperature": temperature, "max_tokens": max_tokens}
+        try:
+            self.cache.put(key, response, hashes, request=request)
+        except OSError:
+            pass
+
+    def chat(
+        self,
+        messages: Iterable[Message],
+        model: str,
+        temperature: float = 0.7,
+        max_tokens: int = 1024,
+    ) -> LLMResponse:
+        messages = list(messages)
+        key, hashes = cache_key(self.provider, model, temperature, max_tokens, messages)
+        cached = self.cache.get(key)
+        if cached is not None:
+            return cached
+        response = self.inner.chat(messages, model=model, temperature=temperature, max_tokens=max_tokens)
+        self._store(key, hashes, response, model, temperature, max_tokens)
+        return response
+
+    async def achat(
+        self,
+        messages: Iterable[Message],
+        model: str,
+        temperature: float = 0.7,
+        max_tokens: int = 1024,
+    ) -> LLMResponse:
+        messages = list(messages)
+        key, hashes = cache_key(self.provider, model, temperature, max_tokens, messages)
+        cached = self.cache.get(key)
+        if cached is not None:
+            return cached
+        response = await self.inner.achat(messages, model=model, temperature=temperature, max_tokens=max_tokens)
+        self._store(key, hashes, response, model, temperature, max_tokens)
+        return response
+
+    def chat_stream(
+        self,
+        messages: Iterable[Message],
+        model: str,
+        temperature: float = 0.7,
+        max_tokens: int = 1024,
+    ) -> LLMStream:
+        messages = list(messages)
+        key, hashes = cache_key(self.provider, model, temperature, max_tokens, messages)
+        cached = self.cache.get(key)
+        if cached is not None:
+            return LLMStream.from_response(cached)
+        inner_stream = self.inner.chat_stream(messages, model=model, temperature=temperature, max_tokens=max_tokens)
+
+        def _chunks() -> Iterator[StreamChunk]:
+            finished = False
+            try:
+                for text in inner_stream:
+                    yield StreamChunk(text=text)
+                finished = True
+            finally:
+                if not finished:
+                    inner_stream.close()
+
+        def _finalize(_text: str, _events: List[Any]) -> LLMResponse:
+            response = inner_stream.response
+            # A stream cut short by the caller is not a faithful answer to the prompt.
+            if not inner_stream.aborted:
+                self._store(key, hashes, response, model, temperature, max_tokens)
+            return response
+
+        return LLMStream(_chunks(), _finalize)
+
+
+_CACHES: Dict[Path, ResponseCache] = {}
+_CACHES_LOCK = threading.Lock()
+
+
+def shared_response_cache(root: Path, max_bytes: int = DEFAULT_CACHE_MAX_BYTES) -> ResponseCache:
+    resolved = Path(root).resolve()
+    with _CACHES_LOCK:
+        cache = _CACHES.get(resolved)
+        if cache is None:
+            cache = ResponseCache(resolved, max_bytes=max_bytes)
+            _CACHES[resolved] = cache
+        return cache
+
+
+def response_cache_stats() -> Dict[str, int]:
+    totals = CacheStats()
+    with _CACHES_LOCK:
+        caches = list(_CACHES.values())
+    for cache in caches:
+        stats = cache.stats()
+        totals.hits += stats.hits
+        totals.misses += stats.misses
+        totals.stores += stats.stores
+        totals.evictions += stats.evictions
+    return totals.as_dict()
@@ -1,20 +1,88 @@
 from __future__ import annotations
 
 from abc import ABC, abstractmethod
-from typing import Iterable, Optional
+from typing import Callable, Iterable, List, Optional
+import threading
+import time
+
+from bookforge.prompt.budgeter import estimate_tokens, observe_prompt_tokens
+from .aio import run_blocking
 from .types import LLMResponse, Message
-from .rate_limiter import RateLimiter
+from .rate_limiter import RateLimiter, Reservation
+from .stream import LLMStream
+from .transport import ConnectionPool, shared_pool
+
+
+SettleObserver = Callable[["LLMClient", LLMResponse, float], None]
+
+_OBSERVERS_LOCK = threading.Lock()
+_SETTLE_OBSERVERS: List[SettleObserver] = []
+
+
+def add_settle_observer(observer: SettleObserver) -> None:
+    with _OBSERVERS_LOCK:
+        if observer not in _SETTLE_OBSERVERS:
+            _SETTLE_OBSERVERS.append(observer)
+
+
+def remove_settle_observer(observer: SettleObserver) -> None:
+    with _OBSERVERS_LOCK:
+        if observer in _SETTLE_OBSERVERS:
+            _SETTLE_OBSERVERS.remove(observer)
 
 
 class LLMClient(ABC):
-    def __init__(self, provider: str, rate_limiter: Optional[RateLimiter] = None, key_slot: Optional[str] = None) -> None:
+    def __init__(
+        self,
+        provider: str,
+        rate_limiter: Optional[RateLimiter] = None,
+        key_slot: Optional[str] = None,
+        transport: Optional[ConnectionPool] = None,
+    ) -> None:
         self.provider = provider
         self.rate_limiter = rate_limiter
         self.key_slot = key_slot
+        self.transport = transport or shared_pool()
+
+    def _estimate_tokens(self, messages: Optional[Iterable[Message]], max_tokens: int) -> int:
+        # Reserve the worst case up front; _settle corrects it once usage is known.
+        estimate = max(0, int(max_tokens))
+        for msg in messages or ():
+            estimate += estimate_tokens(str(msg.get("content", "")), self.provider)
+        return estimate
+
+    def _throttle(self, messages: Optional[Iterable[Message]] = None, max_tokens: int = 0) -> Optional[Reservation]:
+        if not self.rate_limiter:
+            return Reservation(tokens=0)
+        return self.rate_limiter.reserve(self._estimate_tokens(messages, max_tokens))
+
+    async def _athrottle(self, messages: Optional[Iterable[Message]] = None, max_tokens: int = 0) -> Optional[Reservation]:
+        if not self.rate_limiter:
+            return Reservation(tokens=0)
+        return await self.rate_limiter.areserve(self._estimate_tokens(messages, max_tokens))
 
-    def _throttle(self) -> None:
-        if self.rate_limiter:
-            self.rate_limiter.wait()
+    def _settle(
+        self,
+        reservation: Optional[Reservation],
+        response: LLMResponse,
+        messages: Optional[Iterable[Message]] = None,
+    ) -> LLMResponse:
+        if messages is not None and response.prompt_tokens:
+            prompt_chars = sum(len(str(msg.get("content", ""))) for msg in messages)
+            observe_prompt_tokens(self.provider, prompt_chars, response.prompt_tokens)
+        if self.rate_limiter and reservation is not None:
+            actual = response.total_tokens
+            if actual is None and response.prompt_tokens is not None and response.completion_tokens is not None:
+                actual = response.prompt_tokens + response.completion_tokens
+            self.rate_limiter.reconcile(reservation, actual)
+        # Every provider call funnels through here, so observers (run metrics) see
+        # direct client.chat / chat_many / stream callers as well as _chat.
+        seconds = time.perf_counter() - reservation.started if reservation is not None else 0.0
+        with _OBSERVERS_LOCK:
+            observers = list(_SETTLE_OBSERVERS)
+        for observer in observers:
+            observer(self, response, seconds)
+        return response
 
     @abstractmethod
     def chat(
@@ -25,3 +93,35 @@ class LLMClient(ABC):
         max_tokens: int = 1024,
     ) -> LLMResponse:
         raise NotImplementedError
+
+    async def achat(
+        self,
+        messages: Iterable[Message],
+        model: str,
+        temperature: float = 0.7,
+        max_tokens: int = 1024,
+    ) -> LLMResponse:
+        return await run_blocking(self.chat, list(messages), model=model, temperature=temperature, max_tokens=max_tokens)
+
+    async def _achat_throttled(
+        self,
+        send: Callable[[List[Message], str, float, int], LLMResponse],
+        messages: Iterable[Message],
+        model: str,
+        temperature: float,
+        max_tokens: int,
+    ) -> LLMResponse:
+        # Rate-limit waits happen on the event loop so they do not pin worker threads.
+        messages = list(messages)
+        reservation = await self._athrottle(messages, max_tokens)
+        response = await run_blocking(send, messages, model, temperature, max_tokens)
+        return self._settle(reservation, response, messages)
+
+    def chat_stream(
+        self,
+        messages: Iterable[Message],
+        model: str,
+        temperature: float = 0.7,
+        max_tokens: int = 1024,
+    ) -> LLMStream:
+        return LLMStream.from_response(self.chat(messages, model=model, temperature=temperature, max_tokens=max_tokens))
@@ -1,13 +1,16 @@
 from __future__ import annotations
 
+from pathlib import Path
 from typing import Optional
 
 from bookforge.config.env import AppConfig, validate_provider_config
+from .cache import DEFAULT_CACHE_MAX_BYTES, CachingLLMClient, shared_response_cache
 from .client import LLMClient
-from .rate_limiter import RateLimiter
+from bookforge.prompt.hashing import hash_text
+from .rate_limiter import FileRateLimiter, RateLimiter
 
 from .openai_client import OpenAIClient
-from .gemini_client import GeminiClient
+from .gemini_client import DEFAULT_CONTEXT_CACHE_TTL_SECONDS, GeminiClient
 from .ollama_client import OllamaClient
 
 _RATE_LIMITERS: dict[tuple[str, str], RateLimiter] = {}
@@ -37,37 +40,138 @@ def _select_api_key(config: AppConfig, phase: Optional[str], default_key: Option
     return default_key, "default"
 
 
-def _shared_rate_limiter(provider: str, key_slot: str, rpm: int | None) -> RateLimiter | None:
-    if not rpm or rpm <= 0:
+def _rate_limit_value(config: AppConfig, provider: str, key_slot: str, metric: str) -> int | None:
+    # Per key slot (e.g. GEMINI_WRITER_TOKENS_PER_MINUTE) wins over the provider-wide value.
+    limits = config.rate_limits
+    if key_slot and key_slot != "default":
+        value = limits.get(f"{provider}_{key_slot}_{metric}")
+        if value is not None:
+            return value
+    return limits.get(f"{provider}_{metric}")
+
+
+def _shared_rate_limiter(
+    provider: str,
+    key_slot: str,
+    rpm: int | None,
+    tpm: int | None = None,
+    rpd: int | None = None,
+    tpd: int | None = None,
+    state_path: Path | None = None,
+) -> RateLimiter | None:
+    limits = [max(0, value or 0) for value in (rpm, tpm, rpd, tpd)]
+    if not any(limits):
         return None
     slot = key_slot or "default"
     key = (provider, slot)
     limiter = _RATE_LIMITERS.get(key)
+    if limiter is not None and state_path is not None and getattr(limiter, "state_path", None) != state_path:
+        limiter = None
     if limiter is None:
-        limiter = RateLimiter(rpm)
+        label = f"{provider}:{slot}"
+        if state_path is not None:
+            limiter = FileRateLimiter(*limits, label=label, state_path=state_path)
+        else:
+            limiter = RateLimiter(*limits, label=label)
         _RATE_LIMITERS[key] = limiter
     return limiter
 
 
-def get_llm_client(config: AppConfig, phase: Optional[str] = None) -> LLMClient:
-    validate_provider_config(config)
-    rate_limiter = None
+def _rate_limit_state_path(config: AppConfig, provider: str, key_slot: str, api_key: Optional[str], workspace: Optional[Path]) -> Path | None:
+    if not config.rate_limit_shared:
+        return None
+    if config.rate_limit_dir:
+        root = Path(config.rate_limit_dir)
+    elif workspace is not None:
+        root = Path(workspace) / "cache" / "ratelimit"
+    else:
+        return None
+    # Processes share a budget only when they share the actual key, not just the slot name.
+    key_id = hash_text(api_key or "")[:12]
+    return (root / f"{provider}-{key_slot or 'default'}-{key_id}.json").resolve()
+
+
+def _rate_limiter_for(
+    config: AppConfig,
+    provider: str,
+    key_slot: str,
+    api_key: Optional[str] = None,
+    workspace: Optional[Path] = None,
+) -> RateLimiter | None:
+    rpm = _rate_limit_value(config, provider, key_slot, "requests_per_minute")
+    if rpm is None and provider == "gemini":
+        rpm = config.gemini_requests_per_minute
+    return _shared_rate_limiter(
+        provider,
+        key_slot,
+        rpm,
+        _rate_limit_value(config, provider, key_slot, "tokens_per_minute"),
+        _rate_limit_value(config, provider, key_slot, "requests_per_day"),
+        _rate_limit_value(config, provider, key_slot, "tokens_per_day"),
+        state_path=_rate_limit_state_path(config, provider, key_slot, api_key, workspace),
+    )
+
+
+def _provider_client(config: AppConfig, phase: Optional[str], workspace: Optional[Path] = None) -> LLMClient:
     if config.provider == "openai":
         api_key, key_slot = _select_api_key(config, phase, config.openai_api_key)
         if not api_key:
             raise ValueError("OPENAI_API_KEY or phase API key is required for this phase")
+        rate_limiter = _rate_limiter_for(config, "openai", key_slot, api_key, workspace)
         return OpenAIClient(api_key, config.openai_api_url, rate_limiter=rate_limiter, timeout_seconds=config.request_timeout_seconds, key_slot=key_slot)
     if config.provider == "gemini":
         api_key, key_slot = _select_api_key(config, phase, config.gemini_api_key)
         if not api_key:
             raise ValueError("GEMINI_API_KEY or phase API key is required for this phase")
-        rate_limiter = _shared_rate_limiter("gemini", key_slot, config.gemini_requests_per_minute)
-        return GeminiClient(api_key, config.gemini_api_url, rate_limiter=rate_limiter, timeout_seconds=config.request_timeout_seconds, key_slot=key_slot)
+        rate_limiter = _rate_limiter_for(config, "gemini", key_slot, api_key, workspace)
+        cache_ttl = config.gemini_context_cache_ttl_seconds
+        if cache_ttl is None:
+            cache_ttl = DEFAULT_CONTEXT_CACHE_TTL_SECONDS
+        return GeminiClient(
+            api_key,
+            config.gemini_api_url,
+            rate_limiter=rate_limiter,
+            timeout_seconds=config.request_timeout_seconds,
+            key_slot=key_slot,
+            context_cache_ttl_seconds=cache_ttl,
+        )
     if config.provider == "ollama":
+        rate_limiter = _rate_limiter_for(config, "ollama", "ollama", config.ollama_url, workspace)
         return OllamaClient(config.ollama_url, rate_limiter=rate_limiter, timeout_seconds=config.request_timeout_seconds, key_slot="ollama")
     raise ValueError(f"Unsupported LLM_PROVIDER: {config.provider}")
 
 
+def _cache_enabled_for_phase(config: AppConfig, phase: Optional[str]) -> bool:
+    phases = config.llm_cache_phases
+    if not phases:
+        return False
+    if "all" in phases:
+        return True
+    return (phase or "").lower() in phases
+
+
+def _response_cache_root(config: AppConfig, workspace: Optional[Path]) -> Optional[Path]:
+    if config.llm_cache_dir:
+        return Path(config.llm_cache_dir)
+    if workspace is None:
+        return None
+    return Path(workspace) / "cache" / "llm"
+
+
+def get_llm_client(config: AppConfig, phase: Optional[str] = None, workspace: Optional[Path] = None) -> LLMClient:
+    validate_provider_config(config)
+    client = _provider_client(config, phase, workspace)
+    if not _cache_enabled_for_phase(config, phase):
+        return client
+    root = _response_cache_root(config, workspace)
+    if root is None:
+        return client
+    max_bytes = DEFAULT_CACHE_MAX_BYTES
+    if config.llm_cache_max_mb is not None and config.llm_cache_max_mb > 0:
+        max_bytes = config.llm_cache_max_mb * 1024 * 1024
+    return CachingLLMClient(client, shared_response_cache(root, max_bytes=max_bytes))
+
+
 def resolve_model(phase: str, config: AppConfig) -> str:
     phase_key = phase.lower()
     model: Optional[str] = None
@@ -1,28 +1,168 @@
 from __future__ import annotations
 
-from typing import Iterable, Optional
+from contextlib import closing
+from dataclasses import dataclass
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+import json
+import logging
+import threading
+import time
 
+from bookforge.prompt.hashing import hash_text
 from .client import LLMClient
+from .errors import LLMRequestError
 from .rate_limiter import RateLimiter
-from .types import LLMResponse, Message
-from .utils import post_json, split_system_messages
+from .stream import LLMStream
+from .transport import ConnectionPool
+from .types import LLMResponse, Message, StreamChunk
+from .utils import iter_sse_data, post_json, post_stream, split_system_messages
+
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CONTEXT_CACHE_TTL_SECONDS = 900
+# Explicit caches below the provider minimum (~4k tokens on Pro models) are rejected.
+CONTEXT_CACHE_MIN_CHARS = 16384
+_CONTEXT_CACHE_REFRESH_MARGIN = 0.25
+
+
+@dataclass
+class _ContextCacheEntry:
+    name: Optional[str]
+    expires_at: float
+
+
+_CONTEXT_CACHES: Dict[Tuple[str, str, str], _ContextCacheEntry] = {}
+# The global lock only guards the dicts; cache create/refresh calls run under a
+# per-prefix lock so one slow request never serializes unrelated Gemini calls.
+_CONTEXT_CACHE_LOCK = threading.Lock()
+_CONTEXT_CACHE_KEY_LOCKS: Dict[Tuple[str, str, str], threading.Lock] = {}
+
+
+def _context_cache_key_lock(key: Tuple[str, str, str]) -> threading.Lock:
+    with _CONTEXT_CACHE_LOCK:
+        lock = _CONTEXT_CACHE_KEY_LOCKS.get(key)
+        if lock is None:
+            lock = _CONTEXT_CACHE_KEY_LOCKS[key] = threading.Lock()
+        return lock
+
+
+def _fresh_context_cache(key: Tuple[str, str, str], margin: float) -> Tuple[bool, Optional[_ContextCacheEntry]]:
+    with _CONTEXT_CACHE_LOCK:
+        entry = _CONTEXT_CACHES.get(key)
+    return entry is not None and entry.expires_at - time.time() > margin, entry
+
+
+def _mentions_cached_content(error: LLMRequestError, name: str) -> bool:
+    raw = error.raw_response
+    raw_text = raw if isinstance(raw, str) else json.dumps(raw, ensure_ascii=True, default=str) if raw is not None else ""
+    text = f"{error.message} {raw_text}"
+    lowered = text.lower()
+    return name in text or "cachedcontent" in lowered or "cached content" in lowered
+
+
+def _usage_fields(usage: Dict[str, Any]) -> Dict[str, Optional[int]]:
+    return {
+        "prompt_tokens": usage.get("promptTokenCount"),
+        "completion_tokens": usage.get("candidatesTokenCount"),
+        "total_tokens": usage.get("totalTokenCount"),
+        "cached_tokens": usage.get("cachedContentTokenCount"),
+    }
+
+
+def _candidate_text(raw: Dict[str, Any]) -> str:
+    candidates = raw.get("candidates", [])
+    if not candidates:
+        return ""
+    parts = candidates[0].get("content", {}).get("parts", [])
+    return "".join([part.get("text", "") for part in parts])
 
 
 class GeminiClient(LLMClient):
-    def __init__(self, api_key: str, api_url: str, rate_limiter: Optional[RateLimiter] = None, timeout_seconds: int = 240, key_slot: Optional[str] = None) -> None:
-        super().__init__(provider="gemini", rate_limiter=rate_limiter, key_slot=key_slot)
+    def __init__(
+        self,
+        api_key: str,
+        api_url: str,
+        rate_limiter: Optional[RateLimiter] = None,
+        timeout_seconds: int = 240,
+        key_slot: Optional[str] = None,
+        transport: Optional[ConnectionPool] = None,
+        context_cache_ttl_seconds: int = DEFAULT_CONTEXT_CACHE_TTL_SECONDS,
+    ) -> None:
+        super().__init__(provider="gemini", rate_limiter=rate_limiter, key_slot=key_slot, transport=transport)
         self.api_key = api_key
         self.api_url = api_url.rstrip("/")
         self.timeout_seconds = timeout_seconds
+        self.context_cache_ttl_seconds = max(0, int(context_cache_ttl_seconds))
 
-    def chat(
-        self,
-        messages: Iterable[Message],
-        model: str,
-        temperature: float = 0.7,
-        max_tokens: int = 1024,
-    ) -> LLMResponse:
-        self._throttle()
+    def _create_context_cache(self, model: str, system_text: str) -> Tuple[str, float]:
+        url = f"{self.api_url}/cachedContents?key={self.api_key}"
+        payload = {
+            "model": f"models/{model}",
+            "systemInstruction": {"parts": [{"text": system_text}]},
+            "ttl": f"{self.context_cache_ttl_seconds}s",
+        }
+        raw = post_json(url, payload, {"Content-Type": "application/json"}, timeout=self.timeout_seconds, max_retries=1, pool=self.transport)
+        name = str(raw.get("name") or "")
+        if not name:
+            raise ValueError("cachedContents response missing name")
+        return name, time.time() + self.context_cache_ttl_seconds
+
+    def _refresh_context_cache(self, name: str) -> float:
+        url = f"{self.api_url}/{name}?updateMask=ttl&key={self.api_key}"
+        payload = {"ttl": f"{self.context_cache_ttl_seconds}s"}
+        post_json(url, payload, {"Content-Type": "application/json"}, timeout=self.timeout_seconds, max_retries=1, pool=self.transport, method="PATCH")
+        return time.time() + self.context_cache_ttl_seconds
+
+    def _context_cache_name(self, model: str, system_text: str) -> Optional[str]:
+        if self.context_cache_ttl_seconds <= 0 or len(system_text) < CONTEXT_CACHE_MIN_CHARS:
+            return None
+        key = (hash_text(self.api_key), model, hash_text(system_text))
+        margin = self.context_cache_ttl_seconds * _CONTEXT_CACHE_REFRESH_MARGIN
+        fresh, entry = _fresh_context_cache(key, margin)
+        if fresh and entry is not None:
+            return entry.name
+        with _context_cache_key_lock(key):
+            # Another caller may have created or refreshed it while we waited.
+            fresh, entry = _fresh_context_cache(key, margin)
+            if fresh and entry is not None:
+                return entry.name
+            now = time.time()
+            try:
+                if entry is not None and entry.name and entry.expires_at > now:
+                    try:
+                        refreshed = _ContextCacheEntry(name=entry.name, expires_at=self._refresh_context_cache(entry.name))
+                    except LLMRequestError:
+                        refreshed = None
+                    if refreshed is not None:
+                        with _CONTEXT_CACHE_LOCK:
+                            _CONTEXT_CACHES[key] = refreshed
+                        return refreshed.name
+                name, expires_at = self._create_context_cache(model, system_text)
+            except (LLMRequestError, RuntimeError, ValueError) as exc:
+                # Remember the failure for one TTL so uncacheable prefixes are not retried every call.
+                logger.warning("Gemini context cache unavailable for %s: %s", model, exc)
+                with _CONTEXT_CACHE_LOCK:
+                    _CONTEXT_CACHES[key] = _ContextCacheEntry(name=None, expires_at=now + self.context_cache_ttl_seconds)
+                return None
+            with _CONTEXT_CACHE_LOCK:
+                _CONTEXT_CACHES[key] = _ContextCacheEntry(name=name, expires_at=expires_at)
+            return name
+
+    @staticmethod
+    def _context_cache_rejected(payload: Dict[str, Any], error: LLMRequestError) -> bool:
+        # A cache that expired or was deleted server-side surfaces as a 4xx on generate
+        # naming the cachedContent; any other 4xx is a real request error.
+        name = payload.get("cachedContent")
+        if not name or error.status_code not in {400, 403, 404} or not _mentions_cached_content(error, str(name)):
+            return False
+        with _CONTEXT_CACHE_LOCK:
+            for key, entry in list(_CONTEXT_CACHES.items()):
+                if entry.name == name:
+                    del _CONTEXT_CACHES[key]
+        return True
+
+    def _payload(self, messages: Iterable[Message], model: str, temperature: float, max_tokens: int, use_context_cache: bool = True) -> Dict[str, Any]:
         system_text, non_system = split_system_messages(messages)
         contents = []
         for msg in non_system:
@@ -30,7 +170,7 @@ class GeminiClient(LLMClient):
             gemini_role = "model" if role == "assistant" else "user"
             contents.append({"role": gemini_role, "parts": [{"text": msg.get("content", "")} ]})
 
-        payload = {
+        payload: Dict[str, Any] = {
             "contents": contents,
             "generationConfig": {
                 "temperature": temperature,
@@ -38,19 +178,100 @@ class GeminiClient(LLMClient):
             },
         }
         if system_text:
-            payload["system_instruction"] = {"parts": [{"text": system_text}]}
+            cached_name = self._context_cache_name(model, system_text) if use_context_cache else None
+            if cached_name:
+                payload["cachedContent"] = cached_name
+            else:
+                payload["system_instruction"] = {"parts": [{"text": system_text}]}
+        return payload
 
+    def _send(self, messages: List[Message], model: str, temperature: float, max_tokens: int) -> LLMResponse:
+        payload = self._payload(messages, model, temperature, max_tokens)
         url = f"{self.api_url}/models/{model}:generateContent?key={self.api_key}"
         headers = {"Content-Type": "application/json"}
-        raw = post_json(url, payload, headers, timeout=self.timeout_seconds, max_retries=3)
-        candidates = raw.get("candidates", [])
-        text = ""
-        if candidates:
-            parts = candidates[0].get("content", {}).get("parts", [])
-            text = "".join([part.get("text", "") for part in parts])
+        try:
+            raw = post_json(url, payload, headers, timeout=self.timeout_seconds, max_retries=3, pool=self.transport)
+        except LLMRequestError as exc:
+            if not self._context_cache_rejected(payload, exc):
+                raise
+            payload = self._payload(messages, model, temperature, max_tokens, use_context_cache=False)
+            raw = post_json(url, payload, headers, timeout=self.timeout_seconds, max_retries=3, pool=self.transport)
         return LLMResponse(
-            text=text,
+            text=_candidate_text(raw),
             raw=raw,
             provider=self.provider,
             model=model,
+            **_usage_fields(raw.get("usageMetadata") or {}),
         )
+
+    def chat(
+        self,
+        messages: Iterable[Message],
+        model: str,
+        temperature: float = 0.7,
+        max_tokens: int = 1024,
+    ) -> LLMResponse:
+        messages = list(messages)
+        reservation = self._throttle(messages, max_tokens)
+        return self._settle(reservation, self._send(messages, model, temperature, max_tokens), messages)
+
+    async def achat(
+        self,
+        messages: Iterable[Message],
+        model: str,
+        temperature: float = 0.7,
+        max_tokens: int = 1024,
+    ) -> LLMResponse:
+        return await self._achat_throttled(self._send, messages, model, temperature, max_tokens)
+
+    def chat_stream(
+        self,
+        messages: Iterable[Message],
+        model: str,
+        temperature: float = 0.7,
+        max_tokens: int = 1024,
+    ) -> LLMStream:
+        messages = list(messages)
+        reservation = self._throttle(messages, max_tokens)
+        payload = self._payload(messages, model, temperature, max_tokens)
+        url = f"{self.api_url}/models/{model}:streamGenerateContent?alt=sse&key={self.api_key}"
+        headers = {"Content-Type": "application/json"}
+        try:
+            lines = post_stream(url, payload, headers, timeout=self.timeout_seconds, max_retries=3, pool=self.transport)
+        except LLMRequestError as exc:
+            if not self._context_cache_rejected(payload, exc):
+                raise
+            payload = self._payload(messages, model, temperature, max_tokens, use_context_cache=False)
+            lines = post_stream(url, payload, headers, timeout=self.timeout_seconds, max_retries=3, pool=self.transport)
+
+        def _chunks() -> Iterator[StreamChunk]:
+            with closing(lines):
+                for data in iter_sse_data(lines):
+                    event = json.loads(data)
+                    yield StreamChunk(text=_candidate_text(event), raw=event)
+
+        def _finalize(text: str, events: List[Any]) -> LLMResponse:
+            finish_reason = None
+            usage: Dict[str, Any] = {}
+            for event in events:
+                if not isinstance(event, dict):
+                    continue
+                for candidate in event.get("candidates") or []:
+                    if candidate.get("finishReason"):
+                        finish_reason = candidate.get("finishReason")
+                if isinstance(event.get("usageMetadata"), dict):
+                    usage = event["usageMetadata"]
+            candidate_out: Dict[str, Any] = {"content": {"role": "model", "parts": [{"text": text}]}}
+            if finish_reason:
+                candidate_out["finishReason"] = finish_reason
+            raw = {"candidates": [candidate_out], "usageMetadata": usage, "stream": True}
+            response = LLMResponse(
+                text=text,
+                raw=raw,
+                provider=self.provider,
+                model=model,
+                **_usage_fields(usage),
+            )
+            return self._settle(reservation, response, messages)
+
+        return LLMStream(_chunks(), _finalize)
@@ -2,13 +2,22 @@ from __future__ import annotations
 
 from datetime import datetime, timezone
 from pathlib import Path
-from typing import Any, Dict, Optional
+from typing import Any, Callable, Dict, Optional
+import atexit
 import json
+import logging
+import os
+import queue
 import re
+import threading
 
 from .errors import LLMRequestError
 from .types import LLMResponse, Message
-from bookforge.config.env import read_env_value
+from bookforge.config.env import env_snapshot
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_LLM_LOG_QUEUE = 64
 
 
 def _extract_text_payload(text: str) -> str:
@@ -169,15 +178,114 @@ def _write_pretty_text_log(log_path: Path, text: str) -> None:
 
 
 def should_log_llm() -> bool:
-    flag = read_env_value("BOOKFORGE_LOG_LLM") or ""
-    flag = str(flag).strip().lower()
-    return flag in {"1", "true", "yes", "on"}
+    return env_snapshot().get_bool("BOOKFORGE_LOG_LLM", False)
 
 
 def llm_log_dir(workspace: Path) -> Path:
     return workspace / "logs" / "llm"
 
 
+class _LogWriter:
+    # One daemon thread drains a bounded queue of log jobs, so JSON dumps, pretty
+    # printing and disk writes happen off the pipeline thread. A full queue blocks
+    # the submitter instead of dropping logs; flush() waits for everything queued.
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._queue: Optional["queue.Queue[Callable[[], None]]"] = None
+        self._pid: Optional[int] = None
+        self._stats: Dict[str, int] = {"submitted": 0, "written": 0, "failed": 0, "blocked": 0}
+
+    def _ensure_started(self) -> "queue.Queue[Callable[[], None]]":
+        with self._lock:
+            if self._queue is None or self._pid != os.getpid():
+                size = max(1, env_snapshot().get_int("BOOKFORGE_LLM_LOG_QUEUE", DEFAULT_LLM_LOG_QUEUE))
+                self._queue = queue.Queue(maxsize=size)
+                self._pid = os.getpid()
+                threading.Thread(target=self._drain, args=(self._queue,), name="bookforge-llm-log", daemon=True).start()
+            return self._queue
+
+    def _drain(self, jobs: "queue.Queue[Callable[[], None]]") -> None:
+        while True:
+            job = jobs.get()
+            try:
+                self._run(job)
+            finally:
+                jobs.task_done()
+
+    def _run(self, job: Callable[[], None]) -> None:
+        try:
+            job()
+        except Exception:
+            logger.warning("Failed to write LLM log", exc_info=True)
+            outcome = "failed"
+        else:
+            outcome = "written"
+        with self._lock:
+            self._stats[outcome] += 1
+
+    def submit(self, job: Callable[[], None]) -> None:
+        with self._lock:
+            self._stats["submitted"] += 1
+        if not env_snapshot().get_bool("BOOKFORGE_LLM_LOG_ASYNC", True):
+            self._run(job)
+            return
+        jobs = self._ensure_started()
+        try:
+            jobs.put_nowait(job)
+        except queue.Full:
+            with self._lock:
+                self._stats["blocked"] += 1
+            jobs.put(job)
+
+    def flush(self) -> None:
+        with self._lock:
+            jobs = self._queue if self._pid == os.getpid() else None
+        if jobs is not None:
+            jobs.join()
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            pending = self._queue.unfinished_tasks if self._queue is not None and self._pid == os.getpid() else 0
+            return dict(self._stats, pending=pending)
+
+
+_WRITER = _LogWriter()
+atexit.register(_WRITER.flush)
+
+
+def flush_llm_logs() -> None:
+    _WRITER.flush()
+
+
+def llm_log_writer_stats() -> Dict[str, int]:
+    return _WRITER.stats()
+
+
+def _write_log_files(
+    log_path: Path,
+    payload: Dict[str, Any],
+    messages: Optional[list[Message]],
+    write_text_log: Callable[[Path], None],
+) -> None:
+    system_text = ""
+    non_system: list[Message] = []
+    if messages:
+        system_text, non_system = _split_prompt_messages(messages)
+    if system_text or non_system:
+        payload["prompt"] = {
+            "system": system_text,
+            "messages": non_system,
+        }
+    log_path.write_text(json.dumps(payload, ensure_ascii=True, indent=2), encoding="utf-8")
+    try:
+        write_text_log(log_path)
+    except OSError:
+        pass
+    try:
+        _write_prompt_log(log_path, system_text, non_system)
+    except OSError:
+        pass
 
 
 def _format_error_payload(error: LLMRequestError) -> Dict[str, Any]:
@@ -218,10 +326,6 @@ def log_llm_response(
     timestamp = datetime.now(timezone.utc).strftime("%Y%m%d_%H%M%S")
     prefix = _log_scope_prefix(extra)
     log_path = log_dir / f"{prefix}{label}_{timestamp}.json"
-    system_text = ""
-    non_system: list[Message] = []
-    if messages:
-        system_text, non_system = _split_prompt_messages(messages)
     payload: Dict[str, Any] = {
         "label": label,
         "created_at": datetime.now(timezone.utc).replace(microsecond=0).isoformat().replace("+00:00", "Z"),
@@ -229,25 +333,21 @@ def log_llm_response(
         "model": response.model,
         "text": response.text,
         "raw": response.raw,
+        "usage": {
+            "prompt_tokens": response.prompt_tokens,
+            "completion_tokens": response.completion_tokens,
+            "total_tokens": response.total_tokens,
+            "cached_tokens": response.cached_tokens,
+            "response_cache_hit": response.cache_hit,
+        },
     }
     if request:
-        payload["request"] = request
+        payload["request"] = dict(request)
     if extra:
-        payload["extra"] = extra
-    if system_text or non_system:
-        payload["prompt"] = {
-            "system": system_text,
-            "messages": non_system,
-        }
-    log_path.write_text(json.dumps(payload, ensure_ascii=True, indent=2), encoding="utf-8")
-    try:
-        _write_pretty_text_log(log_path, response.text)
-    except OSError:
-        pass
-    try:
-        _write_prompt_log(log_path, system_text, non_system)
-    except OSError:
-        pass
+        payload["extra"] = dict(extra)
+    text = response.text
+    prompt = list(messages) if messages else None
+    _WRITER.submit(lambda: _write_log_files(log_path, payload, prompt, lambda path: _write_pretty_text_log(path, text)))
     return log_path
 
 def log_llm_error(
@@ -263,10 +363,6 @@ def log_llm_error(
     timestamp = datetime.now(timezone.utc).strftime("%Y%m%d_%H%M%S")
     prefix = _log_scope_prefix(extra)
     log_path = log_dir / f"{prefix}{label}_{timestamp}.json"
-    system_text = ""
-    non_system: list[Message] = []
-    if messages:
-        system_text, non_system = _split_prompt_messages(messages)
     payload: Dict[str, Any] = {
         "label": label,
         "created_at": datetime.now(timezone.utc).replace(microsecond=0).isoformat().replace("+00:00", "Z"),
@@ -274,20 +370,11 @@ def log_llm_error(
         "raw": error.raw_response,
     }
     if extra:
-        payload["extra"] = extra
-    if system_text or non_system:
-        payload["prompt"] = {
-            "system": system_text,
-            "messages": non_system,
-        }
-    log_path.write_text(json.dumps(payload, ensure_ascii=True, indent=2), encoding="utf-8")
-    try:
-        _write_error_text_log(log_path, error)
-    except OSError:
-        pass
-    try:
-        _write_prompt_log(log_path, system_text, non_system)
-    except OSError:
-        pass
+        payload["extra"] = dict(extra)
+    prompt = list(messages) if messages else None
+    _WRITER.submit(lambda: _write_log_files(log_path, payload, prompt, lambda path: _write_error_text_log(path, error)))
+    # Errors usually precede a pause or a crash; make sure they (and anything queued
+    # before them) are on disk before the caller decides what to do.
+    _WRITER.flush()
     return log_path
 
@@ -1,40 +1,35 @@
 from __future__ import annotations
 
-from typing import Iterable, Optional
+from contextlib import closing
+from typing import Any, Dict, Iterable, Iterator, List, Optional
+import json
 
 from .client import LLMClient
 from .rate_limiter import RateLimiter
-from .types import LLMResponse, Message
-from .utils import post_json
+from .stream import LLMStream
+from .transport import ConnectionPool
+from .types import LLMResponse, Message, StreamChunk
+from .utils import post_json, post_stream
 
 
 class OllamaClient(LLMClient):
-    def __init__(self, api_url: str, rate_limiter: Optional[RateLimiter] = None, timeout_seconds: int = 240, key_slot: Optional[str] = None) -> None:
-        super().__init__(provider="ollama", rate_limiter=rate_limiter, key_slot=key_slot)
+    def __init__(self, api_url: str, rate_limiter: Optional[RateLimiter] = None, timeout_seconds: int = 240, key_slot: Optional[str] = None, transport: Optional[ConnectionPool] = None) -> None:
+        super().__init__(provider="ollama", rate_limiter=rate_limiter, key_slot=key_slot, transport=transport)
         self.api_url = api_url.rstrip("/") + "/api/chat"
         self.timeout_seconds = timeout_seconds
 
-    def chat(
-        self,
-        messages: Iterable[Message],
-        model: str,
-        temperature: float = 0.7,
-        max_tokens: int = 1024,
-    ) -> LLMResponse:
-        self._throttle()
-        payload = {
+    def _payload(self, messages: Iterable[Message], model: str, temperature: float, max_tokens: int, stream: bool) -> Dict[str, Any]:
+        return {
             "model": model,
             "messages": list(messages),
-            "stream": False,
+            "stream": stream,
             "options": {
                 "temperature": temperature,
                 "num_predict": max_tokens,
             },
         }
-        headers = {"Content-Type": "application/json"}
-        raw = post_json(self.api_url, payload, headers, timeout=self.timeout_seconds, max_retries=3)
-        message = raw.get("message", {})
-        text = message.get("content", "")
+
+    def _response(self, text: str, raw: Dict[str, Any], model: str) -> LLMResponse:
         prompt_tokens = raw.get("prompt_eval_count")
         completion_tokens = raw.get("eval_count")
         total_tokens = None
@@ -49,3 +44,64 @@ class OllamaClient(LLMClient):
             completion_tokens=completion_tokens,
             total_tokens=total_tokens,
         )
+
+    def _send(self, messages: List[Message], model: str, temperature: float, max_tokens: int) -> LLMResponse:
+        payload = self._payload(messages, model, temperature, max_tokens, stream=False)
+        headers = {"Content-Type": "application/json"}
+        raw = post_json(self.api_url, payload, headers, timeout=self.timeout_seconds, max_retries=3, pool=self.transport)
+        message = raw.get("message", {})
+        return self._response(message.get("content", ""), raw, model)
+
+    def chat(
+        self,
+        messages: Iterable[Message],
+        model: str,
+        temperature: float = 0.7,
+        max_tokens: int = 1024,
+    ) -> LLMResponse:
+        messages = list(messages)
+        reservation = self._throttle(messages, max_tokens)
+        return self._settle(reservation, self._send(messages, model, temperature, max_tokens), messages)
+
+    async def achat(
+        self,
+        messages: Iterable[Message],
+        model: str,
+        temperature: float = 0.7,
+        max_tokens: int = 1024,
+    ) -> LLMResponse:
+        return await self._achat_throttled(self._send, messages, model, temperature, max_tokens)
+
+    def chat_stream(
+        self,
+        messages: Iterable[Message],
+        model: str,
+        temperature: float = 0.7,
+        max_tokens: int = 1024,
+    ) -> LLMStream:
+        messages = list(messages)
+        reservation = self._throttle(messages, max_tokens)
+        payload = self._payload(messages, model, temperature, max_tokens, stream=True)
+        headers = {"Content-Type": "application/json"}
+        lines = post_stream(self.api_url, payload, headers, timeout=self.timeout_seconds, max_retries=3, pool=self.transport)
+
+        def _chunks() -> Iterator[StreamChunk]:
+            with closing(lines):
+                for line in lines:
+                    if not line.strip():
+                        continue
+                    event = json.loads(line)
+                    message = event.get("message") or {}
+                    yield StreamChunk(text=message.get("content") or "", raw=event)
+
+        def _finalize(text: str, events: List[Any]) -> LLMResponse:
+            final: Dict[str, Any] = {}
+            for event in reversed(events):
+                if isinstance(event, dict) and event.get("done"):
+                    final = dict(event)
+                    break
+            final["message"] = {"role": "assistant", "content": text}
+            final["stream"] = True
+            return self._settle(reservation, self._response(text, final, model), messages)
+
+        return LLMStream(_chunks(), _finalize)
@@ -1,39 +1,48 @@
 from __future__ import annotations
 
-from typing import Iterable, Optional
+from contextlib import closing
+from typing import Any, Dict, Iterable, Iterator, List, Optional
+import json
 
 from .client import LLMClient
 from .rate_limiter import RateLimiter
-from .types import LLMResponse, Message
-from .utils import post_json
+from .stream import LLMStream
+from .transport import ConnectionPool
+from .types import LLMResponse, Message, StreamChunk
+from .utils import iter_sse_data, post_json, post_stream
+
+
+def _cached_tokens(usage: Dict[str, Any]) -> Optional[int]:
+    details = usage.get("prompt_tokens_details")
+    if not isinstance(details, dict):
+        return None
+    return details.get("cached_tokens")
 
 
 class OpenAIClient(LLMClient):
-    def __init__(self, api_key: str, api_url: str, rate_limiter: Optional[RateLimiter] = None, timeout_seconds: int = 240, key_slot: Optional[str] = None) -> None:
-        super().__init__(provider="openai", rate_limiter=rate_limiter, key_slot=key_slot)
+    def __init__(self, api_key: str, api_url: str, rate_limiter: Optional[RateLimiter] = None, timeout_seconds: int = 240, key_slot: Optional[str] = None, transport: Optional[ConnectionPool] = None) -> None:
+        super().__init__(provider="openai", rate_limiter=rate_limiter, key_slot=key_slot, transport=transport)
         self.api_key = api_key
         self.api_url = api_url
         self.timeout_seconds = timeout_seconds
 
-    def chat(
-        self,
-        messages: Iterable[Message],
-        model: str,
-        temperature: float = 0.7,
-        max_tokens: int = 1024,
-    ) -> LLMResponse:
-        self._throttle()
-        payload = {
+    def _payload(self, messages: Iterable[Message], model: str, temperature: float, max_tokens: int) -> Dict[str, Any]:
+        return {
             "model": model,
             "messages": list(messages),
             "temperature": temperature,
             "max_tokens": max_tokens,
         }
-        headers = {
+
+    def _headers(self) -> Dict[str, str]:
+        return {
             "Authorization": f"Bearer {self.api_key}",
             "Content-Type": "application/json",
         }
-        raw = post_json(self.api_url, payload, headers, timeout=self.timeout_seconds, max_retries=3)
+
+    def _send(self, messages: List[Message], model: str, temperature: float, max_tokens: int) -> LLMResponse:
+        payload = self._payload(messages, model, temperature, max_tokens)
+        raw = post_json(self.api_url, payload, self._headers(), timeout=self.timeout_seconds, max_retries=3, pool=self.transport)
         choice = raw.get("choices", [{}])[0]
         message = choice.get("message", {})
         text = message.get("content", "")
@@ -46,4 +55,79 @@ class OpenAIClient(LLMClient):
             prompt_tokens=usage.get("prompt_tokens"),
             completion_tokens=usage.get("completion_tokens"),
             total_tokens=usage.get("total_tokens"),
+            cached_tokens=_cached_tokens(usage),
         )
+
+    def chat(
+        self,
+        messages: Iterable[Message],
+        model: str,
+        temperature: float = 0.7,
+        max_tokens: int = 1024,
+    ) -> LLMResponse:
+        messages = list(messages)
+        reservation = self._throttle(messages, max_tokens)
+        return self._settle(reservation, self._send(messages, model, temperature, max_tokens), messages)
+
+    async def achat(
+        self,
+        messages: Iterable[Message],
+        model: str,
+        temperature: float = 0.7,
+        max_tokens: int = 1024,
+    ) -> LLMResponse:
+        return await self._achat_throttled(self._send, messages, model, temperature, max_tokens)
+
+    def chat_stream(
+        self,
+        messages: Iterable[Message],
+        model: str,
+        temperature: float = 0.7,
+        max_tokens: int = 1024,
+    ) -> LLMStream:
+        messages = list(messages)
+        reservation = self._throttle(messages, max_tokens)
+        payload = self._payload(messages, model, temperature, max_tokens)
+        payload["stream"] = True
+        payload["stream_options"] = {"include_usage": True}
+        lines = post_stream(self.api_url, payload, self._headers(), timeout=self.timeout_seconds, max_retries=3, pool=self.transport)
+
+        def _chunks() -> Iterator[StreamChunk]:
+            with closing(lines):
+                for data in iter_sse_data(lines):
+                    if data.strip() == "[DONE]":
+                        return
+                    event = json.loads(data)
+                    choices = event.get("choices") or []
+                    delta = choices[0].get("delta") or {} if choices else {}
+                    yield StreamChunk(text=delta.get("content") or "", raw=event)
+
+        def _finalize(text: str, events: List[Any]) -> LLMResponse:
+            finish_reason = None
+            usage: Dict[str, Any] = {}
+            for event in events:
+                if not isinstance(event, dict):
+                    continue
+                for choice in event.get("choices") or []:
+                    if choice.get("finish_reason"):
+                        finish_reason = choice.get("finish_reason")
+                if isinstance(event.get("usage"), dict):
+                    usage = event["usage"]
+            raw = {
+                "choices": [{"message": {"role": "assistant", "content": text}, "finish_reason": finish_reason}],
+                "usage": usage,
+                "stream": True,
+            }
+            response = LLMResponse(
+                text=text,
+                raw=raw,
+                provider=self.provider,
+                model=model,
+                prompt_tokens=usage.get("prompt_tokens"),
+                completion_tokens=usage.get("completion_tokens"),
+                total_tokens=usage.get("total_tokens"),
+                cached_tokens=_cached_tokens(usage),
+            )
+            return self._settle(reservation, response, messages)
+
+        return LLMStream(_chunks(), _finalize)
@@ -1,36 +1,322 @@
 from __future__ import annotations
 
 from collections import deque
-from dataclasses import dataclass
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Deque, Dict, Iterator, List, Optional, Tuple
+import asyncio
+import itertools
+import json
+import os
 import threading
 import time
 
+from bookforge.util.filelock import locked_file
+from bookforge.util.trace import span
+from .errors import LLMRequestError, QuotaViolation
+
+MINUTE_SECONDS = 60.0
+DAY_SECONDS = 86400.0
+DEFAULT_MAX_WAIT_SECONDS = 90.0
+# The shared file keeps the day window as per-minute slots, so it stays at most
+# 1440 rows instead of one row per request made that day.
+FILE_DAY_SLOT_SECONDS = 60.0
+
+
+_ENTRY_IDS = itertools.count(1)
+
+
+class _Entry:
+    __slots__ = ("id", "at", "tokens", "requests")
+
+    def __init__(self, id: str, at: float, tokens: int, requests: int = 1) -> None:
+        self.id = id
+        self.at = at
+        self.tokens = tokens
+        self.requests = requests
+
+
+class _Window:
+    # With a granularity, requests landing in the same aligned slot share one entry stamped
+    # with the newest time, so a slot expires no earlier than its last request would.
+    def __init__(self, name: str, seconds: float, max_requests: int, max_tokens: int, granularity: float = 0.0) -> None:
+        self.name = name
+        self.seconds = seconds
+        self.max_requests = max(0, int(max_requests or 0))
+        self.max_tokens = max(0, int(max_tokens or 0))
+        self.granularity = granularity
+        self.entries: Deque[_Entry] = deque()
+        self.requests = 0
+        self.tokens = 0
+        self.changed = False
+
+    def prune(self, now: float) -> None:
+        while self.entries and now - self.entries[0].at >= self.seconds:
+            entry = self.entries.popleft()
+            self.requests -= entry.requests
+            self.tokens -= entry.tokens
+
+    def delay(self, now: float, tokens: int) -> Tuple[float, str]:
+        # Seconds until a request of `tokens` fits, and which limit is binding.
+        wait = 0.0
+        reason = ""
+        if self.max_requests and self.requests >= self.max_requests:
+            freed = 0
+            for entry in self.entries:
+                freed += entry.requests
+                if self.requests - freed < self.max_requests:
+                    break
+            wait = entry.at + self.seconds - now
+            reason = "requests"
+        # An empty window always admits, so a request larger than the budget cannot deadlock.
+        if self.max_tokens and self.entries and self.tokens + tokens > self.max_tokens:
+            freed = 0
+            for entry in self.entries:
+                freed += entry.tokens
+                if self.tokens - freed + tokens <= self.max_tokens:
+                    break
+            token_wait = entry.at + self.seconds - now
+            if token_wait > wait:
+                wait = token_wait
+                reason = "tokens"
+        return max(0.0, wait), reason
+
+    def _slot(self, at: float) -> Optional[_Entry]:
+        if not self.granularity or not self.entries:
+            return None
+        last = self.entries[-1]
+        return last if last.at // self.granularity == at // self.granularity else None
+
+    def restore(self, entry_id: str, at: float, tokens: int, requests: int = 1) -> None:
+        self.entries.append(_Entry(entry_id, at, tokens, requests))
+        self.requests += requests
+        self.tokens += tokens
+
+    def add(self, entry_id: str, now: float, tokens: int) -> None:
+        self.changed = True
+        slot = self._slot(now)
+        if slot is None:
+            self.restore("" if self.granularity else entry_id, now, tokens)
+            return
+        slot.at = max(slot.at, now)
+        slot.requests += 1
+        slot.tokens += tokens
+        self.requests += 1
+        self.tokens += tokens
+
+    def adjust(self, entry_id: str, at: Optional[float], reserved: int, tokens: int) -> None:
+        if self.granularity:
+            # Slots carry no ids; the reservation's own time finds its slot.
+            if at is None:
+                return
+            for entry in reversed(self.entries):
+                if entry.at // self.granularity == at // self.granularity:
+                    entry.tokens += tokens - reserved
+                    self.tokens += tokens - reserved
+                    self.changed = True
+                    return
+            return
+        # Reconciles land shortly after the reservation, so search from the newest end.
+        for entry in reversed(self.entries):
+            if entry.id == entry_id:
+                self.tokens += tokens - entry.tokens
+                entry.tokens = tokens
+                self.changed = True
+                return
+
+    def limit(self, reason: str) -> int:
+        return self.max_requests if reason == "requests" else self.max_tokens
+
+
+@dataclass
+class Reservation:
+    tokens: int
+    entry_id: Optional[str] = None
+    # Limiter-clock time of the reservation; bucketed windows find their slot by it.
+    at: Optional[float] = None
+    settled: bool = False
+    # Taken once any rate-limit wait is over, so settle-time latency is provider time only.
+    started: float = field(default_factory=time.perf_counter)
+
+
 @dataclass
 class RateLimiter:
     requests_per_minute: int
+    tokens_per_minute: int = 0
+    requests_per_day: int = 0
+    tokens_per_day: int = 0
+    label: str = ""
+    max_wait_seconds: float = DEFAULT_MAX_WAIT_SECONDS
 
     def __post_init__(self) -> None:
-        self._timestamps = deque()
         self._lock = threading.Lock()
+        self._windows = self._new_windows()
+
+    def _new_windows(self) -> List[_Window]:
+        return [
+            window
+            for window in (
+                _Window("minute", MINUTE_SECONDS, self.requests_per_minute, self.tokens_per_minute),
+                _Window("day", DAY_SECONDS, self.requests_per_day, self.tokens_per_day),
+            )
+            if window.max_requests or window.max_tokens
+        ]
+
+    def _now(self) -> float:
+        return time.monotonic()
+
+    @contextmanager
+    def _state(self) -> Iterator[List[_Window]]:
+        with self._lock:
+            yield self._windows
 
     def wait(self) -> None:
-        if self.requests_per_minute <= 0:
-            return
-        window = 60.0
-        while True:
-            with self._lock:
-                now = time.monotonic()
-                while self._timestamps and now - self._timestamps[0] >= window:
-                    self._timestamps.popleft()
+        self.reserve(0)
 
-                if len(self._timestamps) < self.requests_per_minute:
-                    self._timestamps.append(now)
-                    return
+    def _try_reserve(self, tokens: int) -> Tuple[Optional[Reservation], float]:
+        with self._state() as windows:
+            now = self._now()
+            sleep_for = 0.0
+            binding: Optional[Tuple[_Window, str]] = None
+            for window in windows:
+                window.prune(now)
+                delay, reason = window.delay(now, tokens)
+                if delay > sleep_for:
+                    sleep_for = delay
+                    binding = (window, reason)
+            if binding is None:
+                reservation = Reservation(tokens=tokens, entry_id=f"{os.getpid()}-{next(_ENTRY_IDS)}", at=now)
+                for window in windows:
+                    window.add(reservation.entry_id, now, tokens)
+                return reservation, 0.0
+        window, reason = binding
+        if sleep_for > self.max_wait_seconds:
+            # Waiting out a daily quota in-process would stall the run for hours; surface it
+            # like a provider 429 so the runner pauses cleanly instead.
+            raise self._quota_error(window, reason, sleep_for)
+        return None, sleep_for
 
-                earliest = self._timestamps[0]
-                sleep_for = max(0.0, window - (now - earliest))
-            if sleep_for > 0:
+    def reserve(self, tokens: int) -> Reservation:
+        tokens = max(0, int(tokens))
+        if not self._windows:
+            return Reservation(tokens=tokens)
+        while True:
+            reservation, sleep_for = self._try_reserve(tokens)
+            if reservation is not None:
+                return reservation
+            with span("rate_limit_wait", "wait", seconds=sleep_for, tokens=tokens):
                 time.sleep(sleep_for)
-            else:
-                # If the window advanced while unlocked, re-check immediately.
-                continue
+
+    async def areserve(self, tokens: int) -> Reservation:
+        tokens = max(0, int(tokens))
+        if not self._windows:
+            return Reservation(tokens=tokens)
+        while True:
+            reservation, sleep_for = self._try_reserve(tokens)
+            if reservation is not None:
+                return reservation
+            with span("rate_limit_wait", "wait", seconds=sleep_for, tokens=tokens):
+                await asyncio.sleep(sleep_for)
+
+    def reconcile(self, reservation: Optional[Reservation], actual_tokens: Optional[int]) -> None:
+        if reservation is None or reservation.settled or reservation.entry_id is None or actual_tokens is None:
+            return
+        actual = max(0, int(actual_tokens))
+        with self._state() as windows:
+            for window in windows:
+                window.adjust(reservation.entry_id, reservation.at, reservation.tokens, actual)
+        reservation.tokens = actual
+        reservation.settled = True
+
+    def usage(self) -> Dict[str, int]:
+        with self._state() as windows:
+            now = self._now()
+            values = {}
+            for window in windows:
+                window.prune(now)
+                values[f"requests_per_{window.name}"] = window.requests
+                values[f"tokens_per_{window.name}"] = window.tokens
+            return values
+
+    def _quota_error(self, window: _Window, reason: str, retry_after: float) -> LLMRequestError:
+        metric = f"{reason}_per_{window.name}"
+        limit = window.limit(reason)
+        scope = self.label or "default"
+        return LLMRequestError(
+            status_code=429,
+            message=f"Local rate limit exhausted for {scope}: {metric}={limit}",
+            retry_after_seconds=retry_after,
+            quota_violations=[
+                QuotaViolation(
+                    quota_metric=f"bookforge/{metric}",
+                    quota_id="local_rate_limiter",
+                    quota_dimensions={"scope": scope},
+                    quota_value=str(limit),
+                )
+            ],
+            raw_response=None,
+        )
+
+
+@dataclass
+class FileRateLimiter(RateLimiter):
+    # Windows live in a JSON file so every local process on the same key shares one budget.
+    state_path: Optional[Path] = None
+
+    def __post_init__(self) -> None:
+        super().__post_init__()
+        if self.state_path is None:
+            raise ValueError("FileRateLimiter requires state_path")
+        self.state_path = Path(self.state_path)
+        self._lock_path = self.state_path.with_name(self.state_path.name + ".lock")
+
+    def _new_windows(self) -> List[_Window]:
+        windows = super()._new_windows()
+        for window in windows:
+            if window.seconds >= DAY_SECONDS:
+                window.granularity = FILE_DAY_SLOT_SECONDS
+        return windows
+
+    def _now(self) -> float:
+        # Monotonic clocks are per-process; the shared windows need a common timeline.
+        return time.time()
+
+    @contextmanager
+    def _state(self) -> Iterator[List[_Window]]:
+        with self._lock, locked_file(self._lock_path):
+            windows = self._load()
+            yield windows
+            # Pruning alone is redone on the next load; only new or adjusted entries need writing.
+            if any(window.changed for window in windows):
+                self._save(windows)
+
+    def _load(self) -> List[_Window]:
+        windows = self._new_windows()
+        try:
+            data = json.loads(self.state_path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return windows
+        stored = data.get("windows") if isinstance(data, dict) else None
+        if not isinstance(stored, dict):
+            return windows
+        for window in windows:
+            for item in stored.get(window.name) or []:
+                try:
+                    entry_id, at, tokens = str(item[0]), float(item[1]), int(item[2])
+                    requests = int(item[3]) if len(item) > 3 else 1
+                except (TypeError, ValueError, IndexError):
+                    continue
+                window.restore(entry_id, at, tokens, requests)
+        return windows
+
+    def _save(self, windows: List[_Window]) -> None:
+        payload: Dict[str, Any] = {
+            "windows": {
+                window.name: [[entry.id, entry.at, entry.tokens, entry.requests] for entry in window.entries]
+                for window in windows
+            }
+        }
+        tmp_path = self.state_path.with_name(f"{self.state_path.name}.{os.getpid()}.tmp")
+        tmp_path.write_text(json.dumps(payload, separators=(",", ":")), encoding="utf-8")
+        os.replace(tmp_path, self.state_path)
@@ -0,0 +1,55 @@
+from __future__ import annotations
+
+from typing import Any, Callable, Iterator, List, Optional
+
+from .types import LLMResponse, StreamChunk
+
+Finalizer = Callable[[str, List[Any]], LLMResponse]
+
+
+class LLMStream:
+    def __init__(self, chunks: Iterator[StreamChunk], finalize: Finalizer) -> None:
+        self._chunks = chunks
+        self._finalize = finalize
+        self._parts: List[str] = []
+        self._raw_events: List[Any] = []
+        self._response: Optional[LLMResponse] = None
+        self.aborted = False
+
+    @classmethod
+    def from_response(cls, response: LLMResponse) -> "LLMStream":
+        return cls(iter([StreamChunk(text=response.text, raw=response.raw)]), lambda _text, _raw: response)
+
+    def __iter__(self) -> Iterator[str]:
+        if self._response is not None:
+            return
+        for chunk in self._chunks:
+            if chunk.raw is not None:
+                self._raw_events.append(chunk.raw)
+            if chunk.text:
+                self._parts.append(chunk.text)
+                yield chunk.text
+            if self.aborted:
+                return
+
+    @property
+    def text(self) -> str:
+        return "".join(self._parts)
+
+    def close(self) -> None:
+        if self._response is not None:
+            return
+        self.aborted = True
+        close = getattr(self._chunks, "close", None)
+        if callable(close):
+            close()
+
+    @property
+    def response(self) -> LLMResponse:
+        if self._response is None:
+            if not self.aborted:
+                # Drain anything the caller left unread so usage metadata is captured.
+                for _ in self:
+                    pass
+            self._response = self._finalize(self.text, self._raw_events)
+        return self._response
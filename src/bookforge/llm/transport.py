@@ -0,0 +1,188 @@
+from __future__ import annotations
+
+from collections import deque
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Deque, Dict, Iterator, Mapping, Optional, Tuple
+import http.client
+import ssl
+import threading
+import urllib.parse
+import urllib.request
+
+from bookforge.config.env import read_int_env
+
+DEFAULT_MAX_IDLE_PER_HOST = 4
+
+PoolKey = Tuple[str, str, int]
+
+# Errors that mean an idle keep-alive socket was closed by the server while parked.
+_STALE_CONNECTION_ERRORS = (
+    http.client.RemoteDisconnected,
+    http.client.CannotSendRequest,
+    ConnectionResetError,
+    BrokenPipeError,
+)
+
+
+@dataclass
+class PoolStats:
+    hits: int = 0
+    misses: int = 0
+    stale_retries: int = 0
+    discarded: int = 0
+
+    def as_dict(self) -> Dict[str, int]:
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "stale_retries": self.stale_retries,
+            "discarded": self.discarded,
+        }
+
+
+def _proxy_for(scheme: str, host: str) -> Optional[urllib.parse.SplitResult]:
+    proxy = urllib.request.getproxies().get(scheme)
+    if not proxy or urllib.request.proxy_bypass(host):
+        return None
+    if "://" not in proxy:
+        proxy = f"http://{proxy}"
+    return urllib.parse.urlsplit(proxy)
+
+
+class ConnectionPool:
+    def __init__(self, max_idle_per_host: int = DEFAULT_MAX_IDLE_PER_HOST, ssl_context: Optional[ssl.SSLContext] = None) -> None:
+        self.max_idle_per_host = max(0, int(max_idle_per_host))
+        self._ssl_context = ssl_context or ssl.create_default_context()
+        self._idle: Dict[PoolKey, Deque[http.client.HTTPConnection]] = {}
+        self._lock = threading.Lock()
+        self._stats = PoolStats()
+
+    def stats(self) -> PoolStats:
+        with self._lock:
+            return PoolStats(**self._stats.as_dict())
+
+    def close(self) -> None:
+        with self._lock:
+            idle = [conn for bucket in self._idle.values() for conn in bucket]
+            self._idle.clear()
+        for conn in idle:
+            conn.close()
+
+    def _new_connection(self, key: PoolKey, timeout: float) -> http.client.HTTPConnection:
+        scheme, host, port = key
+        proxy = _proxy_for(scheme, host)
+        if proxy is not None and proxy.hostname:
+            proxy_port = proxy.port or (443 if proxy.scheme == "https" else 80)
+            if scheme == "https":
+                conn: http.client.HTTPConnection = http.client.HTTPSConnection(
+                    proxy.hostname, proxy_port, timeout=timeout, context=self._ssl_context
+                )
+                conn.set_tunnel(host, port)
+                return conn
+            return http.client.HTTPConnection(proxy.hostname, proxy_port, timeout=timeout)
+        if scheme == "https":
+            return http.client.HTTPSConnection(host, port, timeout=timeout, context=self._ssl_context)
+        return http.client.HTTPConnection(host, port, timeout=timeout)
+
+    def _acquire(self, key: PoolKey, timeout: float) -> Tuple[http.client.HTTPConnection, bool]:
+        with self._lock:
+            bucket = self._idle.get(key)
+            if bucket:
+                conn = bucket.pop()
+                self._stats.hits += 1
+                if conn.sock is not None:
+                    conn.sock.settimeout(timeout)
+                conn.timeout = timeout
+                return conn, True
+            self._stats.misses += 1
+        return self._new_connection(key, timeout), False
+
+    def _release(self, key: PoolKey, conn: http.client.HTTPConnection, response: http.client.HTTPResponse) -> None:
+        if response.will_close or not response.isclosed() or conn.sock is None:
+            conn.close()
+            return
+        with self._lock:
+            bucket = self._idle.setdefault(key, deque())
+            if len(bucket) < self.max_idle_per_host:
+                bucket.append(conn)
+                return
+            self._stats.discarded += 1
+        conn.close()
+
+    @staticmethod
+    def _route(url: str) -> Tuple[PoolKey, str]:
+        parts = urllib.parse.urlsplit(url)
+        scheme = parts.scheme.lower()
+        if scheme not in {"http", "https"} or not parts.hostname:
+            raise ValueError(f"Unsupported URL for HTTP transport: {url}")
+        port = parts.port or (443 if scheme == "https" else 80)
+        target = parts.path or "/"
+        if parts.query:
+            target += "?" + parts.query
+        if scheme == "http" and _proxy_for(scheme, parts.hostname) is not None:
+            target = url
+        return (scheme, parts.hostname, port), target
+
+    @staticmethod
+    def _send(
+        conn: http.client.HTTPConnection,
+        method: str,
+        target: str,
+        body: Optional[bytes],
+        headers: Mapping[str, str],
+    ) -> http.client.HTTPResponse:
+        conn.request(method, target, body=body, headers=dict(headers))
+        return conn.getresponse()
+
+    @contextmanager
+    def request(
+        self,
+        method: str,
+        url: str,
+        body: Optional[bytes],
+        headers: Mapping[str, str],
+        timeout: float,
+    ) -> Iterator[http.client.HTTPResponse]:
+        key, target = self._route(url)
+        conn, reused = self._acquire(key, timeout)
+        try:
+            response = self._send(conn, method, target, body, headers)
+        except _STALE_CONNECTION_ERRORS:
+            conn.close()
+            if not reused:
+                raise
+            with self._lock:
+                self._stats.stale_retries += 1
+            conn = self._new_connection(key, timeout)
+            try:
+                response = self._send(conn, method, target, body, headers)
+            except BaseException:
+                conn.close()
+                raise
+        except BaseException:
+            conn.close()
+            raise
+        try:
+            yield response
+        except BaseException:
+            conn.close()
+            raise
+        self._release(key, conn, response)
+
+
+_SHARED_POOL: Optional[ConnectionPool] = None
+_SHARED_POOL_LOCK = threading.Lock()
+
+
+def shared_pool() -> ConnectionPool:
+    global _SHARED_POOL
+    with _SHARED_POOL_LOCK:
+        if _SHARED_POOL is None:
+            size = read_int_env("BOOKFORGE_HTTP_POOL_SIZE", DEFAULT_MAX_IDLE_PER_HOST)
+            _SHARED_POOL = ConnectionPool(max_idle_per_host=size)
+        return _SHARED_POOL
+
+
+def transport_stats() -> Dict[str, int]:
+    return shared_pool().stats().as_dict()
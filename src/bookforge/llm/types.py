@@ -15,3 +15,11 @@ class LLMResponse:
     prompt_tokens: Optional[int] = None
     completion_tokens: Optional[int] = None
     total_tokens: Optional[int] = None
+    cached_tokens: Optional[int] = None
+    cache_hit: bool = False
+
+
+@dataclass
+class StreamChunk:
+    text: str
+    raw: Any = None
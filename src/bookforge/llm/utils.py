@@ -1,15 +1,18 @@
 ﻿from __future__ import annotations
 
-from typing import Iterable, List, Tuple
+from contextlib import ExitStack
+from typing import Iterable, Iterator, List, Optional, Tuple
+import http.client
 import json
 import logging
 import socket
 import time
-import urllib.error
-import urllib.request
+
+from bookforge.util.trace import span
 
 from .types import Message
 from .errors import LLMRequestError, QuotaViolation
+from .transport import ConnectionPool, shared_pool
 
 logger = logging.getLogger(__name__)
 
@@ -79,6 +82,14 @@ def _extract_error_details(body: str, status_code: int) -> LLMRequestError:
         raw_response=payload,
     )
 
+def _http_retry_delay(err: LLMRequestError, status: int, attempt: int, max_retries: int, retry_backoff: float) -> Optional[float]:
+    if attempt >= max_retries or status not in {429, 500, 502, 503, 504}:
+        return None
+    delay = err.retry_after_seconds
+    if delay is None:
+        delay = retry_backoff * (2 ** attempt)
+    return delay
+
 def post_json(
     url: str,
     payload: dict,
@@ -86,33 +97,23 @@ def post_json(
     timeout: int = 30,
     max_retries: int = 0,
     retry_backoff: float = 1.0,
+    pool: Optional[ConnectionPool] = None,
+    method: str = "POST",
 ) -> dict:
     def _retry_transport(reason: str, attempt_index: int) -> None:
         delay = retry_backoff * (2 ** attempt_index)
         logger.warning("Retrying after %.2fs due to %s", delay, reason)
-        time.sleep(delay)
+        with span("http_retry_backoff", "wait", reason=reason, seconds=delay):
+            time.sleep(delay)
 
+    transport = pool or shared_pool()
     attempt = 0
     while True:
         data = json.dumps(payload).encode("utf-8")
-        request = urllib.request.Request(url, data=data, headers=headers, method="POST")
         try:
-            with urllib.request.urlopen(request, timeout=timeout) as response:
+            with transport.request(method, url, data, headers, timeout) as response:
+                status = response.status
                 body = response.read().decode("utf-8")
-        except urllib.error.HTTPError as exc:
-            body = exc.read().decode("utf-8") if exc.fp else ""
-            err = _extract_error_details(body, exc.code)
-            if err.quota_violations:
-                logger.warning("Quota violation: %s", err)
-            if attempt < max_retries and exc.code in {429, 500, 502, 503, 504}:
-                delay = err.retry_after_seconds
-                if delay is None:
-                    delay = retry_backoff * (2 ** attempt)
-                logger.warning("Retrying after %.2fs due to HTTP %s", delay, exc.code)
-                time.sleep(delay)
-                attempt += 1
-                continue
-            raise err from exc
         except (TimeoutError, socket.timeout) as exc:
             if attempt < max_retries:
                 _retry_transport("read timeout", attempt)
@@ -121,22 +122,109 @@ def post_json(
             raise RuntimeError(
                 f"Transport timeout calling {url} after {attempt + 1} attempts (timeout={timeout}s): {exc}"
             ) from exc
-        except urllib.error.URLError as exc:
-            reason = getattr(exc, "reason", None)
-            if isinstance(reason, (TimeoutError, socket.timeout)):
-                if attempt < max_retries:
-                    _retry_transport("read timeout", attempt)
-                    attempt += 1
-                    continue
-                raise RuntimeError(
-                    f"Transport timeout calling {url} after {attempt + 1} attempts (timeout={timeout}s): {reason}"
-                ) from exc
+        except (OSError, http.client.HTTPException) as exc:
             if attempt < max_retries:
                 _retry_transport("transport error", attempt)
                 attempt += 1
                 continue
             raise RuntimeError(f"Transport error calling {url}: {exc}") from exc
+        if status >= 400:
+            err = _extract_error_details(body, status)
+            if err.quota_violations:
+                logger.warning("Quota violation: %s", err)
+            delay = _http_retry_delay(err, status, attempt, max_retries, retry_backoff)
+            if delay is not None:
+                logger.warning("Retrying after %.2fs due to HTTP %s", delay, status)
+                with span("http_retry_backoff", "wait", reason=f"HTTP {status}", seconds=delay):
+                    time.sleep(delay)
+                attempt += 1
+                continue
+            raise err
         try:
             return json.loads(body)
         except json.JSONDecodeError as exc:
             raise RuntimeError(f"Non-JSON response from {url}: {body}") from exc
+
+
+def _iter_response_lines(stack: ExitStack, response: http.client.HTTPResponse, url: str, timeout: int) -> Iterator[str]:
+    with stack:
+        try:
+            for raw_line in response:
+                yield raw_line.decode("utf-8").rstrip("\r\n")
+        except (TimeoutError, socket.timeout) as exc:
+            raise RuntimeError(f"Transport timeout streaming from {url} (timeout={timeout}s): {exc}") from exc
+        except (OSError, http.client.HTTPException) as exc:
+            raise RuntimeError(f"Transport error streaming from {url}: {exc}") from exc
+
+
+def post_stream(
+    url: str,
+    payload: dict,
+    headers: dict,
+    timeout: int = 30,
+    max_retries: int = 0,
+    retry_backoff: float = 1.0,
+    pool: Optional[ConnectionPool] = None,
+) -> Iterator[str]:
+    # Retries only cover failures before the first body byte; once lines are
+    # handed to the caller the stream is consumed and cannot be replayed.
+    def _retry_transport(reason: str, attempt_index: int) -> None:
+        delay = retry_backoff * (2 ** attempt_index)
+        logger.warning("Retrying after %.2fs due to %s", delay, reason)
+        with span("http_retry_backoff", "wait", reason=reason, seconds=delay):
+            time.sleep(delay)
+
+    transport = pool or shared_pool()
+    data = json.dumps(payload).encode("utf-8")
+    attempt = 0
+    while True:
+        stack = ExitStack()
+        try:
+            response = stack.enter_context(transport.request("POST", url, data, headers, timeout))
+        except (TimeoutError, socket.timeout) as exc:
+            if attempt < max_retries:
+                _retry_transport("read timeout", attempt)
+                attempt += 1
+                continue
+            raise RuntimeError(
+                f"Transport timeout calling {url} after {attempt + 1} attempts (timeout={timeout}s): {exc}"
+            ) from exc
+        except (OSError, http.client.HTTPException) as exc:
+            if attempt < max_retries:
+                _retry_transport("transport error", attempt)
+                attempt += 1
+                continue
+            raise RuntimeError(f"Transport error calling {url}: {exc}") from exc
+        if response.status >= 400:
+            with stack:
+                body = response.read().decode("utf-8")
+            err = _extract_error_details(body, response.status)
+            if err.quota_violations:
+                logger.warning("Quota violation: %s", err)
+            delay = _http_retry_delay(err, response.status, attempt, max_retries, retry_backoff)
+            if delay is not None:
+                logger.warning("Retrying after %.2fs due to HTTP %s", delay, response.status)
+                with span("http_retry_backoff", "wait", reason=f"HTTP {response.status}", seconds=delay):
+                    time.sleep(delay)
+                attempt += 1
+                continue
+            raise err
+        return _iter_response_lines(stack, response, url, timeout)
+
+
+def iter_sse_data(lines: Iterable[str]) -> Iterator[str]:
+    data_lines: List[str] = []
+    for line in lines:
+        if not line:
+            if data_lines:
+                yield "\n".join(data_lines)
+                data_lines = []
+            continue
+        if line.startswith(":"):
+            continue
+        field, _, value = line.partition(":")
+        if field != "data":
+            continue
+        data_lines.append(value[1:] if value.startswith(" ") else value)
+    if data_lines:
+        yield "\n".join(data_lines)
@@ -9,7 +9,11 @@
     style_anchor_path,
 )
 from .durable_state import (
+    CommitLedger,
+    DurableStateStore,
     durable_commits_path,
+    durable_journal_path,
+    durable_store,
     ensure_durable_state_files,
     ensure_item_registry,
     ensure_plot_devices,
@@ -20,14 +24,18 @@ from .durable_state import (
     load_plot_devices,
     plot_devices_index_path,
     plot_devices_path,
+    reconstruct_item_registry,
+    reconstruct_plot_devices,
     save_durable_commits,
     save_item_registry,
     save_plot_devices,
     snapshot_item_registry,
     snapshot_plot_devices,
 )
+from .registry_index import RegistryIndex
 
 __all__ = [
+    "CommitLedger",
     "ContinuityPack",
     "continuity_pack_path",
     "load_continuity_pack",
@@ -36,7 +44,11 @@ __all__ = [
     "save_continuity_pack",
     "save_style_anchor",
     "style_anchor_path",
+    "DurableStateStore",
+    "RegistryIndex",
     "durable_commits_path",
+    "durable_journal_path",
+    "durable_store",
     "ensure_durable_state_files",
     "ensure_item_registry",
     "ensure_plot_devices",
@@ -47,6 +59,8 @@ __all__ = [
     "load_plot_devices",
     "plot_devices_index_path",
     "plot_devices_path",
+    "reconstruct_item_registry",
+    "reconstruct_plot_devices",
     "save_durable_commits",
     "save_item_registry",
     "save_plot_devices",
@@ -1,14 +1,19 @@
 from __future__ import annotations
 
-from datetime import datetime, timezone
 from pathlib import Path
-from typing import Any, Dict, List, Set, Tuple
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple
+import atexit
+import copy
 import hashlib
 import json
 import re
-import shutil
+import threading
 
+from bookforge.config.env import read_int_env
 from bookforge.util.schema import SCHEMA_VERSION, validate_json
+from bookforge.util.trace import traced
+from .history import DeltaHistory, apply_json_patch, json_diff
+from .registry_index import DEVICE_INDEX_FIELDS, ITEM_INDEX_FIELDS, RegistryIndex
 
 
 def _context_root(book_root: Path) -> Path:
@@ -35,6 +40,10 @@ def durable_commits_path(book_root: Path) -> Path:
     return _context_root(book_root) / "durable_commits.json"
 
 
+def durable_journal_path(book_root: Path) -> Path:
+    return _context_root(book_root) / "durable_journal.jsonl"
+
+
 def _default_item_registry() -> Dict[str, Any]:
     return {
         "schema_version": SCHEMA_VERSION,
@@ -53,6 +62,7 @@ def _default_durable_commits() -> Dict[str, Any]:
     return {
         "schema_version": SCHEMA_VERSION,
         "applied_hashes": [],
+        "applied": {},
         "latest_scene": {"chapter": 0, "scene": 0},
     }
 
@@ -285,14 +295,10 @@ def _iter_character_state_files(book_root: Path) -> list[Path]:
 
 
 def _migrate_item_registry_from_character_states(book_root: Path) -> bool:
-    path = item_registry_path(book_root)
-    try:
-        payload = _normalize_registry(json.loads(path.read_text(encoding="utf-8")), "items")
-    except json.JSONDecodeError:
-        payload = _default_item_registry()
-
-    if payload.get("items"):
+    store = durable_store(book_root)
+    if store.peek_item_registry().get("items"):
         return False
+    payload = store.item_registry()
 
     items_by_id: Dict[str, Dict[str, Any]] = {}
     for state_path in _iter_character_state_files(book_root):
@@ -360,14 +366,10 @@ def _migrate_item_registry_from_character_states(book_root: Path) -> bool:
 
 
 def _migrate_plot_devices_from_continuity_hints(book_root: Path) -> bool:
-    path = plot_devices_path(book_root)
-    try:
-        payload = _normalize_registry(json.loads(path.read_text(encoding="utf-8")), "devices")
-    except json.JSONDecodeError:
-        payload = _default_plot_devices()
-
-    if payload.get("devices"):
+    store = durable_store(book_root)
+    if store.peek_plot_devices().get("devices"):
         return False
+    payload = store.plot_devices()
 
     thread_hints = _collect_thread_hints(book_root)
     if not thread_hints:
@@ -395,18 +397,402 @@ def _migrate_plot_devices_from_continuity_hints(book_root: Path) -> bool:
     return True
 
 
+def _normalized_item_registry(data: Any) -> Dict[str, Any]:
+    payload = _normalize_registry(data, "items")
+    payload["items"] = [
+        _normalize_item_entry_names(dict(item)) if isinstance(item, dict) else item
+        for item in payload.get("items", [])
+    ]
+    validate_json(payload, "item_registry")
+    return payload
+
+
+def _normalized_plot_devices(data: Any) -> Dict[str, Any]:
+    payload = _normalize_registry(data, "devices")
+    validate_json(payload, "plot_devices")
+    return payload
+
+
+def _normalized_durable_commits(data: Any) -> Dict[str, Any]:
+    if not isinstance(data, dict):
+        data = {}
+    hashes = data.get("applied_hashes")
+    if not isinstance(hashes, list):
+        hashes = []
+    hashes = list(dict.fromkeys(str(value).strip() for value in hashes if str(value).strip()))
+    raw_applied = data.get("applied") if isinstance(data.get("applied"), dict) else {}
+    applied = {value: dict(raw_applied[value]) for value in hashes if isinstance(raw_applied.get(value), dict)}
+    latest_scene_raw = data.get("latest_scene") if isinstance(data.get("latest_scene"), dict) else {}
+    return {
+        "schema_version": SCHEMA_VERSION,
+        "applied_hashes": hashes,
+        "applied": applied,
+        "latest_scene": {
+            "chapter": max(0, _coerce_int(latest_scene_raw.get("chapter"))),
+            "scene": max(0, _coerce_int(latest_scene_raw.get("scene"))),
+        },
+    }
+
+
+def _index_payload(payload: Dict[str, Any], list_key: str, id_key: str, index_key: str) -> Dict[str, Any]:
+    ids = []
+    for entry in payload.get(list_key, []):
+        if not isinstance(entry, dict):
+            continue
+        entry_id = str(entry.get(id_key) or "").strip()
+        if entry_id:
+            ids.append(entry_id)
+    return {"schema_version": SCHEMA_VERSION, index_key: ids}
+
+
+DEFAULT_DURABLE_CHECKPOINT_SCENES = 10
+DURABLE_COMMIT_HASH_CAP = 2000
+
+
+def _durable_checkpoint_scenes() -> int:
+    return max(1, read_int_env("BOOKFORGE_DURABLE_CHECKPOINT_SCENES", DEFAULT_DURABLE_CHECKPOINT_SCENES))
+
+
+def _document_hash(payload: Any) -> str:
+    encoded = json.dumps(payload, sort_keys=True, ensure_ascii=True, separators=(",", ":"))
+    return hashlib.sha1(encoded.encode("utf-8")).hexdigest()
+
+
+class CommitLedger:
+    # Applied mutation hashes in an insertion-ordered dict: O(1) idempotency checks, the
+    # oldest hash is evicted first once the cap is reached, and each hash keeps the
+    # (chapter, scene, phase) that applied it.
+
+    def __init__(self, payload: Dict[str, Any], cap: int = DURABLE_COMMIT_HASH_CAP) -> None:
+        self.cap = max(1, int(cap))
+        meta = payload.get("applied") if isinstance(payload.get("applied"), dict) else {}
+        self._applied: Dict[str, Dict[str, Any]] = {
+            value: dict(meta.get(value) or {}) for value in payload.get("applied_hashes", [])
+        }
+        latest = payload.get("latest_scene") if isinstance(payload.get("latest_scene"), dict) else {}
+        self.latest_scene = (_coerce_int(latest.get("chapter")), _coerce_int(latest.get("scene")))
+
+    def __contains__(self, mutation_hash: object) -> bool:
+        return mutation_hash in self._applied
+
+    def __len__(self) -> int:
+        return len(self._applied)
+
+    def entry(self, mutation_hash: str) -> Optional[Dict[str, Any]]:
+        entry = self._applied.get(mutation_hash)
+        return dict(entry) if entry is not None else None
+
+    def payload_with(self, mutation_hash: str, chapter: int, scene: int, phase: str) -> Dict[str, Any]:
+        applied = dict(self._applied)
+        applied.pop(mutation_hash, None)
+        applied[mutation_hash] = {"chapter": int(chapter), "scene": int(scene), "phase": str(phase)}
+        while len(applied) > self.cap:
+            del applied[next(iter(applied))]
+        return {
+            "schema_version": SCHEMA_VERSION,
+            "applied_hashes": list(applied),
+            "applied": {key: value for key, value in applied.items() if value},
+            "latest_scene": {"chapter": int(chapter), "scene": int(scene)},
+        }
+
+
+_FileStamp = Optional[Tuple[int, int]]
+
+
+def _file_stamp(path: Path) -> _FileStamp:
+    try:
+        stat = path.stat()
+    except OSError:
+        return None
+    return stat.st_mtime_ns, stat.st_size
+
+
+class DurableStateStore:
+    # Holds the normalized, validated durable files for one book in memory. Reads are
+    # served from memory while the file on disk is unchanged. Commits are appended to
+    # durable_journal.jsonl and only materialized into the JSON files at checkpoints
+    # (flush), so a crash between checkpoints is recovered by replaying the journal.
+    _DOCUMENTS = ("item_registry", "plot_devices", "durable_commits")
+
+    def __init__(self, book_root: Path) -> None:
+        self.book_root = book_root
+        self._lock = threading.RLock()
+        self._cache: Dict[str, Tuple[_FileStamp, Dict[str, Any]]] = {}
+        self._staged: Dict[str, Dict[str, Any]] = {}
+        self._pending: Dict[str, Dict[str, Any]] = {}
+        self._journal_scenes: Set[Tuple[int, int]] = set()
+        self._indexes: Dict[str, Tuple[Dict[str, Any], RegistryIndex]] = {}
+        self._ledger: Optional[Tuple[Dict[str, Any], CommitLedger]] = None
+        self._dirs_ready = False
+        self._recovered = False
+
+    def _path(self, name: str) -> Path:
+        if name == "item_registry":
+            return item_registry_path(self.book_root)
+        if name == "plot_devices":
+            return plot_devices_path(self.book_root)
+        return durable_commits_path(self.book_root)
+
+    def _read(self, name: str, path: Path) -> Dict[str, Any]:
+        if name == "item_registry":
+            return _normalized_item_registry(json.loads(path.read_text(encoding="utf-8")))
+        if name == "plot_devices":
+            return _normalized_plot_devices(json.loads(path.read_text(encoding="utf-8")))
+        try:
+            return _normalized_durable_commits(json.loads(path.read_text(encoding="utf-8")))
+        except json.JSONDecodeError:
+            return _normalized_durable_commits({})
+
+    def _current(self, name: str) -> Dict[str, Any]:
+        with self._lock:
+            if name in self._staged:
+                return self._staged[name]
+            if name in self._pending:
+                return self._pending[name]
+            path = self._path(name)
+            stamp = _file_stamp(path)
+            cached = self._cache.get(name)
+            if cached is not None and stamp is not None and cached[0] == stamp:
+                return cached[1]
+            payload = self._read(name, path)
+            self._cache[name] = (stamp, payload)
+            return payload
+
+    def ensure(self) -> None:
+        with self._lock:
+            context = _context_root(self.book_root)
+            if not self._dirs_ready:
+                (context / "items" / "history").mkdir(parents=True, exist_ok=True)
+                (context / "plot_devices" / "history").mkdir(parents=True, exist_ok=True)
+                self._dirs_ready = True
+            defaults = (
+                (items_index_path(self.book_root), lambda: {"schema_version": SCHEMA_VERSION, "item_ids": []}),
+                (plot_devices_index_path(self.book_root), lambda: {"schema_version": SCHEMA_VERSION, "device_ids": []}),
+                (durable_commits_path(self.book_root), _default_durable_commits),
+                (item_registry_path(self.book_root), _default_item_registry),
+                (plot_devices_path(self.book_root), _default_plot_devices),
+            )
+            for path, default in defaults:
+                if not path.exists():
+                    _write_json(path, default())
+            if not self._recovered:
+                self._recovered = True
+                self._recover()
+            self._current("item_registry")
+            self._current("plot_devices")
+
+    def _journal_records(self) -> List[Dict[str, Any]]:
+        path = durable_journal_path(self.book_root)
+        if not path.exists():
+            return []
+        records = []
+        for line in path.read_text(encoding="utf-8").splitlines():
+            if not line.strip():
+                continue
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                # A torn final line is the expected shape of a crash mid-append.
+                continue
+            if isinstance(record, dict):
+                records.append(record)
+        return records
+
+    def _recover(self) -> None:
+        records = self._journal_records()
+        if not records:
+            return
+        for name in self._DOCUMENTS:
+            changes = [
+                (record, record["documents"][name])
+                for record in records
+                if isinstance(record.get("documents"), dict) and isinstance(record["documents"].get(name), dict)
+            ]
+            if not changes:
+                continue
+            document = copy.deepcopy(self._current(name))
+            digest = _document_hash(document)
+            start = 0
+            # A checkpoint may have written some files before the crash; skip what they already hold.
+            for idx, (_, change) in enumerate(changes):
+                if change.get("after") == digest:
+                    start = idx + 1
+            for record, change in changes[start:]:
+                if _document_hash(document) != change.get("before"):
+                    raise ValueError(
+                        f"Durable journal record {record.get('mutation_hash')} does not apply to {name}; "
+                        f"inspect {durable_journal_path(self.book_root)}."
+                    )
+                document = apply_json_patch(document, change.get("ops") or [])
+            self._pending[name] = document
+        self.flush()
+
+    def commit(
+        self,
+        mutation_hash: str,
+        chapter: int,
+        scene: int,
+        phase: str,
+        item_registry: Dict[str, Any],
+        plot_devices: Dict[str, Any],
+        before_journal: Optional[Callable[[], None]] = None,
+    ) -> None:
+        # before_journal runs once the registries validate but before the record is
+        # appended: side writes (character files) must land first, or a crash in
+        # between would leave the hash recorded and the mutation never replayed.
+        with self._lock:
+            staged = {
+                "item_registry": _normalized_item_registry(copy.deepcopy(item_registry)),
+                "plot_devices": _normalized_plot_devices(copy.deepcopy(plot_devices)),
+                "durable_commits": self.ledger().payload_with(mutation_hash, chapter, scene, phase),
+            }
+            documents: Dict[str, Any] = {}
+            for name, after in staged.items():
+                before = self._current(name)
+                ops = json_diff(before, after)
+                if ops:
+                    documents[name] = {"before": _document_hash(before), "after": _document_hash(after), "ops": ops}
+            record = {
+                "mutation_hash": mutation_hash,
+                "chapter": int(chapter),
+                "scene": int(scene),
+                "phase": phase,
+                "documents": documents,
+            }
+            if before_journal is not None:
+                before_journal()
+            path = durable_journal_path(self.book_root)
+            path.parent.mkdir(parents=True, exist_ok=True)
+            with path.open("a", encoding="utf-8") as handle:
+                handle.write(json.dumps(record, ensure_ascii=True, separators=(",", ":")) + "\n")
+            self._pending.update(staged)
+            self._journal_scenes.add((int(chapter), int(scene)))
+            if len(self._journal_scenes) >= _durable_checkpoint_scenes():
+                self.flush()
+
+    def peek_item_registry(self) -> Dict[str, Any]:
+        # Shared, read-only view; callers must not mutate it.
+        return self._current("item_registry")
+
+    def peek_plot_devices(self) -> Dict[str, Any]:
+        return self._current("plot_devices")
+
+    def _registry_index(self, name: str, list_key: str, id_key: str, fields: Tuple[str, ...]) -> RegistryIndex:
+        with self._lock:
+            payload = self._current(name)
+            cached = self._indexes.get(name)
+            if cached is not None and cached[0] is payload:
+                return cached[1]
+            index = RegistryIndex(payload.get(list_key, []), id_key, fields)
+            self._indexes[name] = (payload, index)
+            return index
+
+    def item_index(self) -> RegistryIndex:
+        # Shared, read-only index over the current registry; copy entries before mutating.
+        return self._registry_index("item_registry", "items", "item_id", ITEM_INDEX_FIELDS)
+
+    def device_index(self) -> RegistryIndex:
+        return self._registry_index("plot_devices", "devices", "device_id", DEVICE_INDEX_FIELDS)
+
+    def ledger(self) -> CommitLedger:
+        # Shared and read-only; commit() derives the next ledger payload from it.
+        with self._lock:
+            payload = self._current("durable_commits")
+            if self._ledger is None or self._ledger[0] is not payload:
+                self._ledger = (payload, CommitLedger(payload))
+            return self._ledger[1]
+
+    def item_registry(self) -> Dict[str, Any]:
+        return copy.deepcopy(self._current("item_registry"))
+
+    def plot_devices(self) -> Dict[str, Any]:
+        return copy.deepcopy(self._current("plot_devices"))
+
+    def durable_commits(self) -> Dict[str, Any]:
+        return copy.deepcopy(self._current("durable_commits"))
+
+    def stage_item_registry(self, payload: Dict[str, Any]) -> None:
+        normalized = _normalized_item_registry(copy.deepcopy(payload))
+        with self._lock:
+            self._staged["item_registry"] = normalized
+
+    def stage_plot_devices(self, payload: Dict[str, Any]) -> None:
+        normalized = _normalized_plot_devices(copy.deepcopy(payload))
+        with self._lock:
+            self._staged["plot_devices"] = normalized
+
+    def stage_durable_commits(self, payload: Dict[str, Any]) -> None:
+        normalized = _normalized_durable_commits(payload)
+        with self._lock:
+            self._staged["durable_commits"] = normalized
+
+    def flush(self) -> None:
+        with self._lock:
+            for name in self._DOCUMENTS:
+                payload = self._staged.pop(name, None)
+                journaled = self._pending.pop(name, None)
+                if payload is None:
+                    payload = journaled
+                if payload is None:
+                    continue
+                path = self._path(name)
+                _write_json(path, payload)
+                if name == "item_registry":
+                    _write_json(items_index_path(self.book_root), _index_payload(payload, "items", "item_id", "item_ids"))
+                elif name == "plot_devices":
+                    _write_json(
+                        plot_devices_index_path(self.book_root),
+                        _index_payload(payload, "devices", "device_id", "device_ids"),
+                    )
+                self._cache[name] = (_file_stamp(path), payload)
+            # Every journaled change is now materialized, so the journal starts over.
+            journal = durable_journal_path(self.book_root)
+            if journal.exists():
+                journal.unlink()
+            self._journal_scenes.clear()
+
+
+_STORES_LOCK = threading.Lock()
+_STORES: Dict[str, DurableStateStore] = {}
+
+
+def durable_store(book_root: Path) -> DurableStateStore:
+    key = str(Path(book_root).resolve())
+    with _STORES_LOCK:
+        store = _STORES.get(key)
+        if store is None:
+            store = DurableStateStore(Path(book_root))
+            _STORES[key] = store
+        return store
+
+
+def forget_durable_store(book_root: Path) -> None:
+    with _STORES_LOCK:
+        _STORES.pop(str(Path(book_root).resolve()), None)
+
+
+def flush_durable_stores() -> None:
+    # Materialize journaled commits for every open book; also runs at interpreter exit
+    # so stops, pauses and crashes do not leave the registry files behind the journal.
+    with _STORES_LOCK:
+        stores = list(_STORES.values())
+    for store in stores:
+        try:
+            store.flush()
+        except OSError:
+            # The book directory may be gone by exit; the journal (if any) still replays.
+            continue
+
+
+atexit.register(flush_durable_stores)
+
+
 def ensure_item_registry(book_root: Path) -> Path:
     path = item_registry_path(book_root)
     if not path.exists():
         _write_json(path, _default_item_registry())
     else:
-        payload = _normalize_registry(json.loads(path.read_text(encoding="utf-8")), "items")
-        payload["items"] = [
-            _normalize_item_entry_names(dict(item)) if isinstance(item, dict) else item
-            for item in payload.get("items", [])
-        ]
-        validate_json(payload, "item_registry")
-        _write_json(path, payload)
+        durable_store(book_root).peek_item_registry()
     return path
 
 
@@ -415,151 +801,71 @@ def ensure_plot_devices(book_root: Path) -> Path:
     if not path.exists():
         _write_json(path, _default_plot_devices())
     else:
-        payload = _normalize_registry(json.loads(path.read_text(encoding="utf-8")), "devices")
-        validate_json(payload, "plot_devices")
-        _write_json(path, payload)
+        durable_store(book_root).peek_plot_devices()
     return path
 
 
+@traced("ensure_durable_state_files", "durable")
 def ensure_durable_state_files(book_root: Path) -> None:
-    context = _context_root(book_root)
-    (context / "items" / "history").mkdir(parents=True, exist_ok=True)
-    (context / "plot_devices" / "history").mkdir(parents=True, exist_ok=True)
-
-    if not items_index_path(book_root).exists():
-        _write_json(items_index_path(book_root), {"schema_version": SCHEMA_VERSION, "item_ids": []})
-    if not plot_devices_index_path(book_root).exists():
-        _write_json(plot_devices_index_path(book_root), {"schema_version": SCHEMA_VERSION, "device_ids": []})
-    if not durable_commits_path(book_root).exists():
-        _write_json(durable_commits_path(book_root), _default_durable_commits())
-
-    ensure_item_registry(book_root)
-    ensure_plot_devices(book_root)
+    durable_store(book_root).ensure()
     _migrate_item_registry_from_character_states(book_root)
     _migrate_plot_devices_from_continuity_hints(book_root)
 
 
 def load_item_registry(book_root: Path) -> Dict[str, Any]:
     ensure_durable_state_files(book_root)
-    payload = _normalize_registry(json.loads(item_registry_path(book_root).read_text(encoding="utf-8")), "items")
-    payload["items"] = [
-        _normalize_item_entry_names(dict(item)) if isinstance(item, dict) else item
-        for item in payload.get("items", [])
-    ]
-    validate_json(payload, "item_registry")
-    return payload
+    return durable_store(book_root).item_registry()
 
 
 def load_plot_devices(book_root: Path) -> Dict[str, Any]:
     ensure_durable_state_files(book_root)
-    payload = _normalize_registry(json.loads(plot_devices_path(book_root).read_text(encoding="utf-8")), "devices")
-    validate_json(payload, "plot_devices")
-    return payload
+    return durable_store(book_root).plot_devices()
 
 
 def save_item_registry(book_root: Path, payload: Dict[str, Any]) -> None:
-    normalized = _normalize_registry(payload, "items")
-    normalized["items"] = [
-        _normalize_item_entry_names(dict(item)) if isinstance(item, dict) else item
-        for item in normalized.get("items", [])
-    ]
-    validate_json(normalized, "item_registry")
-    _write_json(item_registry_path(book_root), normalized)
-    item_ids = []
-    for item in normalized.get("items", []):
-        if not isinstance(item, dict):
-            continue
-        item_id = str(item.get("item_id") or "").strip()
-        if item_id:
-            item_ids.append(item_id)
-    _write_json(items_index_path(book_root), {"schema_version": SCHEMA_VERSION, "item_ids": item_ids})
+    store = durable_store(book_root)
+    store.stage_item_registry(payload)
+    store.flush()
 
 
 def save_plot_devices(book_root: Path, payload: Dict[str, Any]) -> None:
-    normalized = _normalize_registry(payload, "devices")
-    validate_json(normalized, "plot_devices")
-    _write_json(plot_devices_path(book_root), normalized)
-    device_ids = []
-    for device in normalized.get("devices", []):
-        if not isinstance(device, dict):
-            continue
-        device_id = str(device.get("device_id") or "").strip()
-        if device_id:
-            device_ids.append(device_id)
-    _write_json(plot_devices_index_path(book_root), {"schema_version": SCHEMA_VERSION, "device_ids": device_ids})
+    store = durable_store(book_root)
+    store.stage_plot_devices(payload)
+    store.flush()
 
 
 def load_durable_commits(book_root: Path) -> Dict[str, Any]:
     ensure_durable_state_files(book_root)
-    path = durable_commits_path(book_root)
-    data: Any
-    try:
-        data = json.loads(path.read_text(encoding="utf-8"))
-    except json.JSONDecodeError:
-        data = {}
-    if not isinstance(data, dict):
-        data = {}
-    hashes = data.get("applied_hashes")
-    if not isinstance(hashes, list):
-        hashes = []
-    normalized_hashes = []
-    for value in hashes:
-        text = str(value).strip()
-        if text:
-            normalized_hashes.append(text)
-    latest_scene_raw = data.get("latest_scene") if isinstance(data.get("latest_scene"), dict) else {}
-    latest_scene = {
-        "chapter": max(0, _coerce_int(latest_scene_raw.get("chapter"))),
-        "scene": max(0, _coerce_int(latest_scene_raw.get("scene"))),
-    }
-
-    payload = {
-        "schema_version": SCHEMA_VERSION,
-        "applied_hashes": normalized_hashes,
-        "latest_scene": latest_scene,
-    }
-    _write_json(path, payload)
-    return payload
+    return durable_store(book_root).durable_commits()
 
 
 def save_durable_commits(book_root: Path, payload: Dict[str, Any]) -> None:
-    data = {
-        "schema_version": SCHEMA_VERSION,
-        "applied_hashes": [],
-        "latest_scene": {"chapter": 0, "scene": 0},
-    }
-    if isinstance(payload, dict):
-        hashes = payload.get("applied_hashes")
-        if isinstance(hashes, list):
-            data["applied_hashes"] = [str(item).strip() for item in hashes if str(item).strip()]
+    store = durable_store(book_root)
+    store.stage_durable_commits(payload)
+    store.flush()
 
-        latest_scene_raw = payload.get("latest_scene") if isinstance(payload.get("latest_scene"), dict) else {}
-        data["latest_scene"] = {
-            "chapter": max(0, _coerce_int(latest_scene_raw.get("chapter"))),
-            "scene": max(0, _coerce_int(latest_scene_raw.get("scene"))),
-        }
-    _write_json(durable_commits_path(book_root), data)
+
+def _item_history(book_root: Path) -> DeltaHistory:
+    return DeltaHistory(_context_root(book_root) / "items" / "history", "item_registry")
 
 
-def _history_stamp() -> str:
-    return datetime.now(timezone.utc).strftime("%Y%m%d_%H%M%S")
+def _plot_device_history(book_root: Path) -> DeltaHistory:
+    return DeltaHistory(_context_root(book_root) / "plot_devices" / "history", "plot_devices")
 
 
 def snapshot_item_registry(book_root: Path, chapter: int, scene: int) -> Path:
     ensure_durable_state_files(book_root)
-    src = item_registry_path(book_root)
-    target = _context_root(book_root) / "items" / "history" / (
-        f"ch{chapter:03d}_sc{scene:03d}_item_registry_{_history_stamp()}.json"
-    )
-    shutil.copyfile(src, target)
-    return target
+    return _item_history(book_root).record(chapter, scene, durable_store(book_root).peek_item_registry())
 
 
 def snapshot_plot_devices(book_root: Path, chapter: int, scene: int) -> Path:
     ensure_durable_state_files(book_root)
-    src = plot_devices_path(book_root)
-    target = _context_root(book_root) / "plot_devices" / "history" / (
-        f"ch{chapter:03d}_sc{scene:03d}_plot_devices_{_history_stamp()}.json"
-    )
-    shutil.copyfile(src, target)
-    return target
+    return _plot_device_history(book_root).record(chapter, scene, durable_store(book_root).peek_plot_devices())
+
+
+def reconstruct_item_registry(book_root: Path, chapter: int, scene: int) -> Optional[Dict[str, Any]]:
+    return _item_history(book_root).reconstruct(chapter, scene)
+
+
+def reconstruct_plot_devices(book_root: Path, chapter: int, scene: int) -> Optional[Dict[str, Any]]:
+    return _plot_device_history(book_root).reconstruct(chapter, scene)
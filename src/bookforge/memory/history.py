@@ -0,0 +1,243 @@
+from __future__ import annotations
+
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, List, NamedTuple, Optional, Tuple
+import copy
+import json
+import threading
+
+from bookforge.config.env import read_int_env
+
+DEFAULT_CHECKPOINT_INTERVAL = 20
+
+_MISSING = object()
+
+
+def _escape(token: Any) -> str:
+    return str(token).replace("~", "~0").replace("/", "~1")
+
+
+def _unescape(token: str) -> str:
+    return token.replace("~1", "/").replace("~0", "~")
+
+
+def json_diff(before: Any, after: Any, path: str = "") -> List[Dict[str, Any]]:
+    # JSON-patch style ops. Lists are diffed element-wise while most elements keep their
+    # position (registries append and edit in place); a shifted list is replaced wholesale.
+    if type(before) is not type(after):
+        return [{"op": "replace", "path": path, "value": copy.deepcopy(after)}]
+    if isinstance(before, dict):
+        ops: List[Dict[str, Any]] = []
+        for key in before:
+            if key not in after:
+                ops.append({"op": "remove", "path": f"{path}/{_escape(key)}"})
+        for key, value in after.items():
+            child = f"{path}/{_escape(key)}"
+            if key not in before:
+                ops.append({"op": "add", "path": child, "value": copy.deepcopy(value)})
+            else:
+                ops.extend(json_diff(before[key], value, child))
+        return ops
+    if isinstance(before, list):
+        dropped = _dropped_head(before, after)
+        if dropped:
+            kept = len(before) - dropped
+            ops = [{"op": "remove", "path": f"{path}/0"} for _ in range(dropped)]
+            ops.extend(
+                {"op": "add", "path": f"{path}/{idx}", "value": copy.deepcopy(after[idx])}
+                for idx in range(kept, len(after))
+            )
+            return ops
+        shared = min(len(before), len(after))
+        ops = []
+        changed = 0
+        for idx in range(shared):
+            element_ops = json_diff(before[idx], after[idx], f"{path}/{idx}")
+            if element_ops:
+                changed += 1
+                ops.extend(element_ops)
+        if changed > 1 and changed * 2 > shared:
+            return [{"op": "replace", "path": path, "value": copy.deepcopy(after)}]
+        for idx in range(len(before) - 1, shared - 1, -1):
+            ops.append({"op": "remove", "path": f"{path}/{idx}"})
+        for idx in range(shared, len(after)):
+            ops.append({"op": "add", "path": f"{path}/{idx}", "value": copy.deepcopy(after[idx])})
+        return ops
+    if before != after:
+        return [{"op": "replace", "path": path, "value": copy.deepcopy(after)}]
+    return []
+
+
+def _dropped_head(before: List[Any], after: List[Any], limit: int = 16) -> int:
+    # Capped rings (e.g. applied hash ledgers) evict from the head; spot that so the
+    # delta is a few removes/adds instead of a full rewrite of the shifted list.
+    if not before or not after or before[0] == after[0]:
+        return 0
+    for dropped in range(1, min(len(before), limit) + 1):
+        kept = len(before) - dropped
+        if kept <= len(after) and before[dropped:] == after[:kept]:
+            return dropped
+    return 0
+
+
+def apply_json_patch(document: Any, ops: List[Dict[str, Any]]) -> Any:
+    for op in ops:
+        path = str(op.get("path") or "")
+        value = copy.deepcopy(op.get("value"))
+        if not path:
+            document = value
+            continue
+        tokens = [_unescape(token) for token in path.split("/")[1:]]
+        parent = document
+        for token in tokens[:-1]:
+            parent = parent[int(token)] if isinstance(parent, list) else parent[token]
+        last = tokens[-1]
+        kind = op.get("op")
+        if isinstance(parent, list):
+            index = int(last)
+            if kind == "add":
+                parent.insert(index, value)
+            elif kind == "remove":
+                del parent[index]
+            else:
+                parent[index] = value
+        elif kind == "remove":
+            parent.pop(last, None)
+        else:
+            parent[last] = value
+    return document
+
+
+def _history_stamp() -> str:
+    return datetime.now(timezone.utc).strftime("%Y%m%d_%H%M%S")
+
+
+def _checkpoint_interval() -> int:
+    return max(1, read_int_env("BOOKFORGE_HISTORY_CHECKPOINT_INTERVAL", DEFAULT_CHECKPOINT_INTERVAL))
+
+
+_HEADS_LOCK = threading.Lock()
+_HEADS: Dict[str, "_Head"] = {}
+_CHECKPOINT_MARK = '"checkpoint":'
+
+
+class _Head(NamedTuple):
+    # What record() needs from the journal, cached against its (mtime, size) so a warm
+    # process neither rereads nor reparses it.
+    stamp: Tuple[int, int]
+    document: Any
+    since_checkpoint: int
+    last_key: Optional[Tuple[int, int]]
+    count: int
+
+
+def _parse_record(line: str) -> Optional[Dict[str, Any]]:
+    try:
+        record = json.loads(line)
+    except json.JSONDecodeError:
+        return None
+    return record if isinstance(record, dict) else None
+
+
+class DeltaHistory:
+    # History for one JSON document: full checkpoint files every few records and a
+    # JSONL journal of deltas in between.
+
+    def __init__(self, directory: Path, name: str) -> None:
+        self.directory = directory
+        self.name = name
+        self.journal_path = directory / f"{name}.deltas.jsonl"
+
+    def _tail(self, until: Optional[Tuple[int, int]] = None) -> Tuple[List[Dict[str, Any]], int]:
+        # Each checkpoint supersedes everything before it, so only the last one at or before
+        # `until` and the deltas after it are parsed. Returns those records and the line count.
+        if not self.journal_path.exists():
+            return [], 0
+        lines = [line for line in self.journal_path.read_text(encoding="utf-8").splitlines() if line.strip()]
+        start = 0
+        for idx in range(len(lines) - 1, -1, -1):
+            if _CHECKPOINT_MARK not in lines[idx]:
+                continue
+            record = _parse_record(lines[idx])
+            if record is not None and record.get("checkpoint") and (until is None or _record_key(record) <= until):
+                start = idx
+                break
+        records = [record for record in map(_parse_record, lines[start:]) if record is not None]
+        return records, len(lines)
+
+    def _load_checkpoint(self, record: Dict[str, Any]) -> Any:
+        return json.loads((self.directory / str(record.get("checkpoint"))).read_text(encoding="utf-8"))
+
+    def _replay(self, records: List[Dict[str, Any]], until: Optional[Tuple[int, int]] = None) -> Any:
+        document: Any = _MISSING
+        for record in records:
+            if until is not None and _record_key(record) > until:
+                break
+            if record.get("checkpoint"):
+                document = self._load_checkpoint(record)
+            elif document is not _MISSING:
+                document = apply_json_patch(document, record.get("ops") or [])
+        return document
+
+    def _stamp(self) -> Optional[Tuple[int, int]]:
+        try:
+            stat = self.journal_path.stat()
+        except OSError:
+            return None
+        return stat.st_mtime_ns, stat.st_size
+
+    def _head(self) -> _Head:
+        stamp = self._stamp()
+        if stamp is None:
+            return _Head((0, 0), _MISSING, 0, None, 0)
+        with _HEADS_LOCK:
+            cached = _HEADS.get(str(self.journal_path))
+        if cached is not None and cached.stamp == stamp:
+            return cached._replace(document=copy.deepcopy(cached.document))
+        records, count = self._tail()
+        since_checkpoint = len(records) - 1 if records and records[0].get("checkpoint") else len(records)
+        last_key = _record_key(records[-1]) if records else None
+        return _Head(stamp, self._replay(records), since_checkpoint, last_key, count)
+
+    def record(self, chapter: int, scene: int, document: Any) -> Path:
+        self.directory.mkdir(parents=True, exist_ok=True)
+        head = self._head()
+        previous = head.document
+        entry: Dict[str, Any] = {"chapter": int(chapter), "scene": int(scene), "recorded_at": _history_stamp()}
+        written = self.journal_path
+        if previous is _MISSING or head.since_checkpoint + 1 >= _checkpoint_interval():
+            checkpoint = self.directory / f"ch{chapter:03d}_sc{scene:03d}_{self.name}_{entry['recorded_at']}.json"
+            if checkpoint.exists():
+                checkpoint = checkpoint.with_name(f"{checkpoint.stem}_{head.count}.json")
+            checkpoint.write_text(json.dumps(document, ensure_ascii=True, indent=2), encoding="utf-8")
+            entry["checkpoint"] = checkpoint.name
+            written = checkpoint
+            since_checkpoint = 0
+        else:
+            ops = json_diff(previous, document)
+            if not ops and head.last_key == (int(chapter), int(scene)):
+                return written
+            entry["ops"] = ops
+            since_checkpoint = head.since_checkpoint + 1
+        with self.journal_path.open("a", encoding="utf-8") as handle:
+            handle.write(json.dumps(entry, ensure_ascii=True, separators=(",", ":")) + "\n")
+        stamp = self._stamp() or (0, 0)
+        with _HEADS_LOCK:
+            _HEADS[str(self.journal_path)] = _Head(
+                stamp, copy.deepcopy(document), since_checkpoint, (int(chapter), int(scene)), head.count + 1
+            )
+        return written
+
+    def reconstruct(self, chapter: int, scene: int) -> Optional[Any]:
+        until = (int(chapter), int(scene))
+        records, _ = self._tail(until)
+        document = self._replay(records, until=until)
+        return None if document is _MISSING else document
+
+
+def _record_key(record: Dict[str, Any]) -> Tuple[int, int]:
+    try:
+        return int(record.get("chapter") or 0), int(record.get("scene") or 0)
+    except (TypeError, ValueError):
+        return 0, 0
@@ -0,0 +1,111 @@
+from __future__ import annotations
+
+from typing import Any, Callable, Dict, Iterable, List, Optional, Set, Tuple
+
+ITEM_INDEX_FIELDS = ("custodian", "carrier_ref", "location_ref", "linked_threads", "linked_device_id")
+DEVICE_INDEX_FIELDS = ("custody_ref", "custody_scope", "linked_threads", "linked_item_id")
+
+
+def _index_values(value: Any) -> List[str]:
+    if isinstance(value, list):
+        raw = value
+    elif isinstance(value, (str, int)):
+        raw = [value]
+    else:
+        return []
+    values = []
+    for item in raw:
+        if isinstance(item, (str, int)):
+            token = str(item).strip()
+            if token:
+                values.append(token)
+    return values
+
+
+class RegistryIndex:
+    # Registry entries keyed by id, in their original order, with secondary indexes
+    # kept in step on every upsert. Entries without an id and repeated ids are kept
+    # (so nothing is dropped on save) but are not addressable, matching the old
+    # first-match list scan.
+
+    def __init__(self, entries: Iterable[Any], id_key: str, fields: Tuple[str, ...]) -> None:
+        self.id_key = id_key
+        self.fields = fields
+        self._rows: Dict[Any, Any] = {}
+        self._by: Dict[str, Dict[str, Set[str]]] = {field: {} for field in fields}
+        self._anonymous = 0
+        for entry in entries:
+            entry_id = self._entry_id(entry)
+            if not entry_id or entry_id in self._rows:
+                self._add_anonymous(entry)
+                continue
+            self._rows[entry_id] = entry
+            self._index(entry_id, entry)
+
+    def _entry_id(self, entry: Any) -> str:
+        if not isinstance(entry, dict):
+            return ""
+        return str(entry.get(self.id_key) or "").strip()
+
+    def _add_anonymous(self, entry: Any) -> None:
+        self._anonymous += 1
+        self._rows[("", self._anonymous)] = entry
+
+    def _index(self, entry_id: str, entry: Dict[str, Any]) -> None:
+        for field in self.fields:
+            bucket = self._by[field]
+            for value in _index_values(entry.get(field)):
+                bucket.setdefault(value, set()).add(entry_id)
+
+    def _unindex(self, entry_id: str, entry: Dict[str, Any]) -> None:
+        for field in self.fields:
+            bucket = self._by[field]
+            for value in _index_values(entry.get(field)):
+                ids = bucket.get(value)
+                if ids is None:
+                    continue
+                ids.discard(entry_id)
+                if not ids:
+                    del bucket[value]
+
+    def __contains__(self, entry_id: object) -> bool:
+        return isinstance(entry_id, str) and entry_id in self._rows
+
+    def __len__(self) -> int:
+        return len(self._rows)
+
+    def get(self, entry_id: str) -> Optional[Dict[str, Any]]:
+        entry = self._rows.get(str(entry_id).strip())
+        return entry if isinstance(entry, dict) else None
+
+    def ids(self) -> List[str]:
+        return [key for key in self._rows if isinstance(key, str)]
+
+    def upsert(self, entry: Dict[str, Any]) -> None:
+        entry_id = self._entry_id(entry)
+        if not entry_id:
+            raise ValueError(f"{self.id_key} is required for registry entries.")
+        previous = self._rows.get(entry_id)
+        if isinstance(previous, dict):
+            self._unindex(entry_id, previous)
+        self._rows[entry_id] = entry
+        self._index(entry_id, entry)
+
+    def lookup(self, field: str, values: Iterable[Any]) -> Set[str]:
+        bucket = self._by[field]
+        found: Set[str] = set()
+        for value in values:
+            token = str(value).strip()
+            if token in bucket:
+                found |= bucket[token]
+        return found
+
+    def lookup_where(self, field: str, predicate: Callable[[str], bool]) -> Set[str]:
+        found: Set[str] = set()
+        for value, ids in self._by[field].items():
+            if predicate(value):
+                found |= ids
+        return found
+
+    def entries(self) -> List[Any]:
+        return list(self._rows.values())
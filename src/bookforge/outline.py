@@ -427,7 +427,7 @@ def generate_outline(
 
     if client is None:
         config = load_config()
-        client = get_llm_client(config, phase="planner")
+        client = get_llm_client(config, phase="planner", workspace=workspace)
         if model is None:
             model = resolve_model("planner", config)
     elif model is None:
@@ -10,9 +10,9 @@ from bookforge.pipeline.durable import _durable_state_context
 from bookforge.pipeline.io import _log_scope
 from bookforge.pipeline.llm_ops import _chat
 from bookforge.pipeline.parse import _extract_json
+from bookforge.pipeline.budget import _budgeted_prompt
 from bookforge.pipeline.prompts import _resolve_template, _system_prompt_for_phase
 from bookforge.pipeline.state_apply import _summary_from_state, _summary_list
-from bookforge.prompt.renderer import render_template_file
 
 
 def _generate_continuity_pack(
@@ -29,13 +29,15 @@ def _generate_continuity_pack(
     durable_expand_ids: Optional[List[str]] = None,
 ) -> Dict[str, Any]:
     continuity_template = _resolve_template(book_root, "continuity_pack.md")
-    system_prompt = _system_prompt_for_phase(system_path, book_root / "outline" / "outline.json", "continuity_pack")
+    system_prompt = _system_prompt_for_phase(system_path, book_root / "outline" / "outline.json", "continuity_pack", scene_card.get("chapter"))
 
     summary = _summary_from_state(state)
     recent_facts = _summary_list(summary.get("key_facts_ring", []))
     durable = _durable_state_context(book_root, state, scene_card, durable_expand_ids)
 
-    message = render_template_file(
+    message, budget = _budgeted_prompt(
+        book_root,
+        "continuity_pack",
         continuity_template,
         {
             "scene_card": scene_card,
@@ -48,7 +50,11 @@ def _generate_continuity_pack(
             "item_registry": durable.get("item_registry", {}),
             "plot_devices": durable.get("plot_devices", {}),
         },
+        system_prompt,
+        scene_card=scene_card,
+        provider=client.provider,
     )
+    scope = dict(_log_scope(book_root, scene_card), budget=budget)
 
     response = _chat(
         workspace,
@@ -61,7 +67,7 @@ def _generate_continuity_pack(
         model=model,
         temperature=0.2,
         max_tokens=_continuity_max_tokens(),
-        log_extra=_log_scope(book_root, scene_card),
+        log_extra=scope,
     )
 
     raw = response.text or ""
@@ -1,24 +1,39 @@
 from __future__ import annotations
 
 from pathlib import Path
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, List, Optional, Tuple
 import re
+import threading
 
 from bookforge.llm.client import LLMClient
 from bookforge.llm.types import Message
-from bookforge.pipeline.config import _lint_max_tokens, _lint_mode
+from bookforge.pipeline.config import _lint_max_tokens, _lint_mode, _lint_prepass_enabled
 from bookforge.pipeline.durable import _durable_state_context
 from bookforge.pipeline.io import _log_scope
 from bookforge.pipeline.lint import _stat_mismatch_issues, _pov_drift_issues, _heuristic_invariant_issues, _durable_scene_constraint_issues, _linked_durable_consistency_issues, _merged_character_states_for_lint, _post_state_with_character_continuity, _normalize_lint_report, _ui_gate_issues, _internal_id_issues
 from bookforge.pipeline.llm_ops import _chat, _json_retry_count, _lint_status_from_issues
 from bookforge.pipeline.parse import _extract_authoritative_surfaces, _extract_json
+from bookforge.pipeline.budget import _budgeted_prompt
 from bookforge.pipeline.prompts import _resolve_template, _system_prompt_for_phase
 from bookforge.pipeline.continuity import _global_continuity_stats
 from bookforge.pipeline.state_apply import _summary_from_state
-from bookforge.prompt.renderer import render_template_file
 from bookforge.util.schema import validate_json
 
 
+_PREPASS_LOCK = threading.Lock()
+_PREPASS_STATS: Dict[str, int] = {"checked": 0, "llm_calls_saved": 0}
+
+
+def _record_prepass(saved: bool) -> None:
+    with _PREPASS_LOCK:
+        _PREPASS_STATS["checked"] += 1
+        if saved:
+            _PREPASS_STATS["llm_calls_saved"] += 1
+
+
+def lint_prepass_stats() -> Dict[str, int]:
+    with _PREPASS_LOCK:
+        return dict(_PREPASS_STATS)
 
 
 def _invariant_conflict_issue(post_invariants: List[str], character_states: List[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
@@ -209,6 +224,34 @@ def _invariant_conflict_issue(post_invariants: List[str], character_states: List
     return None
 
 
+def _heuristic_lint_issues(
+    prose: str,
+    post_state: Dict[str, Any],
+    scene_card: Dict[str, Any],
+    post_invariants: List[str],
+    lint_character_states: List[Dict[str, Any]],
+    pov: Optional[str],
+    durable_post: Dict[str, Any],
+    authoritative_surfaces: List[Dict[str, Any]],
+) -> Tuple[Optional[Dict[str, Any]], List[Dict[str, Any]]]:
+    incoherent_issue = _invariant_conflict_issue(post_invariants, lint_character_states)
+    if incoherent_issue:
+        return incoherent_issue, []
+    strict = _lint_mode() == "strict"
+    heuristic_issues = _stat_mismatch_issues(
+        prose,
+        lint_character_states,
+        _global_continuity_stats(post_state),
+        authoritative_surfaces=authoritative_surfaces,
+    )
+    extra_issues = _pov_drift_issues(prose, pov, strict=strict)
+    durable_issues = _durable_scene_constraint_issues(prose, scene_card, durable_post)
+    durable_issues += _linked_durable_consistency_issues(durable_post)
+    ui_gate_issues = _ui_gate_issues(scene_card, authoritative_surfaces, prose, strict=strict)
+    internal_id_issues = _internal_id_issues(prose, strict=strict)
+    return None, heuristic_issues + extra_issues + durable_issues + ui_gate_issues + internal_id_issues
+
+
 def _lint_scene(
     workspace: Path,
     book_root: Path,
@@ -242,7 +285,35 @@ def _lint_scene(
     lint_post_state = _post_state_with_character_continuity(post_state, lint_character_states)
     durable_post = _durable_state_context(book_root, post_state, scene_card, durable_expand_ids)
     authoritative_surfaces = _extract_authoritative_surfaces(prose)
-    prompt = render_template_file(
+
+    incoherent_issue, combined = _heuristic_lint_issues(
+        prose,
+        post_state,
+        scene_card,
+        post_invariants,
+        lint_character_states,
+        pov,
+        durable_post,
+        authoritative_surfaces,
+    )
+    if incoherent_issue:
+        # The LLM report would be discarded in favour of this issue anyway.
+        _record_prepass(True)
+        report = {"schema_version": "1.0", "status": "fail", "issues": [incoherent_issue], "mode": "heuristic_prepass"}
+        validate_json(report, "lint_report")
+        return report
+    if _lint_prepass_enabled() and _lint_status_from_issues(combined) == "fail":
+        # Repair is already certain, so the LLM lint would only add latency and tokens.
+        _record_prepass(True)
+        report = {"schema_version": "1.0", "status": "fail", "issues": combined, "mode": "heuristic_prepass"}
+        validate_json(report, "lint_report")
+        return report
+    _record_prepass(False)
+
+    system_prompt = _system_prompt_for_phase(system_path, book_root / "outline" / "outline.json", "lint", scene_card.get("chapter"))
+    prompt, budget = _budgeted_prompt(
+        book_root,
+        "lint",
         template,
         {
             "prose": prose,
@@ -259,10 +330,14 @@ def _lint_scene(
             "plot_devices": durable_post.get("plot_devices", {}),
             "character_states": lint_character_states,
         },
+        system_prompt,
+        scene_card=scene_card,
+        provider=client.provider,
     )
+    scope = dict(_log_scope(book_root, scene_card), budget=budget)
 
     messages: List[Message] = [
-        {"role": "system", "content": _system_prompt_for_phase(system_path, book_root / "outline" / "outline.json", "lint")},
+        {"role": "system", "content": system_prompt},
         {"role": "user", "content": prompt},
     ]
 
@@ -274,7 +349,7 @@ def _lint_scene(
         model=model,
         temperature=0.0,
         max_tokens=_lint_max_tokens(),
-        log_extra=_log_scope(book_root, scene_card),
+        log_extra=scope,
     )
 
     retries = _json_retry_count()
@@ -299,7 +374,7 @@ def _lint_scene(
                 model=model,
                 temperature=0.0,
                 max_tokens=_lint_max_tokens(),
-                log_extra=_log_scope(book_root, scene_card),
+                log_extra=scope,
             )
             attempt += 1
 
@@ -308,25 +383,6 @@ def _lint_scene(
 
     report = _normalize_lint_report(report)
 
-    incoherent_issue = _invariant_conflict_issue(post_invariants, lint_character_states)
-    if incoherent_issue:
-        report["issues"] = [incoherent_issue]
-        report["status"] = "fail"
-        validate_json(report, "lint_report")
-        return report
-
-    heuristic_issues = _stat_mismatch_issues(
-        prose,
-        lint_character_states,
-        _global_continuity_stats(post_state),
-        authoritative_surfaces=authoritative_surfaces,
-    )
-    extra_issues = _pov_drift_issues(prose, pov, strict=_lint_mode() == "strict")
-    durable_issues = _durable_scene_constraint_issues(prose, scene_card, durable_post)
-    durable_issues += _linked_durable_consistency_issues(durable_post)
-    ui_gate_issues = _ui_gate_issues(scene_card, authoritative_surfaces, prose, strict=_lint_mode() == "strict")
-    internal_id_issues = _internal_id_issues(prose, strict=_lint_mode() == "strict")
-    combined = heuristic_issues + extra_issues + durable_issues + ui_gate_issues + internal_id_issues
     if combined:
         report["issues"] = list(report.get("issues", [])) + combined
         report["status"] = _lint_status_from_issues(report.get("issues", []))
@@ -1,7 +1,8 @@
 from __future__ import annotations
 
+from dataclasses import dataclass, field
 from pathlib import Path
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, List, Optional, Tuple
 import ast
 import json
 import os
@@ -14,8 +15,9 @@ from bookforge.llm.factory import get_llm_client, resolve_model
 from bookforge.llm.logging import log_llm_error, log_llm_response, should_log_llm
 from bookforge.llm.types import LLMResponse, Message
 from bookforge.llm.errors import LLMRequestError
+from bookforge.pipeline.budget import _budgeted_prompt
 from bookforge.pipeline.phase_history import _load_phase_history
-from bookforge.prompt.renderer import render_template_file
+from bookforge.prompt.hashing import hash_text
 from bookforge.util.paths import repo_root
 from bookforge.util.json_extract import extract_json
 from bookforge.util.schema import validate_json
@@ -428,34 +430,65 @@ def _normalize_scene_card(
 
     return card
 
-def plan_scene(
-    workspace: Path,
-    book_id: str,
+@dataclass
+class _PlanInputs:
+    chapter: int
+    scene: int
+    messages: List[Message]
+    scene_target: str
+    character_names: Dict[str, str]
+    cast_present: List[str]
+    cast_present_ids: List[str]
+    introduces: List[str]
+    introduces_ids: List[str]
+    thread_ids: List[str]
+    callbacks: List[str]
+    dependencies: str
+    budget: Dict[str, Any] = field(default_factory=dict)
+
+
+@dataclass
+class SpeculativePlan:
+    chapter: int
+    scene: int
+    card: Dict[str, Any]
+    dependencies: str
+
+
+# Bookkeeping that changes on every commit without changing what the planner should write.
+_VOLATILE_CHARACTER_KEYS = {"updated_at", "history", "appearance_history"}
+
+
+def _plan_dependencies(
+    state: Dict[str, Any],
+    character_states: List[Dict[str, Any]],
+    recent_warnings: List[Dict[str, Any]],
+) -> str:
+    world = state.get("world") if isinstance(state.get("world"), dict) else {}
+    # Only what shapes the card. Every commit rewrites summary.* and world.recent_facts, so
+    # fingerprinting them would discard every speculative card; a card planned one summary
+    # behind is still valid as long as the cast, place, threads and holdings match.
+    payload = {
+        "location": world.get("location"),
+        "cast_present": world.get("cast_present"),
+        "open_threads": world.get("open_threads"),
+        "character_states": [
+            {key: value for key, value in item.items() if key not in _VOLATILE_CHARACTER_KEYS}
+            for item in character_states
+        ],
+        "recent_lint_warnings": recent_warnings,
+    }
+    return hash_text(json.dumps(payload, ensure_ascii=True, sort_keys=True))
+
+
+def _prepare_plan(
+    book_root: Path,
+    outline: Dict[str, Any],
+    state: Dict[str, Any],
     chapter: Optional[int] = None,
     scene: Optional[int] = None,
-    client: Optional[LLMClient] = None,
-    model: Optional[str] = None,
-) -> Path:
-    book_root = workspace / "books" / book_id
-    if not book_root.exists():
-        raise FileNotFoundError(f"Book workspace not found: {book_root}")
-
-    outline_path = book_root / "outline" / "outline.json"
-    state_path = book_root / "state.json"
+) -> _PlanInputs:
     system_path = book_root / "prompts" / "system_v1.md"
-
-    if not outline_path.exists():
-        raise FileNotFoundError(f"Missing outline.json: {outline_path}")
-    if not state_path.exists():
-        raise FileNotFoundError(f"Missing state.json: {state_path}")
-    if not system_path.exists():
-        raise FileNotFoundError(f"Missing system_v1.md: {system_path}")
-
-    outline = _load_json(outline_path)
-    state = _load_json(state_path)
-
-    validate_json(outline, "outline")
-
     cursor = state.get("cursor", {}) if isinstance(state.get("cursor"), dict) else {}
     chapter_num = chapter if chapter is not None else int(cursor.get("chapter", 0) or 0)
     scene_num = scene if scene is not None else int(cursor.get("scene", 0) or 0)
@@ -498,7 +531,10 @@ def plan_scene(
 
     plan_template = _resolve_plan_template(book_root)
     recent_warnings = _recent_lint_warnings(book_root, chapter_num, scene_num)
-    prompt = render_template_file(
+    system_prompt = system_path.read_text(encoding="utf-8")
+    prompt, budget = _budgeted_prompt(
+        book_root,
+        "plan",
         plan_template,
         {
             "outline_window": outline_window,
@@ -506,20 +542,44 @@ def plan_scene(
             "character_states": character_states,
             "recent_lint_warnings": recent_warnings,
         },
+        system_prompt,
+        cast_ids=cast_present_ids,
     )
 
-    if client is None:
-        config = load_config()
-        client = get_llm_client(config, phase="planner")
-        if model is None:
-            model = resolve_model("planner", config)
-    elif model is None:
-        model = "default"
-
     messages: List[Message] = [
-        {"role": "system", "content": system_path.read_text(encoding="utf-8")},
+        {"role": "system", "content": system_prompt},
         {"role": "user", "content": prompt},
     ]
+    return _PlanInputs(
+        chapter=chapter_num,
+        scene=scene_num,
+        messages=messages,
+        scene_target=scene_target,
+        character_names=character_names,
+        cast_present=cast_present,
+        cast_present_ids=cast_present_ids,
+        introduces=introduces,
+        introduces_ids=introduces_ids,
+        thread_ids=thread_ids,
+        callbacks=callbacks,
+        dependencies=_plan_dependencies(state, character_states, recent_warnings),
+        budget=budget,
+    )
+
+
+def _request_scene_card(
+    workspace: Path,
+    book_id: str,
+    inputs: _PlanInputs,
+    client: LLMClient,
+    model: str,
+) -> Dict[str, Any]:
+    chapter_num = inputs.chapter
+    scene_num = inputs.scene
+    messages = inputs.messages
+    character_names = inputs.character_names
+    cast_present = list(inputs.cast_present)
+    cast_present_ids = list(inputs.cast_present_ids)
 
     max_tokens = _plan_max_tokens()
     request = {"model": model, "temperature": 0.4, "max_tokens": max_tokens}
@@ -528,6 +588,8 @@ def plan_scene(
     log_extra: Dict[str, Any] = {"book_id": book_id, "chapter": chapter_num, "scene": scene_num}
     if key_slot:
         log_extra["key_slot"] = key_slot
+    if inputs.budget:
+        log_extra["budget"] = inputs.budget
     retries = _empty_response_retries()
     attempt = 0
     while True:
@@ -594,15 +656,20 @@ def plan_scene(
         card,
         chapter_num,
         scene_num,
-        scene_target,
+        inputs.scene_target,
         cast_present,
         cast_present_ids,
-        introduces,
-        introduces_ids,
-        thread_ids,
-        callbacks,
+        inputs.introduces,
+        inputs.introduces_ids,
+        inputs.thread_ids,
+        inputs.callbacks,
     )
     validate_json(card, "scene_card")
+    return card
+
+
+def _save_scene_card(book_root: Path, state: Dict[str, Any], card: Dict[str, Any], chapter_num: int, scene_num: int) -> Path:
+    state_path = book_root / "state.json"
 
     chapter_dir = book_root / "draft" / "chapters" / f"ch_{chapter_num:03d}"
     chapter_dir.mkdir(parents=True, exist_ok=True)
@@ -629,3 +696,84 @@ def plan_scene(
 
     return scene_path
 
+
+def _resolve_planner(workspace: Path, client: Optional[LLMClient], model: Optional[str]) -> Tuple[LLMClient, str]:
+    if client is None:
+        config = load_config()
+        client = get_llm_client(config, phase="planner", workspace=workspace)
+        if model is None:
+            model = resolve_model("planner", config)
+    elif model is None:
+        model = "default"
+    return client, model
+
+
+def _require_plan_inputs(book_root: Path) -> None:
+    if not book_root.exists():
+        raise FileNotFoundError(f"Book workspace not found: {book_root}")
+    outline_path = book_root / "outline" / "outline.json"
+    state_path = book_root / "state.json"
+    system_path = book_root / "prompts" / "system_v1.md"
+    if not outline_path.exists():
+        raise FileNotFoundError(f"Missing outline.json: {outline_path}")
+    if not state_path.exists():
+        raise FileNotFoundError(f"Missing state.json: {state_path}")
+    if not system_path.exists():
+        raise FileNotFoundError(f"Missing system_v1.md: {system_path}")
+
+
+def plan_scene(
+    workspace: Path,
+    book_id: str,
+    chapter: Optional[int] = None,
+    scene: Optional[int] = None,
+    client: Optional[LLMClient] = None,
+    model: Optional[str] = None,
+) -> Path:
+    book_root = workspace / "books" / book_id
+    _require_plan_inputs(book_root)
+
+    outline = _load_json(book_root / "outline" / "outline.json")
+    state = _load_json(book_root / "state.json")
+
+    validate_json(outline, "outline")
+
+    inputs = _prepare_plan(book_root, outline, state, chapter, scene)
+    client, model = _resolve_planner(workspace, client, model)
+    card = _request_scene_card(workspace, book_id, inputs, client, model)
+    return _save_scene_card(book_root, state, card, inputs.chapter, inputs.scene)
+
+
+def speculate_scene_card(
+    workspace: Path,
+    book_id: str,
+    chapter: int,
+    scene: int,
+    state: Dict[str, Any],
+    client: Optional[LLMClient] = None,
+    model: Optional[str] = None,
+) -> SpeculativePlan:
+    # Plans against a snapshot of the pre-commit state and writes nothing; the card is only
+    # persisted by adopt_speculative_plan once the committed state is known to match.
+    book_root = workspace / "books" / book_id
+    _require_plan_inputs(book_root)
+    outline = _load_json(book_root / "outline" / "outline.json")
+    snapshot = json.loads(json.dumps(state))
+    snapshot["cursor"] = {"chapter": chapter, "scene": scene}
+    inputs = _prepare_plan(book_root, outline, snapshot, chapter, scene)
+    client, model = _resolve_planner(workspace, client, model)
+    card = _request_scene_card(workspace, book_id, inputs, client, model)
+    return SpeculativePlan(chapter=inputs.chapter, scene=inputs.scene, card=card, dependencies=inputs.dependencies)
+
+
+def adopt_speculative_plan(workspace: Path, book_id: str, plan: SpeculativePlan) -> Optional[Path]:
+    book_root = workspace / "books" / book_id
+    outline = _load_json(book_root / "outline" / "outline.json")
+    state = _load_json(book_root / "state.json")
+    cursor = state.get("cursor", {}) if isinstance(state.get("cursor"), dict) else {}
+    if (int(cursor.get("chapter", 0) or 0), int(cursor.get("scene", 0) or 0)) != (plan.chapter, plan.scene):
+        return None
+    inputs = _prepare_plan(book_root, outline, state, plan.chapter, plan.scene)
+    if inputs.dependencies != plan.dependencies:
+        return None
+    return _save_scene_card(book_root, state, plan.card, plan.chapter, plan.scene)
@@ -6,9 +6,9 @@ from bookforge.llm.client import LLMClient
 from bookforge.pipeline.config import _preflight_max_tokens
 from bookforge.pipeline.llm_ops import _chat
 from bookforge.pipeline.parse import _extract_json
+from bookforge.pipeline.budget import _budgeted_prompt
 from bookforge.pipeline.prompts import _resolve_template, _system_prompt_for_phase
 from bookforge.pipeline.io import _log_scope
-from bookforge.prompt.renderer import render_template_file
 from bookforge.pipeline.state_patch import _normalize_state_patch_for_validation, _sanitize_preflight_patch
 from bookforge.util.schema import validate_json
 
@@ -30,9 +30,11 @@ def _scene_state_preflight(
     durable_expand_ids: Optional[List[str]] = None,
 ) -> Dict[str, Any]:
     preflight_template = _resolve_template(book_root, "preflight.md")
-    system_prompt = _system_prompt_for_phase(system_path, book_root / "outline" / "outline.json", "preflight")
+    system_prompt = _system_prompt_for_phase(system_path, book_root / "outline" / "outline.json", "preflight", scene_card.get("chapter"))
 
-    message = render_template_file(
+    message, budget = _budgeted_prompt(
+        book_root,
+        "preflight",
         preflight_template,
         {
             "scene_card": scene_card,
@@ -45,7 +47,11 @@ def _scene_state_preflight(
             "chapter_order": chapter_order,
             "scene_counts": scene_counts,
         },
+        system_prompt,
+        scene_card=scene_card,
+        provider=client.provider,
     )
+    scope = dict(_log_scope(book_root, scene_card), budget=budget)
 
     response = _chat(
         workspace,
@@ -58,7 +64,7 @@ def _scene_state_preflight(
         model=model,
         temperature=0.2,
         max_tokens=_preflight_max_tokens(),
-        log_extra=_log_scope(book_root, scene_card),
+        log_extra=scope,
     )
 
     raw = response.text or ""
@@ -11,9 +11,9 @@ from bookforge.pipeline.appearance import _with_derived_attire
 from bookforge.pipeline.io import _log_scope
 from bookforge.pipeline.llm_ops import _chat, _response_truncated, _json_retry_count, _state_patch_schema_retry_message
 from bookforge.pipeline.parse import _extract_prose_and_patch, _extract_appearance_check
+from bookforge.pipeline.budget import _budgeted_prompt
 from bookforge.pipeline.prompts import _resolve_template, _system_prompt_for_phase
 from bookforge.pipeline.state_patch import _normalize_state_patch_for_validation
-from bookforge.prompt.renderer import render_template_file
 from bookforge.util.schema import validate_json
 
 
@@ -35,7 +35,10 @@ def _repair_scene(
     template = _resolve_template(book_root, "repair.md")
     durable = _durable_state_context(book_root, state, scene_card, durable_expand_ids)
     derived_character_states = _with_derived_attire(character_states, durable.get("item_registry", {}))
-    prompt = render_template_file(
+    system_prompt = _system_prompt_for_phase(system_path, book_root / "outline" / "outline.json", "repair", scene_card.get("chapter"))
+    prompt, budget = _budgeted_prompt(
+        book_root,
+        "repair",
         template,
         {
             "issues": lint_report.get("issues", []),
@@ -48,10 +51,14 @@ def _repair_scene(
             "item_registry": durable.get("item_registry", {}),
             "plot_devices": durable.get("plot_devices", {}),
         },
+        system_prompt,
+        scene_card=scene_card,
+        provider=client.provider,
     )
+    scope = dict(_log_scope(book_root, scene_card), budget=budget)
 
     messages: List[Message] = [
-        {"role": "system", "content": _system_prompt_for_phase(system_path, book_root / "outline" / "outline.json", "repair")},
+        {"role": "system", "content": system_prompt},
         {"role": "user", "content": prompt},
     ]
 
@@ -63,7 +70,7 @@ def _repair_scene(
         model=model,
         temperature=0.4,
         max_tokens=_repair_max_tokens(),
-        log_extra=_log_scope(book_root, scene_card),
+        log_extra=scope,
     )
 
     retries = _json_retry_count()
@@ -94,7 +101,7 @@ def _repair_scene(
                 model=model,
                 temperature=0.4,
                 max_tokens=_repair_max_tokens(),
-                log_extra=_log_scope(book_root, scene_card),
+                log_extra=scope,
             )
             attempt += 1
 
@@ -120,7 +127,7 @@ def _repair_scene(
                 model=model,
                 temperature=0.4,
                 max_tokens=_repair_max_tokens(),
-                log_extra=_log_scope(book_root, scene_card),
+                log_extra=scope,
             )
             prose, patch = _extract_prose_and_patch(response.text)
             appearance_check = _extract_appearance_check(response.text)
@@ -11,10 +11,10 @@ from bookforge.pipeline.appearance import _with_derived_attire
 from bookforge.pipeline.io import _log_scope
 from bookforge.pipeline.llm_ops import _chat, _json_retry_count, _state_patch_schema_retry_message
 from bookforge.pipeline.parse import _extract_json
+from bookforge.pipeline.budget import _budgeted_prompt
 from bookforge.pipeline.prompts import _resolve_template, _system_prompt_for_phase
 from bookforge.pipeline.state_apply import _summary_from_state
 from bookforge.pipeline.state_patch import _normalize_state_patch_for_validation
-from bookforge.prompt.renderer import render_template_file
 from bookforge.util.schema import validate_json
 
 
@@ -37,7 +37,10 @@ def _state_repair(
     template = _resolve_template(book_root, "state_repair.md")
     durable = _durable_state_context(book_root, state, scene_card, durable_expand_ids)
     derived_character_states = _with_derived_attire(character_states, durable.get("item_registry", {}))
-    prompt = render_template_file(
+    system_prompt = _system_prompt_for_phase(system_path, book_root / "outline" / "outline.json", "state_repair", scene_card.get("chapter"))
+    prompt, budget = _budgeted_prompt(
+        book_root,
+        "state_repair",
         template,
         {
             "prose": prose,
@@ -52,10 +55,14 @@ def _state_repair(
             "item_registry": durable.get("item_registry", {}),
             "plot_devices": durable.get("plot_devices", {}),
         },
+        system_prompt,
+        scene_card=scene_card,
+        provider=client.provider,
     )
+    scope = dict(_log_scope(book_root, scene_card), budget=budget)
 
     messages: List[Message] = [
-        {"role": "system", "content": _system_prompt_for_phase(system_path, book_root / "outline" / "outline.json", "state_repair")},
+        {"role": "system", "content": system_prompt},
         {"role": "user", "content": prompt},
     ]
 
@@ -67,7 +74,7 @@ def _state_repair(
         model=model,
         temperature=0.2,
         max_tokens=_state_repair_max_tokens(),
-        log_extra=_log_scope(book_root, scene_card),
+        log_extra=scope,
     )
 
     retries = _json_retry_count()
@@ -92,7 +99,7 @@ def _state_repair(
                 model=model,
                 temperature=0.2,
                 max_tokens=_state_repair_max_tokens(),
-                log_extra=_log_scope(book_root, scene_card),
+                log_extra=scope,
             )
             attempt += 1
     schema_attempt = 0
@@ -117,7 +124,7 @@ def _state_repair(
                 model=model,
                 temperature=0.2,
                 max_tokens=_state_repair_max_tokens(),
-                log_extra=_log_scope(book_root, scene_card),
+                log_extra=scope,
             )
             patch = _extract_json(response.text)
             schema_attempt += 1
@@ -4,16 +4,18 @@ from pathlib import Path
 from typing import Any, Dict, List, Optional, Tuple
 
 from bookforge.llm.client import LLMClient
-from bookforge.llm.types import Message
-from bookforge.pipeline.config import _write_max_tokens
+from bookforge.llm.types import LLMResponse, Message
+from bookforge.pipeline.config import _write_max_tokens, _write_stream_enabled, _write_stream_max_chars
 from bookforge.pipeline.durable import _durable_state_context
 from bookforge.pipeline.appearance import _with_derived_attire
-from bookforge.pipeline.io import _log_scope
-from bookforge.pipeline.llm_ops import _chat, _response_truncated, _json_retry_count, _state_patch_schema_retry_message
+from bookforge.pipeline.io import _log_scope, _maybe_int
+from bookforge.pipeline.llm_ops import _chat, _chat_stream, _response_truncated, _json_retry_count, _state_patch_schema_retry_message
 from bookforge.pipeline.parse import _extract_prose_and_patch, _extract_appearance_check
+from bookforge.pipeline.phase_history import _phase_artifact_dir
+from bookforge.pipeline.budget import _budgeted_prompt
 from bookforge.pipeline.prompts import _resolve_template, _system_prompt_for_phase
 from bookforge.pipeline.state_patch import _normalize_state_patch_for_validation
-from bookforge.prompt.renderer import render_template_file
+from bookforge.pipeline.stream import _SceneStreamWatcher
 from bookforge.util.schema import validate_json
 
 
@@ -35,7 +37,10 @@ def _write_scene(
     template = _resolve_template(book_root, "write.md")
     durable = _durable_state_context(book_root, state, scene_card, durable_expand_ids)
     derived_character_states = _with_derived_attire(character_states, durable.get("item_registry", {}))
-    prompt = render_template_file(
+    system_prompt = _system_prompt_for_phase(system_path, book_root / "outline" / "outline.json", "write", scene_card.get("chapter"))
+    prompt, budget = _budgeted_prompt(
+        book_root,
+        "write",
         template,
         {
             "scene_card": scene_card,
@@ -48,23 +53,53 @@ def _write_scene(
             "item_registry": durable.get("item_registry", {}),
             "plot_devices": durable.get("plot_devices", {}),
         },
+        system_prompt,
+        scene_card=scene_card,
+        provider=client.provider,
     )
+    scope = dict(_log_scope(book_root, scene_card), budget=budget)
 
     messages: List[Message] = [
-        {"role": "system", "content": _system_prompt_for_phase(system_path, book_root / "outline" / "outline.json", "write")},
+        {"role": "system", "content": system_prompt},
         {"role": "user", "content": prompt},
     ]
 
-    response = _chat(
-        workspace,
-        "write_scene",
-        client,
-        messages,
-        model=model,
-        temperature=0.7,
-        max_tokens=_write_max_tokens(),
-        log_extra=_log_scope(book_root, scene_card),
-    )
+    watcher: Optional[_SceneStreamWatcher] = None
+    if _write_stream_enabled():
+        chapter = _maybe_int(scene_card.get("chapter"))
+        scene = _maybe_int(scene_card.get("scene"))
+        partial_path = None
+        if chapter is not None and scene is not None:
+            partial_path = _phase_artifact_dir(book_root, chapter, scene) / "write_prose.partial.txt"
+        watcher = _SceneStreamWatcher(partial_path, max_chars=_write_stream_max_chars())
+
+    def _write_chat(label: str, chat_messages: List[Message]) -> LLMResponse:
+        if watcher is None:
+            return _chat(
+                workspace,
+                label,
+                client,
+                chat_messages,
+                model=model,
+                temperature=0.7,
+                max_tokens=_write_max_tokens(),
+                log_extra=scope,
+            )
+        response = _chat_stream(
+            workspace,
+            label,
+            client,
+            chat_messages,
+            model=model,
+            temperature=0.7,
+            max_tokens=_write_max_tokens(),
+            watcher=watcher,
+            log_extra=scope,
+        )
+        watcher.finish()
+        return response
+
+    response = _write_chat("write_scene", messages)
 
     retries = _json_retry_count()
     attempt = 0
@@ -80,22 +115,15 @@ def _write_scene(
                 extra = ""
                 if _response_truncated(response):
                     extra = f" Model output hit MAX_TOKENS ({_write_max_tokens()}); increase BOOKFORGE_WRITE_MAX_TOKENS."
+                elif watcher is not None and watcher.runaway:
+                    extra = f" Stream aborted after {watcher.max_chars} chars; adjust BOOKFORGE_WRITE_STREAM_MAX_CHARS."
                 raise ValueError(f"{exc}{extra}") from exc
             retry_messages = list(messages)
             retry_messages.append({
                 "role": "user",
                 "content": "Return PROSE plus a STATE_PATCH JSON block. Output format: PROSE: <text> then STATE_PATCH: <json>. No markdown.",
             })
-            response = _chat(
-                workspace,
-                f"write_scene_json_retry{attempt + 1}",
-                client,
-                retry_messages,
-                model=model,
-                temperature=0.7,
-                max_tokens=_write_max_tokens(),
-                log_extra=_log_scope(book_root, scene_card),
-            )
+            response = _write_chat(f"write_scene_json_retry{attempt + 1}", retry_messages)
             attempt += 1
 
     schema_attempt = 0
@@ -103,6 +131,8 @@ def _write_scene(
         patch = _normalize_state_patch_for_validation(patch, scene_card)
         try:
             validate_json(patch, "state_patch")
+            if watcher is not None:
+                watcher.discard()
             return prose, patch
         except ValueError as exc:
             if schema_attempt >= retries:
@@ -112,16 +142,7 @@ def _write_scene(
                 "role": "user",
                 "content": _state_patch_schema_retry_message(exc, prose_required=True),
             })
-            response = _chat(
-                workspace,
-                f"write_scene_schema_retry{schema_attempt + 1}",
-                client,
-                retry_messages,
-                model=model,
-                temperature=0.7,
-                max_tokens=_write_max_tokens(),
-                log_extra=_log_scope(book_root, scene_card),
-            )
+            response = _write_chat(f"write_scene_schema_retry{schema_attempt + 1}", retry_messages)
             prose, patch = _extract_prose_and_patch(response.text)
             appearance_check = _extract_appearance_check(response.text)
             if appearance_check:
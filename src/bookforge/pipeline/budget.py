@@ -0,0 +1,345 @@
+from __future__ import annotations
+
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, NamedTuple, Optional, Set, Tuple
+import json
+import threading
+
+from bookforge.pipeline.config import _prompt_budget_enabled
+from bookforge.prompt.budgeter import evaluate_budget, estimate_tokens
+from bookforge.prompt.renderer import load_compiled_template, render_template_file
+from bookforge.prompt.serialization import dumps_json
+from bookforge.util.paths import repo_root
+
+KEEP_HISTORY_ENTRIES = 3
+KEEP_KEY_FACTS = 12
+KEEP_KEY_FACTS_MIN = 4
+KEEP_SUMMARY_ENTRIES = 6
+
+STATE_SECTIONS = ("state", "pre_state", "post_state")
+SUMMARY_SECTIONS = ("summary", "pre_summary", "post_summary")
+OFF_CAST_KEEP_KEYS = ("character_id", "name", "invariants")
+OFF_SCENE_ITEM_KEEP_KEYS = ("item_id", "name", "custodian", "linked_device_id", "state_tags")
+OFF_SCENE_DEVICE_KEEP_KEYS = ("device_id", "name", "custody_scope", "custody_ref", "activation_state", "linked_item_id")
+REGISTRY_SECTIONS = {"item_registry": ("items", "item_id"), "plot_devices": ("devices", "device_id")}
+# Lint compares before/after snapshots; both sides must lose the same entries or the
+# linter sees facts "removed" that the scene never touched. The pre_ side picks what to
+# drop and the post_ side loses exactly those entries, keeping whatever the scene added.
+PAIRED_SECTIONS = {"pre_state": "post_state", "post_state": "pre_state", "pre_summary": "post_summary", "post_summary": "pre_summary"}
+SCENE_REQUEST_KEYS = (
+    "required_in_custody",
+    "required_scene_accessible",
+    "required_visible_on_page",
+    "forbidden_visible",
+    "device_presence",
+)
+
+_FileStamp = Optional[Tuple[int, int]]
+_BUDGET_LOCK = threading.Lock()
+_BUDGET_CACHE: Dict[str, Tuple[_FileStamp, Dict[str, Any]]] = {}
+
+
+def _file_stamp(path: Path) -> _FileStamp:
+    try:
+        stat = path.stat()
+    except OSError:
+        return None
+    return stat.st_mtime_ns, stat.st_size
+
+
+def _registry_budgets(path: Path) -> Dict[str, Any]:
+    stamp = _file_stamp(path)
+    key = str(path)
+    with _BUDGET_LOCK:
+        cached = _BUDGET_CACHE.get(key)
+    if cached is not None and cached[0] == stamp:
+        return cached[1]
+    budgets: Dict[str, Any] = {}
+    if stamp is not None:
+        try:
+            data = json.loads(path.read_text(encoding="utf-8"))
+        except json.JSONDecodeError:
+            data = {}
+        if isinstance(data, dict) and isinstance(data.get("budgets"), dict):
+            budgets = data["budgets"]
+    with _BUDGET_LOCK:
+        _BUDGET_CACHE[key] = (stamp, budgets)
+    return budgets
+
+
+def _positive(value: Any) -> Optional[int]:
+    return value if isinstance(value, int) and not isinstance(value, bool) and value > 0 else None
+
+
+def _phase_budgets(book_root: Path, phase: str) -> Dict[str, int]:
+    # Book registries are copied at init time, so a 0 there means "unset" and falls
+    # back to the shipped default rather than disabling the section budget.
+    defaults = _registry_budgets(repo_root(Path(__file__).resolve()) / "resources" / "prompt_registry.json")
+    book = _registry_budgets(book_root / "prompts" / "registry.json")
+    merged: Dict[str, int] = {}
+    for source in (defaults.get(phase), book.get(phase)):
+        if not isinstance(source, dict):
+            continue
+        for name, value in source.items():
+            budget = _positive(value)
+            if budget is not None:
+                merged[name] = budget
+    return merged
+
+
+def _section_tokens(value: Any, provider: Optional[str] = None) -> int:
+    return estimate_tokens(value if isinstance(value, str) else dumps_json(value), provider)
+
+
+def _trimmed_summary(summary: Any, limits: Dict[str, int]) -> Any:
+    if not isinstance(summary, dict):
+        return summary
+    trimmed = dict(summary)
+    for key, limit in limits.items():
+        if isinstance(trimmed.get(key), list) and len(trimmed[key]) > limit:
+            trimmed[key] = trimmed[key][-limit:]
+    return trimmed
+
+
+def _trim_summary_section(name: str, value: Any, limits: Dict[str, int]) -> Any:
+    if name in SUMMARY_SECTIONS:
+        return _trimmed_summary(value, limits)
+    if isinstance(value, dict) and isinstance(value.get("summary"), dict):
+        trimmed = dict(value)
+        trimmed["summary"] = _trimmed_summary(value["summary"], limits)
+        return trimmed
+    return value
+
+
+def _trim_character_history(value: Any, keep: int) -> Any:
+    if not isinstance(value, list):
+        return value
+    trimmed: List[Any] = []
+    for entry in value:
+        if isinstance(entry, dict):
+            entry = dict(entry)
+            for key in ("history", "appearance_history"):
+                if isinstance(entry.get(key), list):
+                    entry[key] = entry[key][-keep:] if keep > 0 else []
+        trimmed.append(entry)
+    return trimmed
+
+
+def _drop_like(before: Any, after: Any, partner: Any) -> Any:
+    # Removes from `partner` the entries that shrinking `before` into `after` took out.
+    if isinstance(before, dict) and isinstance(after, dict) and isinstance(partner, dict):
+        aligned = dict(partner)
+        for key, value in before.items():
+            if key in after and key in partner and after[key] != value:
+                aligned[key] = _drop_like(value, after[key], partner[key])
+        return aligned
+    if isinstance(before, list) and isinstance(after, list) and isinstance(partner, list):
+        kept = list(after)
+        aligned = list(partner)
+        for entry in before:
+            if entry in kept:
+                kept.remove(entry)
+            elif entry in aligned:
+                aligned.remove(entry)
+        return aligned
+    return partner
+
+
+class _ShrinkScope(NamedTuple):
+    cast: Set[str]
+    requested: Set[str]
+
+
+def _registry_entry_in_scene(entry: Dict[str, Any], id_key: str, scope: _ShrinkScope) -> bool:
+    if str(entry.get(id_key) or "").strip() in scope.requested:
+        return True
+    if entry.get("derived_visible") or entry.get("derived_scene_accessible"):
+        return True
+    holders = (entry.get("custodian"), entry.get("carrier_ref"), entry.get("custody_ref"))
+    return any(isinstance(holder, str) and holder.strip() in scope.cast for holder in holders)
+
+
+def _shrink_registry(name: str, value: Any, scope: _ShrinkScope, drop: bool) -> Any:
+    list_key, id_key = REGISTRY_SECTIONS[name]
+    if not isinstance(value, dict) or not isinstance(value.get(list_key), list):
+        return value
+    keep_keys = OFF_SCENE_ITEM_KEEP_KEYS if name == "item_registry" else OFF_SCENE_DEVICE_KEEP_KEYS
+    entries: List[Any] = []
+    for entry in value[list_key]:
+        if isinstance(entry, dict) and not _registry_entry_in_scene(entry, id_key, scope):
+            if drop:
+                continue
+            entry = {key: entry[key] for key in keep_keys if key in entry}
+            entry["off_scene_summary"] = True
+        entries.append(entry)
+    trimmed = dict(value)
+    trimmed[list_key] = entries
+    return trimmed
+
+
+def _summarize_off_cast(value: Any, cast: Set[str]) -> Any:
+    if not isinstance(value, list) or not cast:
+        return value
+    trimmed: List[Any] = []
+    for entry in value:
+        if isinstance(entry, dict) and str(entry.get("character_id") or "").strip() not in cast:
+            summary = {key: entry[key] for key in OFF_CAST_KEEP_KEYS if key in entry}
+            appearance = entry.get("appearance_current") if isinstance(entry.get("appearance_current"), dict) else {}
+            if appearance.get("summary"):
+                summary["appearance_summary"] = appearance["summary"]
+            summary["off_cast_summary"] = True
+            entry = summary
+        trimmed.append(entry)
+    return trimmed
+
+
+_ShrinkRule = Tuple[str, Tuple[str, ...], Callable[[str, Any, _ShrinkScope], Any]]
+
+# Applied in order, each only to sections that are over their own budget (or to every
+# listed section while the whole dynamic payload is over budget). The cheapest loss of
+# context comes first.
+_SHRINK_RULES: List[_ShrinkRule] = [
+    (
+        "drop_history_tails",
+        ("character_states",),
+        lambda name, value, scope: _trim_character_history(value, KEEP_HISTORY_ENTRIES),
+    ),
+    (
+        "trim_key_facts_ring",
+        STATE_SECTIONS + SUMMARY_SECTIONS,
+        lambda name, value, scope: _trim_summary_section(name, value, {"key_facts_ring": KEEP_KEY_FACTS}),
+    ),
+    (
+        "summarize_off_cast_characters",
+        ("character_states",),
+        lambda name, value, scope: _summarize_off_cast(value, scope.cast),
+    ),
+    (
+        "summarize_off_scene_registry_entries",
+        tuple(REGISTRY_SECTIONS),
+        lambda name, value, scope: _shrink_registry(name, value, scope, drop=False),
+    ),
+    (
+        "drop_character_history",
+        ("character_states",),
+        lambda name, value, scope: _trim_character_history(value, 0),
+    ),
+    (
+        "trim_story_summaries",
+        STATE_SECTIONS + SUMMARY_SECTIONS,
+        lambda name, value, scope: _trim_summary_section(
+            name,
+            value,
+            {
+                "story_so_far": KEEP_SUMMARY_ENTRIES,
+                "chapter_so_far": KEEP_SUMMARY_ENTRIES,
+                "pending_story_rollups": KEEP_SUMMARY_ENTRIES,
+                "key_facts_ring": KEEP_KEY_FACTS_MIN,
+            },
+        ),
+    ),
+    (
+        "drop_off_scene_registry_entries",
+        tuple(REGISTRY_SECTIONS),
+        lambda name, value, scope: _shrink_registry(name, value, scope, drop=True),
+    ),
+]
+
+
+def _scene_cast_ids(scene_card: Optional[Dict[str, Any]]) -> List[str]:
+    if not isinstance(scene_card, dict):
+        return []
+    for key in ("cast_present_ids", "cast_present"):
+        values = scene_card.get(key)
+        if isinstance(values, list) and values:
+            return [str(value).strip() for value in values if str(value).strip()]
+    return []
+
+
+def _scene_requested_ids(scene_card: Optional[Dict[str, Any]]) -> Set[str]:
+    requested: Set[str] = set()
+    if not isinstance(scene_card, dict):
+        return requested
+    for key in SCENE_REQUEST_KEYS:
+        values = scene_card.get(key)
+        if isinstance(values, list):
+            requested.update(str(value).strip() for value in values if str(value).strip())
+    return requested
+
+
+def _fit_values(
+    values: Dict[str, Any],
+    budgets: Dict[str, int],
+    render: Callable[[Dict[str, Any]], str],
+    scope: _ShrinkScope,
+    provider: Optional[str] = None,
+) -> Tuple[Dict[str, Any], str, List[str]]:
+    fitted = dict(values)
+    prompt = render(fitted)
+    applied: List[str] = []
+    payload_budget = budgets.get("dynamic_payload")
+    for rule_name, sections, shrink in _SHRINK_RULES:
+        payload_over = payload_budget is not None and estimate_tokens(prompt, provider) > payload_budget
+        targets: List[str] = []
+        for name in sections:
+            if name not in fitted or name in targets:
+                continue
+            section_budget = budgets.get(name)
+            if not payload_over and (section_budget is None or _section_tokens(fitted[name], provider) <= section_budget):
+                continue
+            targets.append(name)
+            partner = PAIRED_SECTIONS.get(name)
+            if partner in fitted and partner in sections and partner not in targets:
+                targets.append(partner)
+        changed = False
+        for name in targets:
+            partner = PAIRED_SECTIONS.get(name)
+            if partner in targets and not name.startswith("pre_"):
+                continue
+            shrunk = shrink(name, fitted[name], scope)
+            if shrunk == fitted[name]:
+                continue
+            if partner in targets:
+                fitted[partner] = _drop_like(fitted[name], shrunk, fitted[partner])
+            fitted[name] = shrunk
+            changed = True
+        if changed:
+            applied.append(rule_name)
+            prompt = render(fitted)
+    return fitted, prompt, applied
+
+
+def _budgeted_prompt(
+    book_root: Path,
+    phase: str,
+    template: Path,
+    values: Dict[str, Any],
+    system_prompt: str,
+    scene_card: Optional[Dict[str, Any]] = None,
+    cast_ids: Optional[Iterable[str]] = None,
+    provider: Optional[str] = None,
+) -> Tuple[str, Dict[str, Any]]:
+    budgets = _phase_budgets(book_root, phase) if _prompt_budget_enabled() else {}
+    scope = _ShrinkScope(
+        cast=set(cast_ids if cast_ids is not None else _scene_cast_ids(scene_card)),
+        requested=_scene_requested_ids(scene_card),
+    )
+
+    fitted, applied = values, []
+    if budgets:
+        fitted, _, applied = _fit_values(values, budgets, load_compiled_template(template).render, scope, provider)
+    prompt = render_template_file(template, fitted)
+    report = evaluate_budget(phase, {"stable_prefix": system_prompt, "dynamic_payload": prompt}, {phase: budgets}, provider)
+    section_tokens = {name: _section_tokens(value, provider) for name, value in sorted(fitted.items())}
+    over_sections = sorted(name for name, tokens in section_tokens.items() if name in budgets and tokens > budgets[name])
+    return prompt, {
+        "step": phase,
+        "stable_prefix_tokens": report.sections[0].tokens,
+        "dynamic_payload_tokens": report.sections[1].tokens,
+        "total_tokens": report.total_tokens,
+        "sections": section_tokens,
+        "budgets": budgets,
+        "shrink": applied,
+        "over_budget": report.over_budget or bool(over_sections),
+        "over_sections": over_sections,
+    }
@@ -1,6 +1,7 @@
 from __future__ import annotations
 
 from bookforge.config.env import read_env_value, read_int_env
+from bookforge.pipeline.prompts import _bool_env
 
 DEFAULT_WRITE_MAX_TOKENS = 147456
 DEFAULT_LINT_MAX_TOKENS = 294912
@@ -10,7 +11,9 @@ DEFAULT_CONTINUITY_MAX_TOKENS = 294912
 DEFAULT_PREFLIGHT_MAX_TOKENS = 294912
 DEFAULT_STYLE_ANCHOR_MAX_TOKENS = 65536
 DEFAULT_APPEARANCE_MAX_TOKENS = 16384
+DEFAULT_APPEARANCE_CONCURRENCY = 4
 DEFAULT_DURABLE_SLICE_MAX_EXPANSIONS = 2
+DEFAULT_WRITE_STREAM_MAX_CHARS = 0
 
 
 def _int_env(name: str, default: int) -> int:
@@ -48,6 +51,17 @@ def _style_anchor_max_tokens() -> int:
 def _appearance_max_tokens() -> int:
     return max(512, _int_env("BOOKFORGE_APPEARANCE_MAX_TOKENS", DEFAULT_APPEARANCE_MAX_TOKENS))
 
+
+def _appearance_concurrency() -> int:
+    return max(1, _int_env("BOOKFORGE_APPEARANCE_CONCURRENCY", DEFAULT_APPEARANCE_CONCURRENCY))
+
+def _write_stream_enabled() -> bool:
+    return _bool_env("BOOKFORGE_WRITE_STREAM", True)
+
+
+def _write_stream_max_chars() -> int:
+    return max(0, _int_env("BOOKFORGE_WRITE_STREAM_MAX_CHARS", DEFAULT_WRITE_STREAM_MAX_CHARS))
+
 def _durable_slice_max_expansions() -> int:
     return max(0, _int_env("BOOKFORGE_DURABLE_SLICE_MAX_EXPANSIONS", DEFAULT_DURABLE_SLICE_MAX_EXPANSIONS))
 
@@ -65,3 +79,19 @@ def _lint_mode() -> str:
 
 
 
+
+
+def _lint_prepass_enabled() -> bool:
+    return _bool_env("BOOKFORGE_LINT_PREPASS", True)
+
+
+def _prompt_budget_enabled() -> bool:
+    return _bool_env("BOOKFORGE_PROMPT_BUDGET", True)
+
+
+def _trace_enabled() -> bool:
+    return _bool_env("BOOKFORGE_TRACE", False)
+
+
+def _pipeline_planning_enabled() -> bool:
+    return _bool_env("BOOKFORGE_PIPELINE_PLANNING", False)
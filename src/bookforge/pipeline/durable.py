@@ -3,26 +3,23 @@ from __future__ import annotations
 
 from pathlib import Path
 from typing import Any, Dict, List, Optional, Tuple
+import copy
 import hashlib
 import json
 import re
 
 from bookforge.characters import ensure_character_index, resolve_character_state_path, create_character_state_path
 from bookforge.memory.durable_state import (
+    durable_store,
     ensure_durable_state_files,
-    load_durable_commits,
-    load_item_registry,
-    load_plot_devices,
-    save_durable_commits,
-    save_item_registry,
-    save_plot_devices,
     snapshot_item_registry,
     snapshot_plot_devices,
 )
+from bookforge.memory.registry_index import DEVICE_INDEX_FIELDS, ITEM_INDEX_FIELDS, RegistryIndex
 from bookforge.pipeline.state_apply import _apply_bag_updates, _now_iso
+from bookforge.util.trace import traced
 
 
-DURABLE_COMMIT_HASH_CAP = 2000
 PHYSICAL_ITEM_MUTATION_KEYS = {
     "custodian",
     "container_ref",
@@ -43,6 +40,7 @@ ALLOWED_NON_PRESENT_REASON_CATEGORIES = {
     "linkage_metadata_update",
 }
 INTANGIBLE_CUSTODY_SCOPES = {"knowledge", "thread", "faction", "global", "rule", "memory"}
+INTANGIBLE_ACCESS_SCOPES = {"knowledge", "thread", "faction", "global"}
 
 
 
@@ -126,7 +124,7 @@ def _derive_plot_device_scene_flags(entry: Dict[str, Any], world_location: str,
     custody_scope = str(entry.get("custody_scope") or "").strip().lower()
     custody_ref = str(entry.get("custody_ref") or "").strip()
 
-    if custody_scope in {"knowledge", "thread", "faction", "global"}:
+    if custody_scope in INTANGIBLE_ACCESS_SCOPES:
         return {
             "derived_scene_accessible": True,
             "derived_access_reason": "intangible_scope",
@@ -157,8 +155,9 @@ def _durable_state_context(
     expanded_ids: Optional[List[str]] = None,
 ) -> Dict[str, Any]:
     ensure_durable_state_files(book_root)
-    item_registry = load_item_registry(book_root)
-    plot_devices = load_plot_devices(book_root)
+    store = durable_store(book_root)
+    item_index = store.item_index()
+    device_index = store.device_index()
 
     if isinstance(state, dict):
         world = state.get("world") if isinstance(state.get("world"), dict) else {}
@@ -193,43 +192,53 @@ def _durable_state_context(
             if token:
                 requested_ids.add(token)
 
-    item_entries_all: List[Dict[str, Any]] = []
-    for raw_entry in item_registry.get("items", []) if isinstance(item_registry.get("items"), list) else []:
-        if not isinstance(raw_entry, dict):
-            continue
-        entry = dict(raw_entry)
+    def _item_entry(raw_entry: Dict[str, Any]) -> Dict[str, Any]:
+        entry = copy.deepcopy(raw_entry)
         entry.update(_derive_item_scene_flags(entry, world_location, cast_ids))
-        item_entries_all.append(entry)
+        return entry
 
-    device_entries_all: List[Dict[str, Any]] = []
-    for raw_entry in plot_devices.get("devices", []) if isinstance(plot_devices.get("devices"), list) else []:
-        if not isinstance(raw_entry, dict):
-            continue
-        entry = dict(raw_entry)
+    def _device_entry(raw_entry: Dict[str, Any]) -> Dict[str, Any]:
+        entry = copy.deepcopy(raw_entry)
         entry.update(_derive_plot_device_scene_flags(entry, world_location, cast_ids))
-        device_entries_all.append(entry)
+        return entry
 
     # If no scene scope exists, expose full canonical datasets.
     if not isinstance(scene_card, dict) and not requested_ids:
-        item_registry_view = dict(item_registry)
-        item_registry_view["items"] = item_entries_all
-        plot_devices_view = dict(plot_devices)
-        plot_devices_view["devices"] = device_entries_all
+        item_registry_view = dict(store.peek_item_registry())
+        item_registry_view["items"] = [_item_entry(entry) for entry in item_index.entries() if isinstance(entry, dict)]
+        plot_devices_view = dict(store.peek_plot_devices())
+        plot_devices_view["devices"] = [_device_entry(entry) for entry in device_index.entries() if isinstance(entry, dict)]
         return {
             "item_registry": item_registry_view,
             "plot_devices": plot_devices_view,
         }
 
-    item_map = {
-        str(entry.get("item_id") or "").strip(): entry
-        for entry in item_entries_all
-        if str(entry.get("item_id") or "").strip()
-    }
-    device_map = {
-        str(entry.get("device_id") or "").strip(): entry
-        for entry in device_entries_all
-        if str(entry.get("device_id") or "").strip()
-    }
+    # Every inclusion rule below keys off one indexed field, so the indexes give a
+    # superset of the slice and only those candidates need their flags derived.
+    locations = [world_location] if world_location else []
+    item_candidates = {item_id for item_id in requested_ids if item_id in item_index}
+    item_candidates |= item_index.lookup("linked_threads", thread_ids)
+    item_candidates |= item_index.lookup("custodian", cast_ids)
+    item_candidates |= item_index.lookup("carrier_ref", cast_ids)
+    item_candidates |= item_index.lookup("location_ref", locations)
+    item_candidates |= item_index.lookup("linked_device_id", requested_ids)
+
+    device_candidates = {device_id for device_id in requested_ids if device_id in device_index}
+    device_candidates |= device_index.lookup("linked_threads", thread_ids)
+    device_candidates |= device_index.lookup_where("custody_scope", lambda scope: scope.lower() in INTANGIBLE_ACCESS_SCOPES)
+    device_candidates |= device_index.lookup("custody_ref", cast_ids + locations)
+    device_candidates |= device_index.lookup("linked_item_id", requested_ids)
+
+    item_map: Dict[str, Dict[str, Any]] = {}
+    for item_id in item_candidates:
+        raw_entry = item_index.get(item_id)
+        if raw_entry is not None:
+            item_map[item_id] = _item_entry(raw_entry)
+    device_map: Dict[str, Dict[str, Any]] = {}
+    for device_id in device_candidates:
+        raw_entry = device_index.get(device_id)
+        if raw_entry is not None:
+            device_map[device_id] = _device_entry(raw_entry)
 
     selected_item_ids: set[str] = set()
     selected_device_ids: set[str] = set()
@@ -278,7 +287,8 @@ def _durable_state_context(
             if not isinstance(entry, dict):
                 continue
             linked_device_id = str(entry.get("linked_device_id") or "").strip()
-            if linked_device_id and linked_device_id in device_map and linked_device_id not in selected_device_ids:
+            if linked_device_id and linked_device_id in device_index and linked_device_id not in selected_device_ids:
+                device_map.setdefault(linked_device_id, _device_entry(device_index.get(linked_device_id)))
                 selected_device_ids.add(linked_device_id)
                 changed = True
         for device_id in list(selected_device_ids):
@@ -286,17 +296,18 @@ def _durable_state_context(
             if not isinstance(entry, dict):
                 continue
             linked_item_id = str(entry.get("linked_item_id") or "").strip()
-            if linked_item_id and linked_item_id in item_map and linked_item_id not in selected_item_ids:
+            if linked_item_id and linked_item_id in item_index and linked_item_id not in selected_item_ids:
+                item_map.setdefault(linked_item_id, _item_entry(item_index.get(linked_item_id)))
                 selected_item_ids.add(linked_item_id)
                 changed = True
 
     item_entries = [item_map[item_id] for item_id in sorted(selected_item_ids) if item_id in item_map]
     device_entries = [device_map[device_id] for device_id in sorted(selected_device_ids) if device_id in device_map]
 
-    item_registry_view = dict(item_registry)
+    item_registry_view = dict(store.peek_item_registry())
     item_registry_view["items"] = item_entries
 
-    plot_devices_view = dict(plot_devices)
+    plot_devices_view = dict(store.peek_plot_devices())
     plot_devices_view["devices"] = device_entries
 
     return {
@@ -482,15 +493,6 @@ def _entry_contains_expected_before(entry: Dict[str, Any], expected_before: Dict
     return _contains(entry, expected_before)
 
 
-def _find_entry_index(entries: List[Dict[str, Any]], id_key: str, id_value: str) -> int:
-    for idx, entry in enumerate(entries):
-        if not isinstance(entry, dict):
-            continue
-        if str(entry.get(id_key) or "").strip() == id_value:
-            return idx
-    return -1
-
-
 def _normalize_last_seen(chapter: int, scene: int, location: str) -> Dict[str, Any]:
     return {
         "chapter": int(chapter),
@@ -631,7 +633,7 @@ def _upsert_inventory_item(
 
 
 def _apply_registry_update_block(
-    entries: List[Dict[str, Any]],
+    registry: RegistryIndex,
     id_key: str,
     update: Dict[str, Any],
     chapter: int,
@@ -643,12 +645,8 @@ def _apply_registry_update_block(
     if not entry_id:
         raise ValueError(f"{id_key} is required for durable registry update.")
 
-    index = _find_entry_index(entries, id_key, entry_id)
-    current: Dict[str, Any]
-    if index >= 0:
-        current = dict(entries[index])
-    else:
-        current = {id_key: entry_id}
+    existing = registry.get(entry_id)
+    current: Dict[str, Any] = dict(existing) if existing is not None else {id_key: entry_id}
 
     expected_before = update.get("expected_before")
     if isinstance(expected_before, dict) and not _entry_contains_expected_before(current, expected_before):
@@ -666,17 +664,14 @@ def _apply_registry_update_block(
         current["state_tags"] = tags
 
     current["last_seen"] = _normalize_last_seen(chapter, scene, location)
-
-    if index >= 0:
-        entries[index] = current
-    else:
-        entries.append(current)
+    current[id_key] = entry_id
+    registry.upsert(current)
 
 
 def _apply_transfer_update(
     book_root: Path,
     transfer: Dict[str, Any],
-    item_entries: List[Dict[str, Any]],
+    items: RegistryIndex,
     character_cache: Dict[str, Tuple[Path, Dict[str, Any]]],
     chapter: int,
     scene: int,
@@ -686,11 +681,11 @@ def _apply_transfer_update(
     if not item_id:
         raise ValueError("transfer_updates requires item_id.")
 
-    item_index = _find_entry_index(item_entries, "item_id", item_id)
-    if item_index < 0:
+    existing = items.get(item_id)
+    if existing is None:
         raise ValueError(f"transfer_updates references unknown item_id '{item_id}'.")
 
-    item_entry = dict(item_entries[item_index])
+    item_entry = dict(existing)
 
     expected_before = transfer.get("expected_before")
     if isinstance(expected_before, dict) and not _entry_contains_expected_before(item_entry, expected_before):
@@ -740,7 +735,7 @@ def _apply_transfer_update(
         item_entry["last_transfer_chain"] = transfer_chain
 
     item_entry["last_seen"] = _normalize_last_seen(chapter, scene, location)
-    item_entries[item_index] = item_entry
+    items.upsert(item_entry)
 
 
 def _apply_inventory_alignment_updates(
@@ -791,6 +786,7 @@ def _persist_character_mutation_cache(character_cache: Dict[str, Tuple[Path, Dic
         state_path.write_text(json.dumps(state, ensure_ascii=True, indent=2), encoding="utf-8")
 
 
+@traced("durable_apply", "durable")
 def _apply_durable_state_updates(
     book_root: Path,
     patch: Dict[str, Any],
@@ -805,28 +801,25 @@ def _apply_durable_state_updates(
         return False
 
     ensure_durable_state_files(book_root)
-    commit_data = load_durable_commits(book_root)
-    applied_hashes = commit_data.get("applied_hashes") if isinstance(commit_data.get("applied_hashes"), list) else []
-
-    latest_scene_raw = commit_data.get("latest_scene") if isinstance(commit_data.get("latest_scene"), dict) else {}
-    latest_chapter = max(0, int(latest_scene_raw.get("chapter") or 0))
-    latest_scene = max(0, int(latest_scene_raw.get("scene") or 0))
-    if chapter < latest_chapter or (chapter == latest_chapter and scene < latest_scene):
+    store = durable_store(book_root)
+    ledger = store.ledger()
+    latest_chapter, latest_scene = ledger.latest_scene
+    if (chapter, scene) < (latest_chapter, latest_scene):
         raise ValueError(
             f"Chronology conflict: durable state already committed through ch{latest_chapter:03d} "
             f"sc{latest_scene:03d}; cannot apply older scene ch{chapter:03d} sc{scene:03d}."
         )
 
     mutation_hash = _durable_mutation_hash(patch, chapter, scene, phase)
-    if mutation_hash in applied_hashes:
+    if mutation_hash in ledger:
         return False
 
     _enforce_scope_policy(scene_card, mutations)
 
-    item_registry = load_item_registry(book_root)
-    plot_devices = load_plot_devices(book_root)
-    item_entries = list(item_registry.get("items", [])) if isinstance(item_registry.get("items", []), list) else []
-    device_entries = list(plot_devices.get("devices", [])) if isinstance(plot_devices.get("devices", []), list) else []
+    item_registry = store.item_registry()
+    plot_devices = store.plot_devices()
+    items = RegistryIndex(item_registry.get("items", []), "item_id", ITEM_INDEX_FIELDS)
+    devices = RegistryIndex(plot_devices.get("devices", []), "device_id", DEVICE_INDEX_FIELDS)
 
     snapshot_item_registry(book_root, chapter, scene)
     snapshot_plot_devices(book_root, chapter, scene)
@@ -840,7 +833,7 @@ def _apply_durable_state_updates(
         if not isinstance(update, dict):
             continue
         _apply_registry_update_block(
-            item_entries,
+            items,
             "item_id",
             update,
             chapter,
@@ -853,7 +846,7 @@ def _apply_durable_state_updates(
         if not isinstance(update, dict):
             continue
         _apply_registry_update_block(
-            device_entries,
+            devices,
             "device_id",
             update,
             chapter,
@@ -868,7 +861,7 @@ def _apply_durable_state_updates(
         _apply_transfer_update(
             book_root,
             transfer,
-            item_entries,
+            items,
             character_cache,
             chapter,
             scene,
@@ -888,17 +881,16 @@ def _apply_durable_state_updates(
             scene,
         )
 
-    item_registry["items"] = item_entries
-    plot_devices["devices"] = device_entries
-    save_item_registry(book_root, item_registry)
-    save_plot_devices(book_root, plot_devices)
-    _persist_character_mutation_cache(character_cache)
-
-    applied_hashes.append(mutation_hash)
-    if len(applied_hashes) > DURABLE_COMMIT_HASH_CAP:
-        applied_hashes = applied_hashes[-DURABLE_COMMIT_HASH_CAP:]
-    commit_data["applied_hashes"] = applied_hashes
-    commit_data["latest_scene"] = {"chapter": chapter, "scene": scene}
-    save_durable_commits(book_root, commit_data)
+    item_registry["items"] = items.entries()
+    plot_devices["devices"] = devices.entries()
+    store.commit(
+        mutation_hash,
+        chapter,
+        scene,
+        phase,
+        item_registry,
+        plot_devices,
+        before_journal=lambda: _persist_character_mutation_cache(character_cache),
+    )
     return True
 
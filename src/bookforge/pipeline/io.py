@@ -1,14 +1,15 @@
 
 from __future__ import annotations
 
-from datetime import datetime, timezone
 from pathlib import Path
 from typing import Any, Dict, List, Optional, Tuple
 import json
-import shutil
 
 from bookforge.characters import ensure_character_index, resolve_character_state_path
+from bookforge.memory.history import DeltaHistory
+from bookforge.pipeline.metrics import _record_bytes_written
 from bookforge.pipeline.state_apply import _now_iso, _summary_list
+from bookforge.util.trace import traced
 
 
 def _maybe_int(value: Any) -> Optional[int]:
@@ -41,6 +42,11 @@ def _last_touched_from_character_state(state: Dict[str, Any]) -> Tuple[int, int]
     return 0, 0
 
 
+def _character_history(book_root: Path, state_path: Path) -> DeltaHistory:
+    name = state_path.name[: -len(".json")] if state_path.name.endswith(".json") else state_path.name
+    return DeltaHistory(book_root / "draft" / "context" / "characters" / "history", name)
+
+
 def _snapshot_character_states_before_preflight(
     book_root: Path,
     scene_card: Dict[str, Any],
@@ -52,12 +58,9 @@ def _snapshot_character_states_before_preflight(
     if not cast_ids:
         return []
 
-    history_dir = book_root / "draft" / "context" / "characters" / "history"
-    history_dir.mkdir(parents=True, exist_ok=True)
     ensure_character_index(book_root)
 
     snapshots: List[Path] = []
-    stamp = datetime.now(timezone.utc).strftime("%Y%m%d_%H%M%S")
     for char_id in cast_ids:
         state_path = resolve_character_state_path(book_root, char_id)
         if state_path is None or not state_path.exists():
@@ -70,15 +73,17 @@ def _snapshot_character_states_before_preflight(
             continue
 
         touched_ch, touched_sc = _last_touched_from_character_state(loaded)
-        prefix = f"ch{touched_ch:03d}_sc{touched_sc:03d}_"
-        candidate = history_dir / f"{prefix}{state_path.name}"
-        if candidate.exists():
-            candidate = history_dir / f"{prefix}{stamp}_{state_path.name}"
-        shutil.copyfile(state_path, candidate)
-        snapshots.append(candidate)
+        snapshots.append(_character_history(book_root, state_path).record(touched_ch, touched_sc, loaded))
     return snapshots
 
 
+def _reconstruct_character_state(book_root: Path, char_id: str, chapter: int, scene: int) -> Optional[Dict[str, Any]]:
+    state_path = resolve_character_state_path(book_root, char_id)
+    if state_path is None:
+        return None
+    return _character_history(book_root, state_path).reconstruct(chapter, scene)
+
+
 def _log_scope(book_root: Path, scene_card: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
     scope: Dict[str, Any] = {"book_id": book_root.name}
     if scene_card:
@@ -91,6 +96,7 @@ def _log_scope(book_root: Path, scene_card: Optional[Dict[str, Any]] = None) ->
     return scope
 
 
+@traced("write_scene_files", "io")
 def _write_scene_files(
     book_root: Path,
     chapter: int,
@@ -107,7 +113,7 @@ def _write_scene_files(
     prose_path = chapter_dir / f"scene_{scene:03d}.md"
     if prose_path.exists():
         raise FileExistsError(f"Scene already exists: {prose_path}")
-    prose_path.write_text(prose.strip() + "\n", encoding="utf-8")
+    _record_bytes_written(prose_path.write_text(prose.strip() + "\n", encoding="utf-8"))
 
     meta_path = chapter_dir / f"scene_{scene:03d}.meta.json"
     meta = dict(scene_card)
@@ -123,9 +129,9 @@ def _write_scene_files(
     meta["lint_report"] = lint_report
     meta["write_attempts"] = write_attempts
     meta["updated_at"] = _now_iso()
-    meta_path.write_text(json.dumps(meta, ensure_ascii=True, indent=2), encoding="utf-8")
+    _record_bytes_written(meta_path.write_text(json.dumps(meta, ensure_ascii=True, indent=2), encoding="utf-8"))
 
     last_excerpt_path = book_root / "draft" / "context" / "last_excerpt.md"
-    last_excerpt_path.write_text(prose.strip() + "\n", encoding="utf-8")
+    _record_bytes_written(last_excerpt_path.write_text(prose.strip() + "\n", encoding="utf-8"))
 
     return prose_path
@@ -2,13 +2,16 @@ from __future__ import annotations
 
 import time
 from pathlib import Path
-from typing import Any, Dict, List, Optional
+from typing import Any, Callable, Dict, List, Optional
 
 from bookforge.config.env import read_int_env
 from bookforge.llm.client import LLMClient
 from bookforge.llm.errors import LLMRequestError
 from bookforge.llm.logging import log_llm_error, log_llm_response, should_log_llm
 from bookforge.llm.types import LLMResponse, Message
+from bookforge.pipeline.metrics import current_metrics
+from bookforge.pipeline.stream import _SceneStreamWatcher
+from bookforge.util.trace import span
 
 
 DEFAULT_EMPTY_RESPONSE_RETRIES = 2
@@ -76,7 +79,7 @@ def _state_patch_schema_retry_message(error: ValueError, *, prose_required: bool
     return base + " Return ONLY the corrected JSON object. No prose, no markdown, no commentary. " + rules
 
 
-def _chat(
+def _chat_with_retries(
     workspace: Path,
     label: str,
     client: LLMClient,
@@ -84,6 +87,7 @@ def _chat(
     model: str,
     temperature: float,
     max_tokens: int,
+    call: Callable[[], LLMResponse],
     log_extra: Optional[Dict[str, Any]] = None,
 ) -> LLMResponse:
     key_slot = getattr(client, "key_slot", None)
@@ -98,10 +102,15 @@ def _chat(
     error_retries = _request_error_retries()
     attempt = 0
     error_attempt = 0
+    metrics = current_metrics()
     while True:
+        started = time.perf_counter()
         try:
-            response = client.chat(messages, model=model, temperature=temperature, max_tokens=max_tokens)
+            with span(f"llm:{label}", "llm", attempt=attempt, error_attempt=error_attempt):
+                response = call()
         except LLMRequestError as exc:
+            if metrics is not None:
+                metrics.record_llm(label, time.perf_counter() - started, error=True)
             if should_log_llm():
                 log_llm_error(workspace, f"{label}_error", exc, request=request, messages=messages, extra=extra)
             if exc.status_code in {429, 500, 502, 503, 504} and error_attempt < error_retries:
@@ -110,7 +119,10 @@ def _chat(
                     delay = DEFAULT_REQUEST_ERROR_BACKOFF_SECONDS * (2 ** error_attempt)
                 delay = min(delay, DEFAULT_REQUEST_ERROR_MAX_SLEEP)
                 if delay > 0:
-                    time.sleep(delay)
+                    with span("retry_backoff", "wait", label=label, status=exc.status_code, seconds=delay):
+                        time.sleep(delay)
+                if metrics is not None:
+                    metrics.record_retry(label)
                 error_attempt += 1
                 continue
             raise
@@ -119,5 +131,51 @@ def _chat(
             log_llm_response(workspace, label_used, response, request=request, messages=messages, extra=extra)
         if str(response.text).strip() or attempt >= retries:
             return response
+        if metrics is not None:
+            metrics.record_retry(label)
         attempt += 1
 
+
+def _chat(
+    workspace: Path,
+    label: str,
+    client: LLMClient,
+    messages: List[Message],
+    model: str,
+    temperature: float,
+    max_tokens: int,
+    log_extra: Optional[Dict[str, Any]] = None,
+) -> LLMResponse:
+    def _call() -> LLMResponse:
+        return client.chat(messages, model=model, temperature=temperature, max_tokens=max_tokens)
+
+    return _chat_with_retries(workspace, label, client, messages, model, temperature, max_tokens, _call, log_extra)
+
+
+def _chat_stream(
+    workspace: Path,
+    label: str,
+    client: LLMClient,
+    messages: List[Message],
+    model: str,
+    temperature: float,
+    max_tokens: int,
+    watcher: _SceneStreamWatcher,
+    log_extra: Optional[Dict[str, Any]] = None,
+) -> LLMResponse:
+    def _call() -> LLMResponse:
+        watcher.reset()
+        if not callable(getattr(client, "chat_stream", None)):
+            response = client.chat(messages, model=model, temperature=temperature, max_tokens=max_tokens)
+            watcher.feed(str(response.text))
+            return response
+        stream = client.chat_stream(messages, model=model, temperature=temperature, max_tokens=max_tokens)
+        # Read to the end so the provider's final usage and finish-reason events reach the
+        # response; only a runaway stream is cut short.
+        for chunk in stream:
+            if watcher.feed(chunk):
+                stream.close()
+                break
+        return stream.response
+
+    return _chat_with_retries(workspace, label, client, messages, model, temperature, max_tokens, _call, log_extra)
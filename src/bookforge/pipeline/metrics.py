@@ -0,0 +1,287 @@
+from __future__ import annotations
+
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Mapping, Optional, Tuple
+import atexit
+import json
+import threading
+import time
+
+from bookforge.llm.client import LLMClient, add_settle_observer, remove_settle_observer
+from bookforge.util.schema import schema_validation_stats
+from bookforge.util.trace import record_span
+
+PHASE_FIELDS = (
+    "wall_seconds",
+    "entries",
+    "llm_calls",
+    "llm_seconds",
+    "retries",
+    "errors",
+    "prompt_tokens",
+    "completion_tokens",
+    "cached_tokens",
+    "bytes_written",
+    "schema_seconds",
+)
+
+_RUN_SCOPE = "run"
+
+# Process-wide cumulative counters (connection pool, caches, schema, ...) reported as-is in
+# metrics.json and under the end-of-run table.
+CounterSource = Callable[[], Mapping[str, Any]]
+
+_THREAD = threading.local()
+
+
+def _empty_phase() -> Dict[str, float]:
+    return {field: 0 for field in PHASE_FIELDS}
+
+
+def _add(target: Dict[str, float], values: Dict[str, float]) -> None:
+    for field in PHASE_FIELDS:
+        target[field] += values.get(field, 0)
+
+
+def _phase_from_label(label: str) -> str:
+    # "write_scene_json_retry1" -> "write_scene"; used for calls made outside a phase.
+    return label.split("_json_retry")[0].split("_schema_retry")[0].split("_retry")[0] or "unknown"
+
+
+class RunMetrics:
+    # Per-run telemetry: wall time, LLM latency/tokens/retries, bytes written and schema
+    # validation time, bucketed by scene and phase. The runner marks phase boundaries;
+    # _chat and the artifact writers report into whichever phase is open, unless the calling
+    # thread set its own with attributed_to (the speculative planner bills "plan").
+
+    def __init__(self, run_id: str, path: Optional[Path] = None, counters: Optional[Mapping[str, CounterSource]] = None) -> None:
+        self.run_id = run_id
+        self.path = path
+        self.counters: Dict[str, CounterSource] = dict(counters or {})
+        self.started = time.perf_counter()
+        self._lock = threading.Lock()
+        self._scenes: List[Dict[str, Any]] = []
+        self._scene: Optional[Dict[str, Any]] = None
+        self._phase: Optional[Tuple[str, float, float]] = None
+        self._outside: Dict[str, Dict[str, float]] = {}
+
+    def _bucket(self, fallback: str) -> Dict[str, float]:
+        phase = getattr(_THREAD, "phase", None)
+        if phase is None and self._scene is not None and self._phase is not None:
+            phase = self._phase[0]
+        if phase is not None and self._scene is not None:
+            return self._scene["phases"].setdefault(phase, _empty_phase())
+        return self._outside.setdefault(phase or fallback, _empty_phase())
+
+    def _close_phase(self, now: float) -> None:
+        if self._phase is None or self._scene is None:
+            self._phase = None
+            return
+        name, started, schema_started = self._phase
+        bucket = self._scene["phases"].setdefault(name, _empty_phase())
+        bucket["wall_seconds"] += now - started
+        bucket["entries"] += 1
+        bucket["schema_seconds"] += float(schema_validation_stats().get("seconds", 0.0)) - schema_started
+        self._phase = None
+        record_span(name, "phase", started, now)
+
+    def scene_start(self, chapter: int, scene: int) -> None:
+        now = time.perf_counter()
+        with self._lock:
+            self._close_scene(now)
+            self._scene = {"chapter": int(chapter), "scene": int(scene), "started": now, "phases": {}}
+
+    def phase(self, name: str) -> None:
+        now = time.perf_counter()
+        schema_seconds = float(schema_validation_stats().get("seconds", 0.0))
+        with self._lock:
+            self._close_phase(now)
+            if self._scene is not None:
+                self._phase = (name, now, schema_seconds)
+
+    def _close_scene(self, now: float) -> None:
+        self._close_phase(now)
+        if self._scene is None:
+            return
+        scene = self._scene
+        self._scene = None
+        record_span(
+            f"ch{scene['chapter']:03d} sc{scene['scene']:03d}",
+            "scene",
+            scene["started"],
+            now,
+            {"chapter": scene["chapter"], "scene": scene["scene"]},
+        )
+        self._scenes.append({
+            "chapter": scene["chapter"],
+            "scene": scene["scene"],
+            "wall_seconds": now - scene["started"],
+            "phases": scene["phases"],
+        })
+
+    def scene_end(self) -> None:
+        with self._lock:
+            self._close_scene(time.perf_counter())
+
+    def record_llm(self, label: str, seconds: float, response: Any = None, retries: int = 0, error: bool = False) -> None:
+        with self._lock:
+            bucket = self._bucket(_phase_from_label(label))
+            bucket["llm_calls"] += 1
+            bucket["llm_seconds"] += seconds
+            bucket["retries"] += retries + (1 if "_retry" in label else 0)
+            if error:
+                bucket["errors"] += 1
+            if response is not None:
+                bucket["prompt_tokens"] += getattr(response, "prompt_tokens", None) or 0
+                bucket["completion_tokens"] += getattr(response, "completion_tokens", None) or 0
+                bucket["cached_tokens"] += getattr(response, "cached_tokens", None) or 0
+
+    def record_retry(self, label: str) -> None:
+        with self._lock:
+            self._bucket(_phase_from_label(label))["retries"] += 1
+
+    def _observe_settled(self, client: LLMClient, response: Any, seconds: float) -> None:
+        # Successful provider calls are reported by LLMClient._settle, whoever made them.
+        self.record_llm("llm", seconds, response)
+
+    def record_bytes(self, count: int) -> None:
+        with self._lock:
+            self._bucket(_RUN_SCOPE)["bytes_written"] += max(0, int(count or 0))
+
+    def phase_totals(self) -> Dict[str, Dict[str, float]]:
+        with self._lock:
+            totals: Dict[str, Dict[str, float]] = {}
+            for scene in self._scenes:
+                for name, values in scene["phases"].items():
+                    _add(totals.setdefault(name, _empty_phase()), values)
+            for name, values in self._outside.items():
+                _add(totals.setdefault(name, _empty_phase()), values)
+            return totals
+
+    def counter_values(self) -> Dict[str, Dict[str, Any]]:
+        return {name: dict(source()) for name, source in self.counters.items()}
+
+    def to_dict(self) -> Dict[str, Any]:
+        totals = self.phase_totals()
+        with self._lock:
+            scenes = [dict(scene) for scene in self._scenes]
+            outside = {name: dict(values) for name, values in self._outside.items()}
+        return {
+            "run_id": self.run_id,
+            "wall_seconds": time.perf_counter() - self.started,
+            "phases": totals,
+            "outside_scenes": outside,
+            "scenes": scenes,
+            "counters": self.counter_values(),
+        }
+
+    def write(self) -> Optional[Path]:
+        if self.path is None:
+            return None
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.path.write_text(json.dumps(self.to_dict(), ensure_ascii=True, indent=2), encoding="utf-8")
+        return self.path
+
+    def close(self) -> Optional[Path]:
+        with self._lock:
+            self._close_scene(time.perf_counter())
+        return self.write()
+
+    def summary_table(self) -> str:
+        totals = self.phase_totals()
+        header = f"{'phase':<16}{'wall_s':>10}{'llm_s':>10}{'calls':>7}{'retries':>8}{'prompt_tok':>12}{'compl_tok':>11}{'cached_tok':>11}{'bytes':>11}{'schema_ms':>10}"
+        lines = [header]
+        ordered = sorted(totals.items(), key=lambda item: (-item[1]["wall_seconds"], item[0]))
+        grand = _empty_phase()
+        for name, values in ordered:
+            _add(grand, values)
+            lines.append(_table_row(name, values))
+        lines.append(_table_row("total", grand))
+        for name, values in self.counter_values().items():
+            lines.append(f"{name:<16}{_format_counters(values)}")
+        return "\n".join(lines)
+
+
+def _table_row(name: str, values: Dict[str, float]) -> str:
+    return (
+        f"{name:<16}{values['wall_seconds']:>10.1f}{values['llm_seconds']:>10.1f}{int(values['llm_calls']):>7}"
+        f"{int(values['retries']):>8}{int(values['prompt_tokens']):>12}{int(values['completion_tokens']):>11}"
+        f"{int(values['cached_tokens']):>11}{int(values['bytes_written']):>11}{values['schema_seconds'] * 1000:>10.1f}"
+    )
+
+
+def _format_counter_value(value: Any) -> str:
+    if isinstance(value, float):
+        return f"{value:.3f}"
+    if isinstance(value, (list, tuple)):
+        return ",".join(str(item) for item in value)
+    return str(value)
+
+
+def _format_counters(values: Mapping[str, Any]) -> str:
+    parts: List[str] = []
+    for key, value in values.items():
+        if isinstance(value, Mapping):
+            if value:
+                parts.append(f"{key}:" + ",".join(f"{inner}={_format_counter_value(item)}" for inner, item in value.items()))
+        else:
+            parts.append(f"{key}={_format_counter_value(value)}")
+    return " ".join(parts) or "-"
+
+
+_ACTIVE: Optional[RunMetrics] = None
+
+
+def start_run_metrics(run_id: str, path: Optional[Path] = None, counters: Optional[Mapping[str, CounterSource]] = None) -> RunMetrics:
+    global _ACTIVE
+    if _ACTIVE is not None:
+        remove_settle_observer(_ACTIVE._observe_settled)
+    _ACTIVE = RunMetrics(run_id, path, counters)
+    add_settle_observer(_ACTIVE._observe_settled)
+    return _ACTIVE
+
+
+def current_metrics() -> Optional[RunMetrics]:
+    return _ACTIVE
+
+
+def stop_run_metrics() -> Optional[RunMetrics]:
+    global _ACTIVE
+    metrics, _ACTIVE = _ACTIVE, None
+    if metrics is not None:
+        remove_settle_observer(metrics._observe_settled)
+        metrics.close()
+    return metrics
+
+
+def _write_active_metrics() -> None:
+    # A paused or crashed run never reaches stop_run_metrics; keep what it recorded.
+    metrics = _ACTIVE
+    if metrics is None:
+        return
+    try:
+        metrics.write()
+    except OSError:
+        pass
+
+
+atexit.register(_write_active_metrics)
+
+
+@contextmanager
+def attributed_to(phase: str) -> Iterator[None]:
+    # Bills everything the calling thread records to `phase`, whichever phase the runner has open.
+    previous = getattr(_THREAD, "phase", None)
+    _THREAD.phase = phase
+    try:
+        yield
+    finally:
+        _THREAD.phase = previous
+
+
+def _record_bytes_written(count: int) -> int:
+    metrics = _ACTIVE
+    if metrics is not None:
+        metrics.record_bytes(count)
+    return count
@@ -4,8 +4,10 @@ from typing import Any, Dict, List, Optional, Tuple
 import re
 
 from bookforge.util.json_extract import extract_json
+from bookforge.util.trace import traced
 
 
+@traced("parse_json", "parse")
 def _extract_json(text: str) -> Dict[str, Any]:
     data = extract_json(text, label="Response")
     if not isinstance(data, dict):
@@ -67,6 +69,7 @@ def _extract_appearance_check(text: str) -> Dict[str, List[str]]:
         result[char_id] = tokens
     return result
 
+@traced("parse_prose_and_patch", "parse")
 def _extract_prose_and_patch(text: str) -> Tuple[str, Dict[str, Any]]:
     match = None
     for candidate in re.finditer(r"STATE\s*_(?:OKPATCH|PATCH)\s*:\s*", text, re.IGNORECASE):
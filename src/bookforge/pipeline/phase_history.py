@@ -4,7 +4,9 @@ from pathlib import Path
 from typing import Any, Dict, Optional
 import json
 
+from bookforge.pipeline.metrics import _record_bytes_written
 from bookforge.pipeline.state_apply import _now_iso
+from bookforge.util.trace import traced
 
 
 def _phase_history_dir(book_root: Path) -> Path:
@@ -36,10 +38,11 @@ def _load_phase_history(book_root: Path, chapter: int, scene: int) -> Dict[str,
     return data
 
 
+@traced("write_phase_history", "io")
 def _write_phase_history(book_root: Path, chapter: int, scene: int, data: Dict[str, Any]) -> Path:
     path = _phase_history_path(book_root, chapter, scene)
     path.parent.mkdir(parents=True, exist_ok=True)
-    path.write_text(json.dumps(data, ensure_ascii=True, indent=2), encoding="utf-8")
+    _record_bytes_written(path.write_text(json.dumps(data, ensure_ascii=True, indent=2), encoding="utf-8"))
     return path
 
 
@@ -65,6 +68,7 @@ def _record_phase_success(
     return data
 
 
+@traced("write_phase_artifact", "io")
 def _write_phase_artifact(
     book_root: Path,
     chapter: int,
@@ -78,7 +82,7 @@ def _write_phase_artifact(
     suffix = ".json" if as_json else ".txt"
     path = dest_dir / f"{name}{suffix}"
     if as_json:
-        path.write_text(json.dumps(payload, ensure_ascii=True, indent=2), encoding="utf-8")
+        _record_bytes_written(path.write_text(json.dumps(payload, ensure_ascii=True, indent=2), encoding="utf-8"))
     else:
-        path.write_text(str(payload), encoding="utf-8")
+        _record_bytes_written(path.write_text(str(payload), encoding="utf-8"))
     return path
@@ -1,22 +1,17 @@
 from __future__ import annotations
 
 from pathlib import Path
+from typing import Any, Dict, Optional, Tuple
+import threading
 
-from bookforge.config.env import read_env_value
+from bookforge.config.env import env_snapshot
+from bookforge.prompt.outline_digest import outline_digest, record_outline_savings
 from bookforge.prompt.system import load_system_prompt
 from bookforge.util.paths import repo_root
 
 
 def _bool_env(name: str, default: bool) -> bool:
-    raw = read_env_value(name)
-    if raw is None:
-        return default
-    text = str(raw).strip().lower()
-    if text in {"1", "true", "yes", "on"}:
-        return True
-    if text in {"0", "false", "no", "off"}:
-        return False
-    return default
+    return env_snapshot().get_bool(name, default)
 
 
 def _phase_include_outline(phase: str, default: bool) -> bool:
@@ -24,7 +19,34 @@ def _phase_include_outline(phase: str, default: bool) -> bool:
     return _bool_env(name, default)
 
 
-def _system_prompt_for_phase(system_path: Path, outline_path: Path, phase: str) -> str:
+DEFAULT_OUTLINE_WINDOW = 1
+
+
+def _outline_window() -> int:
+    return env_snapshot().get_int("BOOKFORGE_OUTLINE_WINDOW", DEFAULT_OUTLINE_WINDOW)
+
+
+_FileStamp = Optional[Tuple[int, int]]
+_SYSTEM_PROMPT_CACHE: Dict[Tuple[str, _FileStamp, str, _FileStamp, bool, Optional[Tuple[int, int]]], str] = {}
+_SYSTEM_PROMPT_LOCK = threading.Lock()
+
+
+def _file_stamp(path: Path) -> _FileStamp:
+    try:
+        stat = path.stat()
+    except OSError:
+        return None
+    return stat.st_mtime_ns, stat.st_size
+
+
+def _chapter_number(value: Any) -> Optional[int]:
+    try:
+        return int(value) if value is not None else None
+    except (TypeError, ValueError):
+        return None
+
+
+def _system_prompt_for_phase(system_path: Path, outline_path: Path, phase: str, chapter: Any = None) -> str:
     defaults = {
         "preflight": True,
         "write": True,
@@ -34,7 +56,26 @@ def _system_prompt_for_phase(system_path: Path, outline_path: Path, phase: str)
         "lint": False,
     }
     include = _phase_include_outline(phase, defaults.get(phase, False))
-    return load_system_prompt(system_path, outline_path, include_outline=include)
+    chapter = _chapter_number(chapter)
+    outline_stamp = _file_stamp(outline_path) if include else None
+    digest = outline_digest(outline_path) if include and chapter is not None and outline_stamp is not None else None
+    window = _outline_window() if digest is not None else -1
+    outline_text = digest.window(chapter, window) if digest is not None and window >= 0 else None
+    if digest is not None:
+        record_outline_savings(phase, digest, outline_text if outline_text is not None else digest.full_text)
+    # Provider prompt caches only hit on a byte-identical prefix, so reuse the
+    # rendered text until either source file changes on disk. A chapter window keeps
+    # the prefix stable for every scene of a chapter.
+    window_key = (chapter, window) if outline_text is not None else None
+    key = (str(system_path), _file_stamp(system_path), str(outline_path), outline_stamp, include, window_key)
+    with _SYSTEM_PROMPT_LOCK:
+        cached = _SYSTEM_PROMPT_CACHE.get(key)
+    if cached is not None:
+        return cached
+    prompt = load_system_prompt(system_path, outline_path, include_outline=include, outline_text=outline_text)
+    with _SYSTEM_PROMPT_LOCK:
+        _SYSTEM_PROMPT_CACHE[key] = prompt
+    return prompt
 
 
 def _resolve_template(book_root: Path, name: str) -> Path:
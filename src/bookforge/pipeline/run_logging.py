@@ -13,6 +13,14 @@ def _run_log_path(book_root: Path, run_id: str) -> Path:
     return _run_logs_dir(book_root) / f"{run_id}.log"
 
 
+def _run_metrics_path(book_root: Path, run_id: str) -> Path:
+    return _run_logs_dir(book_root) / f"{run_id}.metrics.json"
+
+
+def _run_trace_path(book_root: Path, run_id: str) -> Path:
+    return _run_logs_dir(book_root) / f"{run_id}.trace.json"
+
+
 def _current_run_id() -> str:
     stamp = datetime.now(timezone.utc).strftime("%Y%m%d_%H%M%S")
     return f"run_{stamp}"
@@ -0,0 +1,58 @@
+from __future__ import annotations
+
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple
+import copy
+import threading
+
+from bookforge.llm.client import LLMClient
+from bookforge.phases.plan import SpeculativePlan, adopt_speculative_plan, speculate_scene_card
+from bookforge.pipeline.log import _status
+from bookforge.pipeline.metrics import attributed_to
+
+
+class _SpeculativePlanner:
+    def __init__(self, workspace: Path, book_id: str, client: LLMClient, model: str) -> None:
+        self.workspace = workspace
+        self.book_id = book_id
+        self.client = client
+        self.model = model
+        self._key: Optional[Tuple[int, int]] = None
+        self._thread: Optional[threading.Thread] = None
+        self._result: Dict[str, Any] = {}
+
+    def start(self, chapter: int, scene: int, state: Dict[str, Any]) -> None:
+        # Snapshot now: the runner keeps mutating state while the planner thread renders its prompt.
+        snapshot = copy.deepcopy(state)
+        result: Dict[str, Any] = {}
+
+        def _run() -> None:
+            try:
+                # Runs while the runner has "write" open; bill its calls to planning.
+                with attributed_to("plan"):
+                    result["plan"] = speculate_scene_card(self.workspace, self.book_id, chapter, scene, snapshot, self.client, self.model)
+            except BaseException as exc:
+                result["error"] = exc
+
+        # Daemon so a quota pause or early exit never waits on a plan nobody will use.
+        thread = threading.Thread(target=_run, name="bookforge-speculative-plan", daemon=True)
+        self._key, self._thread, self._result = (chapter, scene), thread, result
+        thread.start()
+
+    def discard(self) -> None:
+        self._key, self._thread, self._result = None, None, {}
+
+    def take(self, chapter: int, scene: int) -> Optional[Path]:
+        key, thread, result = self._key, self._thread, self._result
+        self.discard()
+        if key != (chapter, scene) or thread is None:
+            return None
+        thread.join()
+        plan: Optional[SpeculativePlan] = result.get("plan")
+        if plan is None:
+            _status(f"Speculative plan failed ({result.get('error')}); planning ch{chapter:03d} sc{scene:03d} now")
+            return None
+        path = adopt_speculative_plan(self.workspace, self.book_id, plan)
+        if path is None:
+            _status(f"Speculative scene card stale after commit; re-planning ch{chapter:03d} sc{scene:03d}")
+        return path
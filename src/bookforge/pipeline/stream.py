@@ -0,0 +1,89 @@
+from __future__ import annotations
+
+from pathlib import Path
+from typing import List, Optional
+import re
+
+_PATCH_MARKER = re.compile(r"STATE\s*_(?:OKPATCH|PATCH)\s*:", re.IGNORECASE)
+DEFAULT_STREAM_FLUSH_CHARS = 2048
+_MARKER_OVERLAP = 32
+
+
+class _SceneStreamWatcher:
+    # Prose preview and runaway guard for a streamed write. The STATE_PATCH itself is parsed
+    # once, from the finished response, so only the marker position is tracked here.
+
+    def __init__(self, partial_path: Optional[Path] = None, max_chars: int = 0, flush_chars: int = DEFAULT_STREAM_FLUSH_CHARS) -> None:
+        self.partial_path = partial_path
+        self.max_chars = max(0, int(max_chars))
+        self.flush_chars = max(1, int(flush_chars))
+        self.reset()
+
+    def reset(self) -> None:
+        self._parts: List[str] = []
+        self._length = 0
+        self._marker_start: Optional[int] = None
+        self._carry = ""
+        self._flushed = 0
+        self.runaway = False
+        if self.partial_path is not None and self.partial_path.exists():
+            self.partial_path.unlink()
+
+    @property
+    def text(self) -> str:
+        return "".join(self._parts)
+
+    @property
+    def prose_text(self) -> str:
+        text = self.text
+        if self._marker_start is None:
+            return text
+        return text[:self._marker_start]
+
+    def feed(self, chunk: str) -> bool:
+        if not chunk:
+            return False
+        self._parts.append(chunk)
+        self._length += len(chunk)
+        if self._marker_start is None:
+            # Search only the new chunk plus a short overlap so a marker split
+            # across chunks is still found without rescanning the whole text.
+            window = self._carry + chunk
+            offset = self._length - len(window)
+            match = _PATCH_MARKER.search(window)
+            if match:
+                self._marker_start = offset + match.start()
+                self._flush(force=True)
+            else:
+                self._carry = window[-_MARKER_OVERLAP:]
+                self._flush()
+        if self.max_chars and self._length > self.max_chars:
+            self.runaway = True
+            self._flush(force=True, final=True)
+            return True
+        return False
+
+    def finish(self) -> None:
+        self._flush(force=True, final=True)
+
+    def discard(self) -> None:
+        if self.partial_path is not None and self.partial_path.exists():
+            self.partial_path.unlink()
+
+    def _flush(self, force: bool = False, final: bool = False) -> None:
+        if self.partial_path is None:
+            return
+        if self._marker_start is not None:
+            limit = self._marker_start
+        elif final:
+            limit = self._length
+        else:
+            # Hold back the overlap so a half-streamed marker never lands in the artifact.
+            limit = max(0, self._length - _MARKER_OVERLAP)
+        pending = limit - self._flushed
+        if pending <= 0 or (not force and pending < self.flush_chars):
+            return
+        self.partial_path.parent.mkdir(parents=True, exist_ok=True)
+        with self.partial_path.open("a", encoding="utf-8") as handle:
+            handle.write(self.text[self._flushed:limit])
+        self._flushed = limit
@@ -1,17 +1,39 @@
-from .budgeter import BudgetReport, BudgetSection, evaluate_budget, estimate_tokens
+from .budgeter import (
+    BPETokenCounter,
+    BudgetReport,
+    BudgetSection,
+    CharRatioCounter,
+    TokenCounter,
+    estimate_tokens,
+    evaluate_budget,
+    set_token_counter,
+    token_counter,
+)
 from .excerpt_policy import ExcerptPolicy, build_excerpt_policy
 from .hashing import PromptHashes, hash_prompt_parts, hash_text
 from .injection_policy import InjectionPolicy, build_injection_policy
 from .registry import PromptRegistry, load_registry
-from .renderer import load_template, render_template, render_template_file
+from .renderer import (
+    CompiledTemplate,
+    compile_template,
+    load_compiled_template,
+    load_template,
+    render_template,
+    render_template_file,
+)
 from .serialization import dumps_json
 from .system import build_system_prompt, write_system_prompt
 
 __all__ = [
+    "BPETokenCounter",
     "BudgetReport",
     "BudgetSection",
+    "CharRatioCounter",
+    "TokenCounter",
     "evaluate_budget",
     "estimate_tokens",
+    "set_token_counter",
+    "token_counter",
     "ExcerptPolicy",
     "build_excerpt_policy",
     "PromptHashes",
@@ -21,6 +43,9 @@ __all__ = [
     "build_injection_policy",
     "PromptRegistry",
     "load_registry",
+    "CompiledTemplate",
+    "compile_template",
+    "load_compiled_template",
     "load_template",
     "render_template",
     "render_template_file",
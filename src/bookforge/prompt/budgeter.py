@@ -1,14 +1,200 @@
 from __future__ import annotations
 
+from abc import ABC, abstractmethod
+from collections import OrderedDict
 from dataclasses import dataclass
-from typing import Any, Dict, List, Optional
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+import base64
+import hashlib
+import math
+import re
+import threading
 
+from bookforge.config.env import read_env_value
 
-def estimate_tokens(text: str) -> int:
-    chars = len(text)
-    if chars <= 0:
-        return 0
-    return max(1, (chars + 3) // 4)
+DEFAULT_CHARS_PER_TOKEN = 4.0
+CALIBRATION_MIN_SAMPLES = 3
+CALIBRATION_MIN_CHARS = 256
+CALIBRATION_ALPHA = 0.2
+COUNT_CACHE_ENTRIES = 4096
+COUNT_CACHE_MIN_CHARS = 64
+
+
+class TokenCounter(ABC):
+    name = "chars"
+
+    @abstractmethod
+    def count(self, text: str) -> int:
+        raise NotImplementedError
+
+
+class CharRatioCounter(TokenCounter):
+    def __init__(self, chars_per_token: float = DEFAULT_CHARS_PER_TOKEN, name: str = "chars") -> None:
+        self.chars_per_token = chars_per_token
+        self.name = name
+
+    def count(self, text: str) -> int:
+        chars = len(text)
+        if chars <= 0:
+            return 0
+        return max(1, math.ceil(chars / self.chars_per_token))
+
+
+# Close to the cl100k/o200k pre-tokenizer within what the stdlib re module supports.
+_PRETOKEN = re.compile(r"""'(?:[sdmt]|ll|ve|re)| ?[^\W\d_]+| ?\d{1,3}| ?[^\s\w]+|\s+(?!\S)|\s+""")
+
+
+class BPETokenCounter(TokenCounter):
+    # Byte-level BPE over a tiktoken-format rank file ("<base64 token> <rank>" per line).
+
+    def __init__(self, ranks: Dict[bytes, int], name: str = "bpe") -> None:
+        self.ranks = ranks
+        self.name = name
+        self._pieces: Dict[bytes, int] = {}
+
+    @classmethod
+    def from_file(cls, path: Path) -> "BPETokenCounter":
+        ranks: Dict[bytes, int] = {}
+        for line in path.read_text(encoding="utf-8").splitlines():
+            parts = line.split()
+            if len(parts) == 2:
+                ranks[base64.b64decode(parts[0])] = int(parts[1])
+        return cls(ranks, name=f"bpe:{path.name}")
+
+    def _piece_tokens(self, piece: bytes) -> int:
+        if piece in self.ranks:
+            return 1
+        cached = self._pieces.get(piece)
+        if cached is not None:
+            return cached
+        parts = [piece[idx:idx + 1] for idx in range(len(piece))]
+        while len(parts) > 1:
+            best = -1
+            best_rank = 0
+            for idx in range(len(parts) - 1):
+                rank = self.ranks.get(parts[idx] + parts[idx + 1])
+                if rank is not None and (best < 0 or rank < best_rank):
+                    best, best_rank = idx, rank
+            if best < 0:
+                break
+            parts[best:best + 2] = [parts[best] + parts[best + 1]]
+        if len(self._pieces) < COUNT_CACHE_ENTRIES * 4:
+            self._pieces[piece] = len(parts)
+        return len(parts)
+
+    def count(self, text: str) -> int:
+        return sum(self._piece_tokens(piece.encode("utf-8")) for piece in _PRETOKEN.findall(text))
+
+
+_DEFAULT_COUNTER = CharRatioCounter()
+_COUNTER_LOCK = threading.Lock()
+_COUNTERS: Dict[str, TokenCounter] = {}
+_VOCABS: Dict[str, Tuple[Tuple[int, int], BPETokenCounter]] = {}
+_CALIBRATION: Dict[str, Dict[str, float]] = {}
+# Keyed on the counter object itself: two counters can share a name (a reloaded vocab,
+# a re-registered counter) and still disagree. Entries hold the counter so its id stays
+# unique for as long as they live.
+_COUNT_CACHE: "OrderedDict[Tuple[int, bytes], Tuple[TokenCounter, int]]" = OrderedDict()
+
+
+def _forget_counts(counter: Optional[TokenCounter]) -> None:
+    # Caller holds _COUNTER_LOCK.
+    if counter is None:
+        return
+    stale = [key for key, (owner, _) in _COUNT_CACHE.items() if owner is counter]
+    for key in stale:
+        del _COUNT_CACHE[key]
+
+
+def set_token_counter(counter: Optional[TokenCounter], provider: Optional[str] = None) -> None:
+    key = str(provider or "").strip().lower()
+    with _COUNTER_LOCK:
+        previous = _COUNTERS.pop(key, None) if counter is None else _COUNTERS.get(key)
+        if counter is not None:
+            _COUNTERS[key] = counter
+        if previous is not counter:
+            _forget_counts(previous)
+
+
+def _vocab_counter(provider: str) -> Optional[BPETokenCounter]:
+    raw = ""
+    if provider:
+        raw = read_env_value(f"BOOKFORGE_{provider.upper()}_TOKENIZER_VOCAB") or ""
+    raw = raw or read_env_value("BOOKFORGE_TOKENIZER_VOCAB") or ""
+    if not raw.strip():
+        return None
+    path = Path(raw.strip()).expanduser()
+    try:
+        stat = path.stat()
+    except OSError:
+        return None
+    stamp = (stat.st_mtime_ns, stat.st_size)
+    with _COUNTER_LOCK:
+        cached = _VOCABS.get(str(path))
+    if cached is not None and cached[0] == stamp:
+        return cached[1]
+    counter = BPETokenCounter.from_file(path)
+    with _COUNTER_LOCK:
+        _VOCABS[str(path)] = (stamp, counter)
+        if cached is not None:
+            _forget_counts(cached[1])
+    return counter
+
+
+def token_counter(provider: Optional[str] = None) -> TokenCounter:
+    # Explicit registration, then a local BPE vocab, then the chars/token ratio learned
+    # from this provider's reported prompt_tokens, then the plain chars/4 heuristic.
+    key = str(provider or "").strip().lower()
+    with _COUNTER_LOCK:
+        registered = _COUNTERS.get(key) or _COUNTERS.get("")
+        calibration = dict(_CALIBRATION.get(key) or {}) if key else {}
+    if registered is not None:
+        return registered
+    vocab = _vocab_counter(key)
+    if vocab is not None:
+        return vocab
+    if calibration.get("samples", 0) >= CALIBRATION_MIN_SAMPLES:
+        return CharRatioCounter(calibration["ratio"], name=f"calibrated:{key}")
+    return _DEFAULT_COUNTER
+
+
+def observe_prompt_tokens(provider: str, prompt_chars: int, prompt_tokens: Optional[int]) -> None:
+    # Short prompts are dominated by per-message framing tokens and would skew the ratio.
+    key = str(provider or "").strip().lower()
+    if not key or not prompt_tokens or prompt_tokens <= 0 or prompt_chars < CALIBRATION_MIN_CHARS:
+        return
+    ratio = prompt_chars / prompt_tokens
+    if not 1.0 <= ratio <= 12.0:
+        return
+    with _COUNTER_LOCK:
+        entry = _CALIBRATION.setdefault(key, {"ratio": ratio, "samples": 0})
+        if entry["samples"]:
+            entry["ratio"] += CALIBRATION_ALPHA * (ratio - entry["ratio"])
+        entry["samples"] += 1
+
+
+def token_calibration_stats() -> Dict[str, Dict[str, float]]:
+    with _COUNTER_LOCK:
+        return {provider: dict(entry) for provider, entry in _CALIBRATION.items()}
+
+
+def estimate_tokens(text: str, provider: Optional[str] = None) -> int:
+    counter = token_counter(provider)
+    if isinstance(counter, CharRatioCounter) or len(text) < COUNT_CACHE_MIN_CHARS:
+        return counter.count(text)
+    key = (id(counter), hashlib.blake2b(text.encode("utf-8"), digest_size=16).digest())
+    with _COUNTER_LOCK:
+        cached = _COUNT_CACHE.get(key)
+        if cached is not None and cached[0] is counter:
+            _COUNT_CACHE.move_to_end(key)
+            return cached[1]
+    tokens = counter.count(text)
+    with _COUNTER_LOCK:
+        _COUNT_CACHE[key] = (counter, tokens)
+        while len(_COUNT_CACHE) > COUNT_CACHE_ENTRIES:
+            _COUNT_CACHE.popitem(last=False)
+    return tokens
 
 
 @dataclass(frozen=True)
@@ -36,7 +222,12 @@ def _normalize_budget(value: Any) -> Optional[int]:
     return None
 
 
-def evaluate_budget(step: str, segments: Dict[str, str], budgets: Dict[str, Any]) -> BudgetReport:
+def evaluate_budget(
+    step: str,
+    segments: Dict[str, str],
+    budgets: Dict[str, Any],
+    provider: Optional[str] = None,
+) -> BudgetReport:
     step_budget = budgets.get(step, {}) if isinstance(budgets, dict) else {}
     sections: List[BudgetSection] = []
     total_chars = 0
@@ -46,7 +237,7 @@ def evaluate_budget(step: str, segments: Dict[str, str], budgets: Dict[str, Any]
     for name, value in segments.items():
         text = value or ""
         chars = len(text)
-        tokens = estimate_tokens(text)
+        tokens = estimate_tokens(text, provider)
         budget_tokens = _normalize_budget(step_budget.get(name))
         section_over = budget_tokens is not None and tokens > budget_tokens
         sections.append(
@@ -0,0 +1,130 @@
+from __future__ import annotations
+
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+import json
+import threading
+
+from .budgeter import estimate_tokens
+
+SUMMARY_KEYS = ("chapter_id", "title", "goal", "chapter_role")
+
+
+def _minify(data: Any) -> str:
+    return json.dumps(data, ensure_ascii=True, separators=(",", ":"))
+
+
+def _chapter_number(chapter: Dict[str, Any]) -> Optional[int]:
+    try:
+        return int(chapter.get("chapter_id"))
+    except (TypeError, ValueError):
+        return None
+
+
+def _chapter_scenes(chapter: Dict[str, Any]) -> Iterable[Dict[str, Any]]:
+    sections = chapter.get("sections") if isinstance(chapter.get("sections"), list) else []
+    for section in sections:
+        if isinstance(section, dict) and isinstance(section.get("scenes"), list):
+            yield from (scene for scene in section["scenes"] if isinstance(scene, dict))
+    if isinstance(chapter.get("scenes"), list):
+        yield from (scene for scene in chapter["scenes"] if isinstance(scene, dict))
+
+
+def _appearance_index(chapters: List[Dict[str, Any]], field: str) -> Dict[str, List[int]]:
+    index: Dict[str, List[int]] = {}
+    for chapter in chapters:
+        number = _chapter_number(chapter)
+        if number is None:
+            continue
+        for scene in _chapter_scenes(chapter):
+            values = scene.get(field) if isinstance(scene.get(field), list) else []
+            for value in values:
+                token = str(value).strip()
+                if not token:
+                    continue
+                seen = index.setdefault(token, [])
+                if not seen or seen[-1] != number:
+                    seen.append(number)
+    return index
+
+
+class OutlineDigest:
+    # A parsed outline that renders a chapter window: full detail near the current
+    # chapter, one-line summaries elsewhere, plus thread/character chapter indexes so
+    # the model can still see where distant material comes back.
+
+    def __init__(self, outline: Any) -> None:
+        self.outline = outline if isinstance(outline, dict) else {}
+        chapters = self.outline.get("chapters") if isinstance(self.outline.get("chapters"), list) else []
+        self.chapters = [chapter for chapter in chapters if isinstance(chapter, dict)]
+        self.full_text = _minify(outline)
+        self.thread_index = _appearance_index(self.chapters, "threads")
+        self.character_index = _appearance_index(self.chapters, "characters")
+        self._windows: Dict[Tuple[int, int], str] = {}
+        self._lock = threading.Lock()
+
+    def window(self, chapter: int, radius: int) -> str:
+        if radius < 0 or not self.chapters:
+            return self.full_text
+        key = (int(chapter), int(radius))
+        with self._lock:
+            cached = self._windows.get(key)
+        if cached is not None:
+            return cached
+        sliced = []
+        for entry in self.chapters:
+            number = _chapter_number(entry)
+            if number is not None and abs(number - chapter) <= radius:
+                sliced.append(entry)
+            else:
+                sliced.append({name: entry[name] for name in SUMMARY_KEYS if name in entry})
+        digest = {key_name: value for key_name, value in self.outline.items() if key_name != "chapters"}
+        digest["chapters"] = sliced
+        digest["window"] = {"chapter": int(chapter), "radius": int(radius)}
+        digest["thread_chapters"] = self.thread_index
+        digest["character_chapters"] = self.character_index
+        text = _minify(digest)
+        with self._lock:
+            self._windows[key] = text
+        return text
+
+
+_LOCK = threading.Lock()
+_DIGESTS: Dict[str, Tuple[Tuple[int, int], OutlineDigest]] = {}
+_SAVINGS: Dict[str, Dict[str, int]] = {}
+
+
+def outline_digest(outline_path: Path) -> Optional[OutlineDigest]:
+    try:
+        stat = outline_path.stat()
+    except OSError:
+        return None
+    stamp = (stat.st_mtime_ns, stat.st_size)
+    key = str(outline_path)
+    with _LOCK:
+        cached = _DIGESTS.get(key)
+    if cached is not None and cached[0] == stamp:
+        return cached[1]
+    try:
+        outline = json.loads(outline_path.read_text(encoding="utf-8"))
+    except json.JSONDecodeError:
+        return None
+    digest = OutlineDigest(outline)
+    with _LOCK:
+        _DIGESTS[key] = (stamp, digest)
+    return digest
+
+
+def record_outline_savings(phase: str, digest: OutlineDigest, text: str) -> None:
+    full_tokens = estimate_tokens(digest.full_text)
+    sent_tokens = estimate_tokens(text)
+    with _LOCK:
+        entry = _SAVINGS.setdefault(phase, {"calls": 0, "full_tokens": 0, "sent_tokens": 0})
+        entry["calls"] += 1
+        entry["full_tokens"] += full_tokens
+        entry["sent_tokens"] += sent_tokens
+
+
+def outline_savings_stats() -> Dict[str, Dict[str, int]]:
+    with _LOCK:
+        return {phase: dict(entry) for phase, entry in _SAVINGS.items()}
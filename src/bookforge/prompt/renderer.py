@@ -1,25 +1,119 @@
 from __future__ import annotations
 
+from dataclasses import dataclass
+from functools import lru_cache
 from pathlib import Path
-from typing import Dict
+from typing import Dict, FrozenSet, List, Mapping, Set, Tuple
+import re
+import threading
 
 from .serialization import dumps_json
 
+_PLACEHOLDER = re.compile(r"\{\{([^{}\s]+)\}\}")
+
+
+@dataclass(frozen=True)
+class CompiledTemplate:
+    # literals[i] precedes keys[i]; literals has one more entry than keys.
+    literals: Tuple[str, ...]
+    keys: Tuple[str, ...]
+
+    @property
+    def placeholders(self) -> FrozenSet[str]:
+        return frozenset(self.keys)
+
+    def render(self, values: Mapping[str, object]) -> str:
+        rendered: Dict[str, str] = {}
+        parts: List[str] = [self.literals[0]]
+        for key, literal in zip(self.keys, self.literals[1:]):
+            text = rendered.get(key)
+            if text is None:
+                if key in values:
+                    value = values[key]
+                    text = value if isinstance(value, str) else dumps_json(value)
+                else:
+                    text = "{{" + key + "}}"
+                rendered[key] = text
+            parts.append(text)
+            parts.append(literal)
+        return "".join(parts)
+
+
+@dataclass(frozen=True)
+class TemplateRenderReport:
+    missing: Tuple[str, ...]
+    unused: Tuple[str, ...]
+
+
+@lru_cache(maxsize=64)
+def compile_template(template_text: str) -> CompiledTemplate:
+    literals: List[str] = []
+    keys: List[str] = []
+    cursor = 0
+    for match in _PLACEHOLDER.finditer(template_text):
+        literals.append(template_text[cursor:match.start()])
+        keys.append(match.group(1))
+        cursor = match.end()
+    literals.append(template_text[cursor:])
+    return CompiledTemplate(literals=tuple(literals), keys=tuple(keys))
+
+
+_LOCK = threading.Lock()
+_TEMPLATES: Dict[str, Tuple[Tuple[int, int], CompiledTemplate]] = {}
+_STATS: Dict[str, int] = {"renders": 0, "compiles": 0}
+_GAPS: Dict[str, Tuple[Set[str], Set[str]]] = {}
+
 
 def load_template(path: Path) -> str:
     return path.read_text(encoding="utf-8")
 
 
+def load_compiled_template(path: Path) -> CompiledTemplate:
+    stat = path.stat()
+    stamp = (stat.st_mtime_ns, stat.st_size)
+    key = str(path)
+    with _LOCK:
+        cached = _TEMPLATES.get(key)
+    if cached is not None and cached[0] == stamp:
+        return cached[1]
+    compiled = compile_template(load_template(path))
+    with _LOCK:
+        _TEMPLATES[key] = (stamp, compiled)
+        _STATS["compiles"] += 1
+    return compiled
+
+
+def template_report(compiled: CompiledTemplate, values: Mapping[str, object]) -> TemplateRenderReport:
+    placeholders = compiled.placeholders
+    return TemplateRenderReport(
+        missing=tuple(sorted(placeholders.difference(values))),
+        unused=tuple(sorted(set(values).difference(placeholders))),
+    )
+
+
 def render_template(template_text: str, values: Dict[str, object]) -> str:
-    rendered = template_text
-    for key in sorted(values.keys()):
-        token = "{{" + key + "}}"
-        value = values[key]
-        if not isinstance(value, str):
-            value = dumps_json(value)
-        rendered = rendered.replace(token, value)
-    return rendered
+    # Placeholders without a value are left in place; values are never re-scanned for
+    # placeholders, so a value containing "{{key}}" text is inserted verbatim.
+    return compile_template(template_text).render(values)
 
 
 def render_template_file(path: Path, values: Dict[str, object]) -> str:
-    return render_template(load_template(path), values)
+    compiled = load_compiled_template(path)
+    report = template_report(compiled, values)
+    with _LOCK:
+        _STATS["renders"] += 1
+        if report.missing or report.unused:
+            missing, unused = _GAPS.setdefault(path.name, (set(), set()))
+            missing.update(report.missing)
+            unused.update(report.unused)
+    return compiled.render(values)
+
+
+def template_render_stats() -> Dict[str, object]:
+    with _LOCK:
+        return {
+            "renders": _STATS["renders"],
+            "compiles": _STATS["compiles"],
+            "missing": {name: sorted(gaps[0]) for name, gaps in _GAPS.items() if gaps[0]},
+            "unused": {name: sorted(gaps[1]) for name, gaps in _GAPS.items() if gaps[1]},
+        }
@@ -1,8 +1,47 @@
 from __future__ import annotations
 
+from collections import OrderedDict
+from typing import Any, Dict
+import hashlib
 import json
-from typing import Any
+import threading
+
+SERIALIZATION_CACHE_ENTRIES = 128
+
+_LOCK = threading.Lock()
+_CACHE: "OrderedDict[bytes, str]" = OrderedDict()
+_STATS: Dict[str, int] = {"hits": 0, "misses": 0}
+
+
+def _content_key(data: Any) -> bytes:
+    # Without indent json.dumps runs on the C encoder, several times faster than the
+    # pure-Python indented path, so it is cheap enough to key on content directly.
+    compact = json.dumps(data, ensure_ascii=True, sort_keys=True, separators=(",", ":"))
+    return hashlib.blake2b(compact.encode("ascii"), digest_size=20).digest()
 
 
 def dumps_json(data: Any) -> str:
-    return json.dumps(data, ensure_ascii=True, sort_keys=True, indent=2)
+    # The same state / scene card / registries are serialised by every phase of a
+    # scene; equal content returns the very same string, which also keeps the
+    # dynamic part of prompts byte-identical for provider prefix caches.
+    if isinstance(data, (str, int, float, bool)) or data is None:
+        return json.dumps(data, ensure_ascii=True, sort_keys=True, indent=2)
+    key = _content_key(data)
+    with _LOCK:
+        cached = _CACHE.get(key)
+        if cached is not None:
+            _CACHE.move_to_end(key)
+            _STATS["hits"] += 1
+            return cached
+    text = json.dumps(data, ensure_ascii=True, sort_keys=True, indent=2)
+    with _LOCK:
+        _STATS["misses"] += 1
+        _CACHE[key] = text
+        while len(_CACHE) > SERIALIZATION_CACHE_ENTRIES:
+            _CACHE.popitem(last=False)
+    return text
+
+
+def serialization_stats() -> Dict[str, int]:
+    with _LOCK:
+        return dict(_STATS, entries=len(_CACHE))
@@ -2,6 +2,7 @@ from __future__ import annotations
 
 import json
 from pathlib import Path
+from typing import Optional
 
 
 def build_system_prompt(
@@ -50,6 +51,7 @@ def load_system_prompt(
     system_path: Path,
     outline_path: Path | None = None,
     include_outline: bool = False,
+    outline_text: Optional[str] = None,
 ) -> str:
     base = system_path.read_text(encoding="utf-8")
     if not include_outline:
@@ -58,6 +60,17 @@ def load_system_prompt(
         return base
     if outline_path is None or not outline_path.exists():
         return base
+    if outline_text is not None:
+        if not outline_text:
+            return base
+        return (
+            base.rstrip()
+            + "\n\n## Book Outline (minified JSON, chapter window)\n"
+            + "Authoritative story map; follow it. Chapters outside the window are summarized; "
+            + "thread_chapters and character_chapters list where each thread and character appears.\n"
+            + outline_text
+            + "\n"
+        )
     outline = minify_outline_json(outline_path)
     if not outline:
         return base
@@ -12,7 +12,10 @@ from bookforge.config.env import load_config
 from bookforge.characters import characters_ready, generate_characters, resolve_character_state_path, ensure_character_index, create_character_state_path, refresh_appearance_projections
 from bookforge.llm.client import LLMClient
 from bookforge.llm.errors import LLMRequestError
+from bookforge.llm.logging import flush_llm_logs, llm_log_writer_stats
 from bookforge.llm.factory import get_llm_client, resolve_model
+from bookforge.llm.cache import response_cache_stats
+from bookforge.llm.transport import transport_stats
 from bookforge.llm.types import LLMResponse, Message
 from bookforge.memory.continuity import (
     continuity_pack_path,
@@ -27,18 +30,23 @@ from bookforge.phases.continuity_phase import _generate_continuity_pack
 from bookforge.phases.write_phase import _write_scene
 from bookforge.phases.repair_phase import _repair_scene
 from bookforge.phases.state_repair_phase import _state_repair
-from bookforge.phases.lint_phase import _lint_scene
-from bookforge.prompt.renderer import render_template_file
-from bookforge.pipeline.config import _style_anchor_max_tokens, _durable_slice_max_expansions, _lint_mode
+from bookforge.phases.lint_phase import _lint_scene, lint_prepass_stats
+from bookforge.prompt.renderer import render_template_file, template_render_stats
+from bookforge.prompt.budgeter import token_calibration_stats
+from bookforge.prompt.outline_digest import outline_savings_stats
+from bookforge.prompt.serialization import serialization_stats
+from bookforge.pipeline.config import _style_anchor_max_tokens, _durable_slice_max_expansions, _lint_mode, _pipeline_planning_enabled, _trace_enabled
 from bookforge.pipeline.outline import _outline_summary, _build_character_registry, _build_thread_registry, _character_name_map, _character_id_map
 from bookforge.pipeline.scene import _scene_cast_ids_from_outline, _load_character_states, _parse_until
 from bookforge.pipeline.state_apply import _summary_from_state, _apply_state_patch, _apply_character_updates, _apply_character_stat_updates, _update_bible, _rollup_chapter_summary, _compile_chapter_markdown
 from bookforge.pipeline.durable import _apply_durable_state_updates
+from bookforge.memory.durable_state import durable_store
 from bookforge.pipeline.io import _load_json, _snapshot_character_states_before_preflight, _log_scope, _write_scene_files
 from bookforge.pipeline.phase_history import _load_phase_history, _record_phase_success, _write_phase_artifact
-from bookforge.pipeline.run_logging import _current_run_id, _write_latest_run_pointer, _run_log_path, _append_run_log
+from bookforge.pipeline.run_logging import _current_run_id, _write_latest_run_pointer, _run_log_path, _run_metrics_path, _run_trace_path, _append_run_log
 from bookforge.pipeline.lint import _lint_issue_entries, _lint_has_issue_code
 from bookforge.pipeline.llm_ops import _chat
+from bookforge.pipeline.metrics import start_run_metrics, stop_run_metrics
 from bookforge.pipeline.prompts import _resolve_template
 from bookforge.pipeline.lint import _pov_drift_issues, _stat_mismatch_issues, _durable_scene_constraint_issues
 from bookforge.pipeline.parse import _extract_authoritative_surfaces
@@ -50,7 +58,9 @@ from bookforge.pipeline.lint import _heuristic_invariant_issues, _linked_durable
 from bookforge.pipeline.durable import _durable_state_context
 from bookforge.pipeline.parse import _extract_prose_and_patch
 from bookforge.pipeline.log import _status, _now_iso, set_run_log_path
-from bookforge.util.schema import validate_json
+from bookforge.pipeline.speculation import _SpeculativePlanner
+from bookforge.util.schema import schema_validation_stats, validate_json
+from bookforge.util.trace import span, start_trace, stop_trace
 
 PAUSE_EXIT_CODE = 75
 
@@ -245,6 +255,7 @@ def _pause_on_reason(
         except Exception:
             pass
     _write_reason_pause_marker(book_root, phase, reason_code, message, scene_card, details)
+    durable_store(book_root).flush()
     _status(f"Run paused ({reason_code}) in phase '{phase}': {message}")
     raise SystemExit(PAUSE_EXIT_CODE)
 
@@ -301,6 +312,7 @@ def _pause_on_quota(
         except Exception:
             pass
     _write_pause_marker(book_root, phase, error, scene_card)
+    durable_store(book_root).flush()
     _status(f"Run paused due to quota in phase '{phase}': {error}")
     raise SystemExit(PAUSE_EXIT_CODE)
 
@@ -421,6 +433,36 @@ def _ensure_style_anchor(
     save_style_anchor(anchor_path, text)
     return text
 
+
+_RUN_COUNTERS = {
+    "http_pool": transport_stats,
+    "llm_cache": response_cache_stats,
+    "lint_prepass": lint_prepass_stats,
+    "schema": schema_validation_stats,
+    "templates": template_render_stats,
+    "serialization": serialization_stats,
+    "outline": outline_savings_stats,
+    "tokens": token_calibration_stats,
+    "llm_logs": llm_log_writer_stats,
+}
+
+
+def _finish_run_metrics(book_root: Path, run_id: str) -> None:
+    trace_path = stop_trace()
+    if trace_path is not None:
+        _status(f"Run trace: {trace_path}")
+    metrics = stop_run_metrics()
+    if metrics is None:
+        return
+    table = metrics.summary_table()
+    _append_run_log(book_root, run_id, "metrics:")
+    for line in table.splitlines():
+        _append_run_log(book_root, run_id, line)
+    _status(f"Run metrics: {metrics.path}")
+    for line in table.splitlines():
+        _status(line)
+
+
 def run_loop(
     workspace: Path,
     book_id: str,
@@ -452,6 +494,9 @@ def run_loop(
     _append_run_log(book_root, run_id, f"run_id: {run_id}")
     _append_run_log(book_root, run_id, f"book_id: {book_id}")
     _append_run_log(book_root, run_id, f"started_at: {_now_iso()}")
+    metrics = start_run_metrics(run_id, _run_metrics_path(book_root, run_id), _RUN_COUNTERS)
+    if _trace_enabled():
+        start_trace(_run_trace_path(book_root, run_id))
 
     book = _load_json(book_path)
     outline = _load_json(outline_path)
@@ -470,13 +515,13 @@ def run_loop(
         steps_remaining = steps
 
     config = load_config()
-    planner_client = get_llm_client(config, phase="planner")
-    continuity_client = get_llm_client(config, phase="continuity")
-    preflight_client = get_llm_client(config, phase="preflight")
-    writer_client = get_llm_client(config, phase="writer")
-    repair_client = get_llm_client(config, phase="repair")
-    state_repair_client = get_llm_client(config, phase="state_repair")
-    linter_client = get_llm_client(config, phase="linter")
+    planner_client = get_llm_client(config, phase="planner", workspace=workspace)
+    continuity_client = get_llm_client(config, phase="continuity", workspace=workspace)
+    preflight_client = get_llm_client(config, phase="preflight", workspace=workspace)
+    writer_client = get_llm_client(config, phase="writer", workspace=workspace)
+    repair_client = get_llm_client(config, phase="repair", workspace=workspace)
+    state_repair_client = get_llm_client(config, phase="state_repair", workspace=workspace)
+    linter_client = get_llm_client(config, phase="linter", workspace=workspace)
     planner_model = resolve_model("planner", config)
     continuity_model = resolve_model("continuity", config)
     preflight_model = resolve_model("preflight", config)
@@ -503,6 +548,8 @@ def run_loop(
     except LLMRequestError as exc:
         _pause_on_quota(book_root, state_path, None, "style_anchor", exc)
 
+    speculative_planner = _SpeculativePlanner(workspace, book_id, planner_client, planner_model) if _pipeline_planning_enabled() else None
+
     while True:
         state = _load_json(state_path)
         cursor = state.get("cursor", {}) if isinstance(state.get("cursor"), dict) else {}
@@ -520,6 +567,8 @@ def run_loop(
         if steps_remaining is not None and steps_remaining <= 0:
             break
 
+        metrics.scene_start(chapter, scene)
+        metrics.phase("plan")
         scene_card_path = None
         if resume and phase_history:
             resume_artifacts = _phase_artifacts_for_resume(phase_history, "plan", ["scene_card"], book_root)
@@ -527,6 +576,11 @@ def run_loop(
                 scene_card_path = resume_artifacts["scene_card"]
         if scene_card_path is None:
             scene_card_path = _existing_scene_card(state, book_root) if resume else None
+        if scene_card_path is None and speculative_planner is not None:
+            scene_card_path = speculative_planner.take(chapter, scene)
+            if scene_card_path is not None:
+                _record_phase_success(book_root, chapter, scene, "plan", {"scene_card": _artifact_relpath(book_root, scene_card_path)})
+                _status(f"Using speculative scene card: ch{chapter:03d} sc{scene:03d}")
         if scene_card_path is None:
             _status(f"Planning chapter {chapter} scene {scene}...")
             try:
@@ -579,6 +633,7 @@ def run_loop(
         durable_expand_attempts = 0
         durable_expand_max = _durable_slice_max_expansions()
 
+        metrics.phase("characters")
         _status(f"Loading character states (cast only): ch{chapter_num:03d} sc{scene_num:03d}...")
         character_states = _load_character_states(book_root, scene_card)
         _status("Character states loaded OK")
@@ -593,6 +648,7 @@ def run_loop(
             except LLMRequestError as exc:
                 _pause_on_quota(book_root, state_path, state, "appearance_projection", exc, scene_card)
 
+        metrics.phase("preflight")
         _status(f"Preflight state alignment: ch{chapter_num:03d} sc{scene_num:03d}...")
         preflight_patch = None
         if resume and phase_history:
@@ -640,6 +696,7 @@ def run_loop(
         character_states = _load_character_states(book_root, scene_card)
         _status("Preflight alignment complete OK")
 
+        metrics.phase("continuity_pack")
         _status(f"Generating continuity pack: ch{chapter_num:03d} sc{scene_num:03d}...")
         continuity_pack = None
         if resume and phase_history:
@@ -671,6 +728,12 @@ def run_loop(
 
         base_invariants = book.get("invariants", []) if isinstance(book.get("invariants", []), list) else []
 
+        if speculative_planner is not None and (steps_remaining is None or steps_remaining > 1):
+            spec_chapter, spec_scene, spec_done = _advance_cursor(chapter_order, scene_counts, chapter_num, scene_num)
+            if not spec_done and not _cursor_beyond_target(spec_chapter, spec_scene, target, scene_counts):
+                speculative_planner.start(spec_chapter, spec_scene, state)
+
+        metrics.phase("write")
         _status(f"Writing scene: ch{chapter_num:03d} sc{scene_num:03d}...")
         prose = None
         patch = None
@@ -705,6 +768,7 @@ def run_loop(
             _status("Using write artifacts from phase history")
         _status("Write complete OK")
 
+        metrics.phase("state_repair")
         _status(f"Repairing state: ch{chapter_num:03d} sc{scene_num:03d}...")
         state_repair_resumed = False
         if resume and phase_history:
@@ -768,6 +832,7 @@ def run_loop(
             _status("Linting disabled (mode=off).")
         else:
             if lint_report is None:
+                metrics.phase("lint")
                 _status(f"Linting scene: ch{chapter_num:03d} sc{scene_num:03d}...")
                 try:
                     lint_report = _lint_scene(
@@ -811,6 +876,7 @@ def run_loop(
                             + ", ".join(selected)
                         )
 
+                metrics.phase("repair")
                 _status(f"Repairing scene: ch{chapter_num:03d} sc{scene_num:03d}...")
                 try:
                     prose, patch = _repair_scene(
@@ -836,6 +902,7 @@ def run_loop(
                 _status("Repair complete OK")
                 write_attempts += 1
 
+                metrics.phase("state_repair")
                 _status(f"Repairing state: ch{chapter_num:03d} sc{scene_num:03d}...")
                 try:
                     patch = _state_repair(
@@ -873,6 +940,7 @@ def run_loop(
                 post_invariants += post_summary.get("must_stay_true", [])
                 post_invariants += post_summary.get("key_facts_ring", [])
 
+                metrics.phase("lint")
                 _status(f"Linting scene: ch{chapter_num:03d} sc{scene_num:03d}...")
                 try:
                     lint_report = _lint_scene(
@@ -933,6 +1001,7 @@ def run_loop(
         chapter_total = scene_counts.get(chapter_num)
         chapter_end = isinstance(chapter_total, int) and chapter_total > 0 and scene_num >= chapter_total
 
+        metrics.phase("commit")
         _status("Applying state patch...")
         state = _apply_state_patch(state, patch, chapter_end=chapter_end)
         _status("State updated OK")
@@ -1021,11 +1090,24 @@ def run_loop(
             state["status"] = "DRAFTING"
 
         validate_json(state, "state")
-        state_path.write_text(json.dumps(state, ensure_ascii=True, indent=2), encoding="utf-8")
+        with span("write_state", "io"):
+            state_path.write_text(json.dumps(state, ensure_ascii=True, indent=2), encoding="utf-8")
+        if completed or next_chapter != chapter_num:
+            # Chapter boundary: materialize the durable journal into the registry files.
+            with span("durable_flush", "durable"):
+                durable_store(book_root).flush()
+        with span("llm_log_flush", "io"):
+            flush_llm_logs()
+        metrics.scene_end()
 
         if steps_remaining is not None:
             steps_remaining -= 1
 
+    # --steps/--until can stop mid-chapter; materialize the journal for other readers.
+    durable_store(book_root).flush()
+    flush_llm_logs()
+    _finish_run_metrics(book_root, run_id)
+
 def run() -> None:
     raise NotImplementedError("Use run_loop via CLI.")
 
@@ -1,3 +1,3 @@
-from .schema import SCHEMA_VERSION, SchemaValidationError, load_schema, validate_json
+from .schema import SCHEMA_VERSION, SchemaValidationError, is_valid, load_schema, validate_json
 
-__all__ = ["SCHEMA_VERSION", "SchemaValidationError", "load_schema", "validate_json"]
+__all__ = ["SCHEMA_VERSION", "SchemaValidationError", "is_valid", "load_schema", "validate_json"]
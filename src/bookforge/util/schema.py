@@ -2,10 +2,13 @@ from __future__ import annotations
 
 from dataclasses import dataclass
 from pathlib import Path
-from typing import Any
+from typing import Any, Dict, Optional, Tuple
 import json
+import threading
+import time
 
 from bookforge.util.paths import repo_root
+from bookforge.util.trace import span
 
 try:
     from jsonschema import Draft202012Validator
@@ -34,25 +37,85 @@ class SchemaValidationError(Exception):
         return self.message
 
 
+_ROOT_DIR: Optional[Path] = None
+
+_VALIDATOR_LOCK = threading.Lock()
+_VALIDATORS: Dict[str, Tuple[Tuple[int, int], Draft202012Validator]] = {}
+_STATS: Dict[str, float] = {"validations": 0, "failures": 0, "compiles": 0, "seconds": 0.0}
+
+
 def _root_dir() -> Path:
-    return repo_root(Path(__file__).resolve())
+    global _ROOT_DIR
+    if _ROOT_DIR is None:
+        _ROOT_DIR = repo_root(Path(__file__).resolve())
+    return _ROOT_DIR
 
 
-def load_schema(schema_name: str) -> dict:
+def _schema_path(schema_name: str) -> Path:
     if schema_name not in _SCHEMA_MAP:
         raise SchemaValidationError(f"Unknown schema: {schema_name}")
-    path = _root_dir() / "schemas" / _SCHEMA_MAP[schema_name]
+    return _root_dir() / "schemas" / _SCHEMA_MAP[schema_name]
+
+
+def load_schema(schema_name: str) -> dict:
+    path = _schema_path(schema_name)
     if not path.exists():
         raise SchemaValidationError(f"Schema not found: {path}")
     return json.loads(path.read_text(encoding="utf-8"))
 
 
+def _validator(schema_name: str) -> Draft202012Validator:
+    path = _schema_path(schema_name)
+    try:
+        stat = path.stat()
+    except OSError:
+        raise SchemaValidationError(f"Schema not found: {path}")
+    stamp = (stat.st_mtime_ns, stat.st_size)
+    with _VALIDATOR_LOCK:
+        cached = _VALIDATORS.get(schema_name)
+    if cached is not None and cached[0] == stamp:
+        return cached[1]
+    validator = Draft202012Validator(load_schema(schema_name))
+    with _VALIDATOR_LOCK:
+        _VALIDATORS[schema_name] = (stamp, validator)
+        _STATS["compiles"] += 1
+    return validator
+
+
+def _record(started: float, failed: bool) -> None:
+    with _VALIDATOR_LOCK:
+        _STATS["validations"] += 1
+        _STATS["seconds"] += time.perf_counter() - started
+        if failed:
+            _STATS["failures"] += 1
+
+
+def is_valid(data: Any, schema_name: str) -> bool:
+    started = time.perf_counter()
+    with span(f"validate:{schema_name}", "schema"):
+        valid = _validator(schema_name).is_valid(data)
+    _record(started, not valid)
+    return valid
+
+
 def validate_json(data: Any, schema_name: str) -> None:
-    schema = load_schema(schema_name)
-    validator = Draft202012Validator(schema)
-    errors = sorted(validator.iter_errors(data), key=lambda e: list(e.path))
+    started = time.perf_counter()
+    validator = _validator(schema_name)
+    with span(f"validate:{schema_name}", "schema"):
+        # Valid documents are the common case; only collect and sort every error on failure.
+        valid = validator.is_valid(data)
+        errors = [] if valid else sorted(validator.iter_errors(data), key=lambda e: list(e.path))
+    if valid:
+        _record(started, False)
+        return
+    _record(started, True)
     if errors:
         first = errors[0]
         path = ".".join([str(p) for p in first.path])
         message = f"{schema_name} validation failed at {path or '<root>'}: {first.message}"
-        raise SchemaValidationError(message)
\ No newline at end of file
+        raise SchemaValidationError(message)
+
+
+def schema_validation_stats() -> Dict[str, float]:
+    with _VALIDATOR_LOCK:
+        return dict(_STATS)
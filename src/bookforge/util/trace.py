@@ -0,0 +1,143 @@
+from __future__ import annotations
+
+from contextlib import contextmanager, nullcontext
+from functools import wraps
+from pathlib import Path
+from typing import Any, Callable, ContextManager, Dict, Iterator, List, Optional, TypeVar
+import atexit
+import json
+import os
+import threading
+import time
+
+TRACE_MAX_EVENTS = 500000
+
+_F = TypeVar("_F", bound=Callable[..., Any])
+_NULL = nullcontext()
+
+
+class TraceRecorder:
+    # Collects Chrome trace "complete" events (ph=X) against a monotonic clock. The file
+    # loads as-is in chrome://tracing and ui.perfetto.dev; nesting comes from the
+    # timestamps, so spans only need a start and an end on the same thread.
+
+    def __init__(self, path: Path, max_events: int = TRACE_MAX_EVENTS) -> None:
+        self.path = path
+        self.max_events = max_events
+        self.origin = time.perf_counter()
+        self.dropped = 0
+        self._events: List[Dict[str, Any]] = []
+        self._lock = threading.Lock()
+
+    def _micros(self, moment: float) -> float:
+        return round((moment - self.origin) * 1_000_000, 3)
+
+    def complete(self, name: str, cat: str, started: float, ended: float, args: Optional[Dict[str, Any]] = None) -> None:
+        ts = self._micros(started)
+        event: Dict[str, Any] = {
+            "name": name,
+            "cat": cat,
+            "ph": "X",
+            "ts": ts,
+            # Taken from the rounded endpoints so a nested span never pokes out of its parent.
+            "dur": round(max(0.0, self._micros(ended) - ts), 3),
+            "pid": os.getpid(),
+            "tid": threading.get_ident(),
+        }
+        if args:
+            event["args"] = args
+        with self._lock:
+            if len(self._events) >= self.max_events:
+                self.dropped += 1
+                return
+            self._events.append(event)
+
+    def events(self) -> List[Dict[str, Any]]:
+        with self._lock:
+            return list(self._events)
+
+    def write(self) -> Path:
+        events = self.events()
+        metadata = {"dropped_events": self.dropped} if self.dropped else {}
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.path.write_text(
+            json.dumps({"traceEvents": events, "displayTimeUnit": "ms", "otherData": metadata}, ensure_ascii=True),
+            encoding="utf-8",
+        )
+        return self.path
+
+
+_ACTIVE: Optional[TraceRecorder] = None
+
+
+def start_trace(path: Path) -> TraceRecorder:
+    global _ACTIVE
+    _ACTIVE = TraceRecorder(path)
+    return _ACTIVE
+
+
+def current_trace() -> Optional[TraceRecorder]:
+    return _ACTIVE
+
+
+def stop_trace() -> Optional[Path]:
+    global _ACTIVE
+    recorder, _ACTIVE = _ACTIVE, None
+    if recorder is None:
+        return None
+    return recorder.write()
+
+
+def _write_active_trace() -> None:
+    # A paused or crashed run never reaches stop_trace; keep what it recorded.
+    recorder = _ACTIVE
+    if recorder is None:
+        return
+    try:
+        recorder.write()
+    except OSError:
+        pass
+
+
+atexit.register(_write_active_trace)
+
+
+def record_span(name: str, cat: str, started: float, ended: float, args: Optional[Dict[str, Any]] = None) -> None:
+    recorder = _ACTIVE
+    if recorder is not None:
+        recorder.complete(name, cat, started, ended, args)
+
+
+@contextmanager
+def _recorded(recorder: TraceRecorder, name: str, cat: str, args: Dict[str, Any]) -> Iterator[None]:
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        recorder.complete(name, cat, started, time.perf_counter(), args)
+
+
+def span(name: str, cat: str = "pipeline", **args: Any) -> ContextManager[None]:
+    # Tracing is off for almost every run; hand back a shared no-op context then.
+    recorder = _ACTIVE
+    if recorder is None:
+        return _NULL
+    return _recorded(recorder, name, cat, args)
+
+
+def traced(name: str, cat: str = "pipeline") -> Callable[[_F], _F]:
+    def decorate(func: _F) -> _F:
+        @wraps(func)
+        def wrapper(*args: Any, **kwargs: Any) -> Any:
+            recorder = _ACTIVE
+            if recorder is None:
+                return func(*args, **kwargs)
+            started = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                recorder.complete(name, cat, started, time.perf_counter())
+
+        return wrapper  # type: ignore[return-value]
+
+    return decorate
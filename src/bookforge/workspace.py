@@ -10,7 +10,7 @@ from datetime import datetime, timezone
 
 from bookforge.prompt.composition import compose_prompt_templates
 from bookforge.prompt.system import write_system_prompt
-from bookforge.memory.durable_state import ensure_durable_state_files
+from bookforge.memory.durable_state import ensure_durable_state_files, forget_durable_store
 from bookforge.util.paths import repo_root
 from bookforge.util.schema import SCHEMA_VERSION, validate_json
 
@@ -464,6 +464,7 @@ def _collect_reset_archive_targets(
     _add_if_exists(context_dir / 'item_registry.json')
     _add_if_exists(context_dir / 'plot_devices.json')
     _add_if_exists(context_dir / 'durable_commits.json')
+    _add_if_exists(context_dir / 'durable_journal.jsonl')
 
     _add_if_exists(context_dir / 'items')
     _add_if_exists(context_dir / 'plot_devices')
@@ -719,6 +720,8 @@ def reset_book_workspace_detailed(
     _remove_file_if_exists(context_dir / "item_registry.json", report, "durable_files_deleted")
     _remove_file_if_exists(context_dir / "plot_devices.json", report, "durable_files_deleted")
     _remove_file_if_exists(context_dir / "durable_commits.json", report, "durable_files_deleted")
+    _remove_file_if_exists(context_dir / "durable_journal.jsonl", report, "durable_files_deleted")
+    forget_durable_store(book_root)
 
     _remove_dir_if_exists(context_dir / "items", report, "durable_dirs_deleted")
     _remove_dir_if_exists(context_dir / "plot_devices", report, "durable_dirs_deleted")
@@ -0,0 +1,69 @@
+import json
+import threading
+import time
+
+import pytest
+
+from bookforge import characters
+from bookforge.llm.client import LLMClient
+from bookforge.llm.types import LLMResponse
+
+
+class _ProjectionClient(LLMClient):
+    def __init__(self, fail_for: str = "") -> None:
+        super().__init__(provider="test", key_slot="characters")
+        self.fail_for = fail_for
+        self.active = 0
+        self.peak = 0
+        self._lock = threading.Lock()
+
+    def chat(self, messages, model, temperature=0.7, max_tokens=1024):
+        with self._lock:
+            self.active += 1
+            self.peak = max(self.peak, self.active)
+        time.sleep(0.1)
+        with self._lock:
+            self.active -= 1
+        prompt = messages[-1]["content"]
+        if self.fail_for and self.fail_for in prompt:
+            return LLMResponse(text="{}", raw={}, provider="test", model=model)
+        return LLMResponse(text=json.dumps({"summary": "tall, weathered"}), raw={}, provider="test", model=model)
+
+
+def _book_with_cast(tmp_path, cast):
+    book_root = tmp_path / "books" / "b1"
+    characters_dir = book_root / "draft" / "context" / "characters"
+    characters_dir.mkdir(parents=True)
+    for char_id in cast:
+        state = {"character_id": char_id, "name": char_id, "appearance_current": {"atoms": {"hair": "grey"}}, "appearance_projection_pending": True}
+        path = characters_dir / f"{characters._character_slug(char_id)}.state.json"
+        path.write_text(json.dumps(state), encoding="utf-8")
+    return book_root
+
+
+def _summary(book_root, char_id):
+    path = characters.resolve_character_state_path(book_root, char_id)
+    return json.loads(path.read_text(encoding="utf-8"))["appearance_current"].get("summary")
+
+
+def test_refresh_appearance_projections_runs_cast_concurrently(tmp_path, monkeypatch) -> None:
+    monkeypatch.setenv("BOOKFORGE_APPEARANCE_CONCURRENCY", "4")
+    cast = [f"CHAR_{idx}" for idx in range(6)]
+    book_root = _book_with_cast(tmp_path, cast)
+    client = _ProjectionClient()
+
+    refreshed = characters.refresh_appearance_projections(book_root, cast + ["CHAR_0"], client=client, model="m")
+
+    assert refreshed == cast
+    assert 1 < client.peak <= 4
+    assert all(_summary(book_root, char_id) == "tall, weathered" for char_id in cast)
+
+
+def test_refresh_appearance_projections_keeps_successes_when_one_fails(tmp_path) -> None:
+    book_root = _book_with_cast(tmp_path, ["CHAR_A", "CHAR_B"])
+
+    with pytest.raises(ValueError):
+        characters.refresh_appearance_projections(book_root, ["CHAR_A", "CHAR_B"], client=_ProjectionClient(fail_for="CHAR_B"), model="m")
+
+    assert _summary(book_root, "CHAR_A") == "tall, weathered"
+    assert _summary(book_root, "CHAR_B") is None
@@ -1,4 +1,17 @@
-from bookforge.prompt.budgeter import estimate_tokens, evaluate_budget
+import base64
+
+import pytest
+
+from bookforge.prompt.budgeter import (
+    BPETokenCounter,
+    CharRatioCounter,
+    TokenCounter,
+    estimate_tokens,
+    evaluate_budget,
+    observe_prompt_tokens,
+    set_token_counter,
+    token_calibration_stats,
+)
 
 
 def test_estimate_tokens():
@@ -19,3 +32,53 @@ def test_evaluate_budget_reports_overages():
     report = evaluate_budget("write", segments, budgets)
     assert report.sections[0].over_budget is True
     assert report.over_budget is True
+
+
+def test_bpe_token_counter_merges_by_rank(tmp_path):
+    vocab = tmp_path / "tiny.tiktoken"
+    ranks = [b"a", b"b", b" ", b"ab", b" ab", b"abab"]
+    vocab.write_text("\n".join(f"{base64.b64encode(token).decode()} {rank}" for rank, token in enumerate(ranks)), encoding="utf-8")
+    counter = BPETokenCounter.from_file(vocab)
+
+    assert counter.count("abab") == 1
+    assert counter.count("ab ab") == 2
+    assert counter.count("aba") == 2
+
+
+def test_token_counter_prefers_registered_then_calibrated_ratio():
+    for _ in range(3):
+        observe_prompt_tokens("calib-test", 3000, 1000)
+    observe_prompt_tokens("calib-test", 10, 1000)
+    assert token_calibration_stats()["calib-test"]["samples"] == 3
+    assert estimate_tokens("x" * 300, "calib-test") == 100
+    assert estimate_tokens("x" * 300) == 75
+
+    set_token_counter(CharRatioCounter(2.0, name="halves"), "calib-test")
+    try:
+        assert estimate_tokens("x" * 300, "calib-test") == 150
+    finally:
+        set_token_counter(None, "calib-test")
+
+
+def test_token_counter_is_abstract():
+    with pytest.raises(TypeError):
+        TokenCounter()
+
+
+def test_count_cache_is_per_counter_not_per_name():
+    class _Fixed(TokenCounter):
+        def __init__(self, tokens):
+            self.tokens = tokens
+            self.name = "shared"
+
+        def count(self, text):
+            return self.tokens
+
+    text = "cached prompt text " * 8
+    set_token_counter(_Fixed(7), "cache-test")
+    try:
+        assert estimate_tokens(text, "cache-test") == 7
+        set_token_counter(_Fixed(11), "cache-test")
+        assert estimate_tokens(text, "cache-test") == 11
+    finally:
+        set_token_counter(None, "cache-test")
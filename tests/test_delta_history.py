@@ -0,0 +1,87 @@
+import copy
+from pathlib import Path
+
+from bookforge.memory.durable_state import ensure_durable_state_files, reconstruct_item_registry, save_item_registry, snapshot_item_registry
+from bookforge.memory import history as history_module
+from bookforge.memory.history import DeltaHistory, apply_json_patch, json_diff
+
+
+def test_json_diff_roundtrips_nested_changes() -> None:
+    before = {"items": [{"id": "a"}, {"id": "b"}, {"id": "c", "tags": ["x"]}], "name": "reg", "gone": 1}
+    after = {"items": [{"id": "a"}, {"id": "b", "owner": "c/d"}, {"id": "c", "tags": ["x"]}, {"id": "e"}], "name": "reg2"}
+
+    ops = json_diff(before, after)
+
+    assert apply_json_patch(copy.deepcopy(before), ops) == after
+    assert {"op": "add", "path": "/items/3", "value": {"id": "e"}} in ops
+    assert {"op": "add", "path": "/items/1/owner", "value": "c/d"} in ops
+
+
+def test_delta_history_checkpoints_and_reconstructs(tmp_path: Path, monkeypatch) -> None:
+    monkeypatch.setenv("BOOKFORGE_HISTORY_CHECKPOINT_INTERVAL", "3")
+    history = DeltaHistory(tmp_path / "history", "doc")
+    versions = {}
+    doc = {"items": [{"id": f"i{idx}", "value": 0} for idx in range(50)]}
+    for scene in range(1, 6):
+        doc["items"][scene]["value"] = scene
+        history.record(1, scene, doc)
+        versions[scene] = copy.deepcopy(doc)
+
+    checkpoints = sorted(path.name for path in (tmp_path / "history").glob("ch*_doc_*.json"))
+    assert [name[:11] for name in checkpoints] == ["ch001_sc001", "ch001_sc004"]
+    for scene, expected in versions.items():
+        assert history.reconstruct(1, scene) == expected
+    assert history.reconstruct(2, 1) == versions[5]
+    assert history.reconstruct(0, 9) is None
+
+
+
+def test_delta_history_parses_only_from_the_last_checkpoint(tmp_path: Path, monkeypatch) -> None:
+    monkeypatch.setenv("BOOKFORGE_HISTORY_CHECKPOINT_INTERVAL", "4")
+    history = DeltaHistory(tmp_path / "history", "doc")
+    doc = {"items": []}
+    for scene in range(1, 11):
+        doc["items"].append({"id": f"i{scene}"})
+        history.record(1, scene, doc)
+
+    parsed = []
+    real_parse = history_module._parse_record
+
+    def counting_parse(line):
+        parsed.append(line)
+        return real_parse(line)
+
+    monkeypatch.setattr(history_module, "_parse_record", counting_parse)
+    history_module._HEADS.clear()
+    assert history.reconstruct(1, 10) == doc
+    assert len(parsed) == 3
+    assert len(history.reconstruct(1, 6)["items"]) == 6
+
+    parsed.clear()
+    doc["items"].append({"id": "i11"})
+    history.record(1, 11, doc)
+    assert len(parsed) == 3
+
+    def no_reread(self, until=None):
+        raise AssertionError("warm record must not reread the journal")
+
+    monkeypatch.setattr(DeltaHistory, "_tail", no_reread)
+    doc["items"].append({"id": "i12"})
+    history.record(1, 12, doc)
+    monkeypatch.undo()
+    assert history.reconstruct(1, 12) == doc
+
+
+def test_durable_snapshots_write_deltas_after_first_checkpoint(tmp_path: Path) -> None:
+    book_root = tmp_path / "books" / "demo"
+    (book_root / "draft" / "context").mkdir(parents=True)
+    ensure_durable_state_files(book_root)
+
+    first = snapshot_item_registry(book_root, chapter=1, scene=1)
+    save_item_registry(book_root, {"schema_version": "1.0", "items": [{"item_id": "ITEM_lamp", "name": "Lamp", "type": "tool", "owner_scope": "character", "custodian": "CHAR_a", "linked_threads": [], "state_tags": [], "last_seen": {"chapter": 1, "scene": 1, "location": ""}}]})
+    second = snapshot_item_registry(book_root, chapter=1, scene=2)
+
+    assert first.name.startswith("ch001_sc001_item_registry")
+    assert second.name == "item_registry.deltas.jsonl"
+    assert reconstruct_item_registry(book_root, 1, 1)["items"] == []
+    assert reconstruct_item_registry(book_root, 1, 2)["items"][0]["item_id"] == "ITEM_lamp"
@@ -2,8 +2,13 @@
 import json
 
 from bookforge.memory.durable_state import (
+    CommitLedger,
     durable_commits_path,
+    durable_journal_path,
+    durable_store,
     ensure_durable_state_files,
+    flush_durable_stores,
+    forget_durable_store,
     item_registry_path,
     items_index_path,
     load_durable_commits,
@@ -16,6 +21,7 @@ from bookforge.memory.durable_state import (
     snapshot_item_registry,
     snapshot_plot_devices,
 )
+from bookforge.memory.history import json_diff
 
 
 def _book_root(tmp_path: Path) -> Path:
@@ -247,3 +253,139 @@ def test_item_registry_normalizes_display_name_from_id(tmp_path: Path) -> None:
     entry = item_data["items"][0]
     assert entry["name"] == "Rusty Dagger"
     assert entry["display_name"] == "Rusty Dagger"
+
+
+def test_durable_store_serves_loads_from_memory_without_rewriting(tmp_path: Path) -> None:
+    book_root = _book_root(tmp_path)
+    ensure_durable_state_files(book_root)
+    save_item_registry(
+        book_root,
+        {"schema_version": "1.0", "items": [{"item_id": "ITEM_lamp", "name": "Lamp", "type": "tool", "owner_scope": "character", "custodian": "CHAR_a", "linked_threads": [], "state_tags": [], "last_seen": {"chapter": 1, "scene": 1, "location": ""}}]},
+    )
+    path = item_registry_path(book_root)
+    stamp = path.stat().st_mtime_ns
+
+    first = load_item_registry(book_root)
+    first["items"][0]["name"] = "Mutated"
+    load_plot_devices(book_root)
+    load_durable_commits(book_root)
+
+    assert load_item_registry(book_root)["items"][0]["name"] == "Lamp"
+    assert path.stat().st_mtime_ns == stamp
+
+    payload = json.loads(path.read_text(encoding="utf-8"))
+    payload["items"][0]["name"] = "Lantern"
+    path.write_text(json.dumps(payload, indent=4), encoding="utf-8")
+    assert load_item_registry(book_root)["items"][0]["name"] == "Lantern"
+
+
+def test_durable_store_stages_until_flush(tmp_path: Path) -> None:
+    book_root = _book_root(tmp_path)
+    ensure_durable_state_files(book_root)
+    store = durable_store(book_root)
+
+    store.stage_durable_commits({"applied_hashes": ["abc"], "latest_scene": {"chapter": 1, "scene": 2}})
+
+    assert load_durable_commits(book_root)["applied_hashes"] == ["abc"]
+    on_disk = json.loads(durable_commits_path(book_root).read_text(encoding="utf-8"))
+    assert on_disk["applied_hashes"] == []
+
+    store.flush()
+    on_disk = json.loads(durable_commits_path(book_root).read_text(encoding="utf-8"))
+    assert on_disk["applied_hashes"] == ["abc"]
+
+
+def _lamp(name: str) -> dict:
+    return {"item_id": "ITEM_lamp", "name": name, "type": "tool", "owner_scope": "character", "custodian": "CHAR_a", "linked_threads": [], "state_tags": [], "last_seen": {"chapter": 1, "scene": 1, "location": ""}}
+
+
+def test_durable_commits_append_to_journal_until_checkpoint(tmp_path: Path, monkeypatch) -> None:
+    monkeypatch.setenv("BOOKFORGE_DURABLE_CHECKPOINT_SCENES", "2")
+    book_root = _book_root(tmp_path)
+    ensure_durable_state_files(book_root)
+    store = durable_store(book_root)
+    registry_stamp = item_registry_path(book_root).stat().st_mtime_ns
+
+    store.commit("h1", 1, 1, "write", {"items": [_lamp("Lamp")]}, {"devices": []})
+
+    assert durable_journal_path(book_root).exists()
+    assert item_registry_path(book_root).stat().st_mtime_ns == registry_stamp
+    assert load_item_registry(book_root)["items"][0]["name"] == "Lamp"
+
+    store.commit("h2", 1, 2, "write", {"items": [_lamp("Lantern")]}, {"devices": []})
+
+    assert not durable_journal_path(book_root).exists()
+    assert json.loads(item_registry_path(book_root).read_text(encoding="utf-8"))["items"][0]["name"] == "Lantern"
+    assert json.loads(durable_commits_path(book_root).read_text(encoding="utf-8"))["applied_hashes"] == ["h1", "h2"]
+
+
+def test_durable_journal_is_replayed_after_a_crash(tmp_path: Path) -> None:
+    book_root = _book_root(tmp_path)
+    ensure_durable_state_files(book_root)
+    store = durable_store(book_root)
+    store.commit("h1", 1, 1, "write", {"items": [_lamp("Lamp")]}, {"devices": []})
+    store.commit("h2", 1, 2, "write", {"items": [_lamp("Lantern")]}, {"devices": []})
+    # Simulate a checkpoint that only got the registry file out before the process died.
+    item_registry_path(book_root).write_text(json.dumps({"schema_version": "1.0", "items": [_lamp("Lamp")]}), encoding="utf-8")
+    forget_durable_store(book_root)
+
+    assert load_item_registry(book_root)["items"][0]["name"] == "Lantern"
+    assert load_durable_commits(book_root)["applied_hashes"] == ["h1", "h2"]
+    assert not durable_journal_path(book_root).exists()
+
+
+def test_flush_durable_stores_materializes_pending_journal(tmp_path: Path) -> None:
+    book_root = _book_root(tmp_path)
+    ensure_durable_state_files(book_root)
+    durable_store(book_root).commit("h1", 1, 1, "write", {"items": [_lamp("Lamp")]}, {"devices": []})
+    assert durable_journal_path(book_root).exists()
+
+    flush_durable_stores()
+
+    assert not durable_journal_path(book_root).exists()
+    assert json.loads(item_registry_path(book_root).read_text(encoding="utf-8"))["items"][0]["name"] == "Lamp"
+
+
+def test_durable_commit_writes_side_files_before_journaling(tmp_path: Path) -> None:
+    book_root = _book_root(tmp_path)
+    ensure_durable_state_files(book_root)
+    store = durable_store(book_root)
+
+    def crash() -> None:
+        assert not durable_journal_path(book_root).exists()
+        raise OSError("disk full")
+
+    try:
+        store.commit("h1", 1, 1, "write", {"items": [_lamp("Lamp")]}, {"devices": []}, before_journal=crash)
+    except OSError:
+        pass
+    forget_durable_store(book_root)
+
+    assert "h1" not in durable_store(book_root).ledger()
+    assert not durable_journal_path(book_root).exists()
+
+
+def test_commit_ledger_dedupes_and_evicts_oldest_hash(tmp_path: Path) -> None:
+    book_root = _book_root(tmp_path)
+    ensure_durable_state_files(book_root)
+    store = durable_store(book_root)
+    store.commit("h1", 1, 1, "write", {"items": []}, {"devices": []})
+    store.commit("h2", 1, 2, "repair", {"items": []}, {"devices": []})
+
+    ledger = store.ledger()
+    assert "h1" in ledger and "h3" not in ledger
+    assert ledger.entry("h2") == {"chapter": 1, "scene": 2, "phase": "repair"}
+    assert ledger.latest_scene == (1, 2)
+
+    evicted = CommitLedger(load_durable_commits(book_root), cap=2).payload_with("h3", 1, 3, "write")
+    assert evicted["applied_hashes"] == ["h2", "h3"]
+    assert set(evicted["applied"]) == {"h2", "h3"}
+    assert json_diff(["h1", "h2"], evicted["applied_hashes"]) == [
+        {"op": "remove", "path": "/0"},
+        {"op": "add", "path": "/1", "value": "h3"},
+    ]
+
+    store.flush()
+    forget_durable_store(book_root)
+    reloaded = durable_store(book_root).ledger()
+    assert "h2" in reloaded and reloaded.entry("h1") == {"chapter": 1, "scene": 1, "phase": "write"}
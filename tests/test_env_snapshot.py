@@ -0,0 +1,35 @@
+from bookforge.config import env
+
+
+def _use_env_file(monkeypatch, path):
+    monkeypatch.setattr(env, "_DEFAULT_ENV_PATH", path)
+    monkeypatch.setattr(env, "_ENV_SNAPSHOT", None)
+
+
+def test_env_snapshot_parses_env_file_once(tmp_path, monkeypatch) -> None:
+    path = tmp_path / ".env"
+    path.write_text("BOOKFORGE_JSON_RETRY_COUNT=3\nBOOKFORGE_LOG_LLM=yes\n", encoding="utf-8")
+    _use_env_file(monkeypatch, path)
+    calls = []
+    original = env._parse_env_file
+    monkeypatch.setattr(env, "_parse_env_file", lambda p: calls.append(p) or original(p))
+
+    assert env.read_int_env("BOOKFORGE_JSON_RETRY_COUNT", 1) == 3
+    assert env.env_snapshot().get_bool("BOOKFORGE_LOG_LLM", False) is True
+    assert env.read_env_value("BOOKFORGE_JSON_RETRY_COUNT") == "3"
+    assert len(calls) == 1
+
+
+def test_env_snapshot_reloads_when_env_file_changes(tmp_path, monkeypatch) -> None:
+    path = tmp_path / ".env"
+    path.write_text("BOOKFORGE_LINT_MODE=warn\n", encoding="utf-8")
+    _use_env_file(monkeypatch, path)
+    monkeypatch.setattr(env, "ENV_RECHECK_SECONDS", 0.0)
+    monkeypatch.setenv("BOOKFORGE_LINT_PREPASS", "0")
+
+    assert env.read_env_value("BOOKFORGE_LINT_MODE") == "warn"
+    assert env.read_env_value("BOOKFORGE_LINT_PREPASS") == "0"
+
+    path.write_text("BOOKFORGE_LINT_MODE=strict\nBOOKFORGE_LINT_PREPASS=1\n", encoding="utf-8")
+    assert env.read_env_value("BOOKFORGE_LINT_MODE") == "strict"
+    assert env.read_env_value("BOOKFORGE_LINT_PREPASS") == "1"
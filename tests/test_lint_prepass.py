@@ -0,0 +1,77 @@
+import json
+
+from bookforge.llm.client import LLMClient
+from bookforge.llm.types import LLMResponse
+from bookforge.phases import lint_phase
+
+
+class _LintClient(LLMClient):
+    def __init__(self) -> None:
+        super().__init__(provider="test")
+        self.calls = 0
+
+    def chat(self, messages, model, temperature=0.7, max_tokens=1024):
+        self.calls += 1
+        return LLMResponse(text=json.dumps({"schema_version": "1.0", "status": "pass", "issues": []}), raw={}, provider="test", model=model)
+
+
+def _lint(tmp_path, prose, client):
+    book_root = tmp_path / "books" / "b1"
+    (book_root / "outline").mkdir(parents=True)
+    system_path = tmp_path / "system.md"
+    system_path.write_text("system", encoding="utf-8")
+    return lint_phase._lint_scene(
+        tmp_path,
+        book_root,
+        system_path,
+        prose,
+        {},
+        {},
+        {},
+        {"chapter": 1, "scene": 1},
+        [],
+        [],
+        [],
+        None,
+        client,
+        "m",
+    )
+
+
+def test_error_heuristics_skip_llm_lint(tmp_path, monkeypatch) -> None:
+    monkeypatch.setenv("BOOKFORGE_LINT_MODE", "strict")
+    client = _LintClient()
+    before = lint_phase.lint_prepass_stats()
+
+    report = _lint(tmp_path, "CHAR_A walked into the hall.", client)
+
+    assert client.calls == 0
+    assert report["status"] == "fail"
+    assert report["mode"] == "heuristic_prepass"
+    assert [issue["code"] for issue in report["issues"]] == ["prose_internal_id"]
+    after = lint_phase.lint_prepass_stats()
+    assert after["llm_calls_saved"] == before["llm_calls_saved"] + 1
+    assert after["checked"] == before["checked"] + 1
+
+
+def test_warning_heuristics_still_run_llm_lint(tmp_path, monkeypatch) -> None:
+    monkeypatch.setenv("BOOKFORGE_LINT_MODE", "warn")
+    client = _LintClient()
+
+    report = _lint(tmp_path, "CHAR_A walked into the hall.", client)
+
+    assert client.calls == 1
+    assert report["status"] == "pass"
+    assert [issue["code"] for issue in report["issues"]] == ["prose_internal_id"]
+
+
+def test_prepass_can_be_disabled(tmp_path, monkeypatch) -> None:
+    monkeypatch.setenv("BOOKFORGE_LINT_MODE", "strict")
+    monkeypatch.setenv("BOOKFORGE_LINT_PREPASS", "0")
+    client = _LintClient()
+
+    report = _lint(tmp_path, "CHAR_A walked into the hall.", client)
+
+    assert client.calls == 1
+    assert report["status"] == "fail"
+    assert report["mode"] == "heuristic"
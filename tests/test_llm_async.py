@@ -0,0 +1,70 @@
+import threading
+import time
+
+import pytest
+
+from bookforge.llm import openai_client
+from bookforge.llm.aio import ChatCall, chat_many, run_sync
+from bookforge.llm.client import LLMClient
+from bookforge.llm.openai_client import OpenAIClient
+from bookforge.llm.rate_limiter import RateLimiter
+from bookforge.llm.types import LLMResponse
+
+
+class _SlowClient(LLMClient):
+    def __init__(self, delay: float) -> None:
+        super().__init__(provider="test")
+        self.delay = delay
+        self.active = 0
+        self.peak = 0
+        self._lock = threading.Lock()
+
+    def chat(self, messages, model, temperature=0.7, max_tokens=1024):
+        with self._lock:
+            self.active += 1
+            self.peak = max(self.peak, self.active)
+        time.sleep(self.delay)
+        with self._lock:
+            self.active -= 1
+        if messages[-1]["content"] == "boom":
+            raise RuntimeError("boom")
+        return LLMResponse(text=messages[-1]["content"], raw={}, provider="test", model=model)
+
+
+def test_chat_many_overlaps_blocking_calls_and_preserves_order() -> None:
+    client = _SlowClient(0.2)
+    calls = [ChatCall(client, [{"role": "user", "content": f"c{idx}"}], model="m") for idx in range(4)]
+
+    responses = chat_many(calls)
+
+    assert [response.text for response in responses] == ["c0", "c1", "c2", "c3"]
+    assert client.peak > 1
+
+
+def test_chat_many_can_return_exceptions() -> None:
+    client = _SlowClient(0.0)
+    calls = [
+        ChatCall(client, [{"role": "user", "content": "ok"}], model="m"),
+        ChatCall(client, [{"role": "user", "content": "boom"}], model="m"),
+    ]
+
+    results = chat_many(calls, return_exceptions=True)
+
+    assert results[0].text == "ok"
+    assert isinstance(results[1], RuntimeError)
+    with pytest.raises(RuntimeError):
+        chat_many(calls)
+
+
+def test_openai_achat_reserves_and_reconciles_shared_limiter(monkeypatch) -> None:
+    def fake_post_json(url, payload, headers, **kwargs):
+        return {"choices": [{"message": {"content": "ok"}}], "usage": {"prompt_tokens": 7, "completion_tokens": 3, "total_tokens": 10}}
+
+    monkeypatch.setattr(openai_client, "post_json", fake_post_json)
+    limiter = RateLimiter(100, tokens_per_minute=100000)
+    client = OpenAIClient("key", "https://example.test/v1/chat/completions", rate_limiter=limiter)
+
+    response = run_sync(client.achat([{"role": "user", "content": "hello"}], model="gpt-test", max_tokens=500))
+
+    assert response.text == "ok"
+    assert limiter.usage() == {"requests_per_minute": 1, "tokens_per_minute": 10}
@@ -0,0 +1,66 @@
+from bookforge.config.env import load_config
+from bookforge.llm.cache import CachingLLMClient, ResponseCache, cache_key
+from bookforge.llm.client import LLMClient
+from bookforge.llm.factory import get_llm_client
+from bookforge.llm.types import LLMResponse
+
+
+class _CountingClient(LLMClient):
+    def __init__(self) -> None:
+        super().__init__(provider="test", key_slot="linter")
+        self.calls = 0
+
+    def chat(self, messages, model, temperature=0.7, max_tokens=1024):
+        self.calls += 1
+        return LLMResponse(text=f"answer {self.calls}", raw={"n": self.calls}, provider="test", model=model, prompt_tokens=5)
+
+
+MESSAGES = [{"role": "system", "content": "rules"}, {"role": "user", "content": "lint this"}]
+
+
+def test_cache_key_covers_request_parameters() -> None:
+    base, hashes = cache_key("openai", "m", 0.0, 100, MESSAGES)
+    assert base == cache_key("openai", "m", 0.0, 100, list(MESSAGES))[0]
+    assert base != cache_key("openai", "m", 0.2, 100, MESSAGES)[0]
+    assert base != cache_key("openai", "m", 0.0, 200, MESSAGES)[0]
+    assert base != cache_key("gemini", "m", 0.0, 100, MESSAGES)[0]
+    assert base != cache_key("openai", "m", 0.0, 100, MESSAGES[:1])[0]
+    assert hashes.stable_prefix != hashes.dynamic_payload
+
+
+def test_caching_client_serves_repeat_calls_from_disk(tmp_path) -> None:
+    inner = _CountingClient()
+    client = CachingLLMClient(inner, ResponseCache(tmp_path / "cache"))
+
+    first = client.chat(MESSAGES, model="m", temperature=0.0, max_tokens=100)
+    second = client.chat(MESSAGES, model="m", temperature=0.0, max_tokens=100)
+    reloaded = CachingLLMClient(inner, ResponseCache(tmp_path / "cache")).chat(MESSAGES, model="m", temperature=0.0, max_tokens=100)
+
+    assert inner.calls == 1
+    assert first.cache_hit is False
+    assert second.cache_hit is True
+    assert second.text == first.text == reloaded.text
+    assert second.prompt_tokens == 5
+    stats = client.cache.stats()
+    assert (stats.hits, stats.misses, stats.stores) == (1, 1, 1)
+
+
+def test_cache_evicts_least_recently_used_entries(tmp_path) -> None:
+    cache = ResponseCache(tmp_path / "cache", max_bytes=1)
+    response = LLMResponse(text="x", raw={}, provider="p", model="m")
+    cache.put("aa" * 32, response)
+    cache.put("bb" * 32, response)
+
+    assert cache.get("aa" * 32) is None
+    assert cache.get("bb" * 32) is not None
+    assert cache.stats().evictions == 1
+
+
+def test_factory_wraps_only_opted_in_phases(tmp_path) -> None:
+    config = load_config(
+        env={"LLM_PROVIDER": "ollama", "BOOKFORGE_LLM_CACHE_PHASES": "linter, planner"},
+        env_path=None,
+    )
+    assert isinstance(get_llm_client(config, phase="linter", workspace=tmp_path), CachingLLMClient)
+    assert not isinstance(get_llm_client(config, phase="writer", workspace=tmp_path), CachingLLMClient)
+    assert not isinstance(get_llm_client(config, phase="linter"), CachingLLMClient)
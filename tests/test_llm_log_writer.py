@@ -0,0 +1,44 @@
+import json
+
+from bookforge.llm.errors import LLMRequestError
+from bookforge.llm.logging import flush_llm_logs, llm_log_writer_stats, log_llm_error, log_llm_response
+from bookforge.llm.types import LLMResponse
+
+
+def _response(text: str) -> LLMResponse:
+    return LLMResponse(text=text, raw={"id": "r1"}, provider="openai", model="m", prompt_tokens=10, completion_tokens=5)
+
+
+def test_llm_logs_are_written_in_background_and_flushed(tmp_path):
+    messages = [{"role": "system", "content": "SYS"}, {"role": "user", "content": "hello"}]
+    extra = {"book_id": "demo", "chapter": 1, "scene": 2}
+    flush_llm_logs()
+    before = llm_log_writer_stats()["written"]
+    log_path = log_llm_response(tmp_path, "write_scene", _response('{"a":1}'), request={"model": "m"}, extra=extra, messages=messages)
+    messages.append({"role": "user", "content": "later"})
+    extra["scene"] = 99
+    flush_llm_logs()
+
+    assert log_path.name.startswith("demo_ch001_sc002_write_scene_")
+    payload = json.loads(log_path.read_text(encoding="utf-8"))
+    assert payload["extra"]["scene"] == 2
+    assert payload["prompt"]["messages"] == [{"role": "user", "content": "hello"}]
+    assert json.loads(log_path.with_suffix(".txt").read_text(encoding="utf-8")) == {"a": 1}
+    assert "SYSTEM:\n\nSYS" in log_path.with_suffix(".prompt.txt").read_text(encoding="utf-8")
+    stats = llm_log_writer_stats()
+    assert stats["written"] == before + 1
+    assert stats["pending"] == 0
+
+
+def test_llm_error_log_is_on_disk_when_call_returns(tmp_path):
+    error = LLMRequestError(429, "slow down", None, [], {"error": "quota"})
+    log_path = log_llm_error(tmp_path, "plan_scene_error", error)
+    payload = json.loads(log_path.read_text(encoding="utf-8"))
+    assert payload["error"]["status_code"] == 429
+    assert json.loads(log_path.with_suffix(".txt").read_text(encoding="utf-8")) == {"error": "quota"}
+
+
+def test_llm_logs_can_be_written_inline(tmp_path, monkeypatch):
+    monkeypatch.setenv("BOOKFORGE_LLM_LOG_ASYNC", "0")
+    log_path = log_llm_response(tmp_path, "lint_scene", _response("plain text"))
+    assert log_path.with_suffix(".txt").read_text(encoding="utf-8") == "plain text"
@@ -0,0 +1,146 @@
+import pytest
+
+from bookforge.llm import gemini_client
+from bookforge.llm.errors import LLMRequestError
+from bookforge.llm.gemini_client import CONTEXT_CACHE_MIN_CHARS, GeminiClient
+from bookforge.llm.openai_client import OpenAIClient
+
+
+LONG_SYSTEM = "rules " * (CONTEXT_CACHE_MIN_CHARS // 5)
+
+
+@pytest.fixture(autouse=True)
+def _clear_context_caches():
+    gemini_client._CONTEXT_CACHES.clear()
+    yield
+    gemini_client._CONTEXT_CACHES.clear()
+
+
+def _gemini_reply(text):
+    return {
+        "candidates": [{"content": {"parts": [{"text": text}]}}],
+        "usageMetadata": {"promptTokenCount": 5000, "candidatesTokenCount": 10, "totalTokenCount": 5010, "cachedContentTokenCount": 4900},
+    }
+
+
+def test_gemini_reuses_context_cache_for_stable_system_prefix(monkeypatch) -> None:
+    calls = []
+
+    def fake_post_json(url, payload, headers, **kwargs):
+        calls.append((url, payload, kwargs.get("method", "POST")))
+        if "/cachedContents" in url:
+            return {"name": "cachedContents/abc"}
+        return _gemini_reply("ok")
+
+    monkeypatch.setattr(gemini_client, "post_json", fake_post_json)
+    client = GeminiClient("key", "https://example.test/v1beta")
+    messages = [{"role": "system", "content": LONG_SYSTEM}, {"role": "user", "content": "scene 1"}]
+
+    first = client.chat(messages, model="gemini-test")
+    second = client.chat([messages[0], {"role": "user", "content": "scene 2"}], model="gemini-test")
+
+    creates = [call for call in calls if "/cachedContents" in call[0]]
+    generates = [call for call in calls if ":generateContent" in call[0]]
+    assert len(creates) == 1
+    assert creates[0][1]["systemInstruction"]["parts"][0]["text"] == LONG_SYSTEM
+    assert len(generates) == 2
+    for _, payload, _ in generates:
+        assert payload["cachedContent"] == "cachedContents/abc"
+        assert "system_instruction" not in payload
+    assert first.cached_tokens == 4900
+    assert second.prompt_tokens == 5000
+
+
+def test_gemini_skips_context_cache_for_short_prompts(monkeypatch) -> None:
+    calls = []
+
+    def fake_post_json(url, payload, headers, **kwargs):
+        calls.append(url)
+        return _gemini_reply("ok")
+
+    monkeypatch.setattr(gemini_client, "post_json", fake_post_json)
+    client = GeminiClient("key", "https://example.test/v1beta")
+    payload = client._payload([{"role": "system", "content": "short"}, {"role": "user", "content": "hi"}], "m", 0.0, 10)
+
+    assert payload["system_instruction"]["parts"][0]["text"] == "short"
+    assert calls == []
+
+
+def test_gemini_falls_back_when_cache_is_rejected(monkeypatch) -> None:
+    generate_payloads = []
+
+    def fake_post_json(url, payload, headers, **kwargs):
+        if "/cachedContents" in url:
+            return {"name": "cachedContents/gone"}
+        generate_payloads.append(payload)
+        if "cachedContent" in payload:
+            raise LLMRequestError(404, "CachedContent not found (or permission denied)", None, [], None)
+        return _gemini_reply("fresh")
+
+    monkeypatch.setattr(gemini_client, "post_json", fake_post_json)
+    client = GeminiClient("key", "https://example.test/v1beta")
+    messages = [{"role": "system", "content": LONG_SYSTEM}, {"role": "user", "content": "scene"}]
+
+    response = client.chat(messages, model="gemini-test")
+
+    assert response.text == "fresh"
+    assert generate_payloads[-1]["system_instruction"]["parts"][0]["text"] == LONG_SYSTEM
+    assert gemini_client._CONTEXT_CACHES == {}
+
+
+def test_gemini_does_not_retry_unrelated_client_errors_without_cache(monkeypatch) -> None:
+    generate_payloads = []
+
+    def fake_post_json(url, payload, headers, **kwargs):
+        if "/cachedContents" in url:
+            return {"name": "cachedContents/live"}
+        generate_payloads.append(payload)
+        raise LLMRequestError(400, "Invalid value at 'generation_config.temperature'", None, [], None)
+
+    monkeypatch.setattr(gemini_client, "post_json", fake_post_json)
+    client = GeminiClient("key", "https://example.test/v1beta")
+    messages = [{"role": "system", "content": LONG_SYSTEM}, {"role": "user", "content": "scene"}]
+
+    with pytest.raises(LLMRequestError):
+        client.chat(messages, model="gemini-test")
+
+    assert len(generate_payloads) == 1
+    assert [entry.name for entry in gemini_client._CONTEXT_CACHES.values()] == ["cachedContents/live"]
+
+
+def test_gemini_context_cache_creation_does_not_hold_the_global_lock(monkeypatch) -> None:
+    def fake_post_json(url, payload, headers, **kwargs):
+        assert gemini_client._CONTEXT_CACHE_LOCK.acquire(blocking=False)
+        gemini_client._CONTEXT_CACHE_LOCK.release()
+        return {"name": "cachedContents/abc"}
+
+    monkeypatch.setattr(gemini_client, "post_json", fake_post_json)
+    client = GeminiClient("key", "https://example.test/v1beta")
+
+    assert client._context_cache_name("gemini-test", LONG_SYSTEM) == "cachedContents/abc"
+
+
+def test_openai_sends_messages_in_order_and_reads_cached_tokens(monkeypatch) -> None:
+    from bookforge.llm import openai_client
+
+    seen = {}
+
+    def fake_post_json(url, payload, headers, **kwargs):
+        seen["payload"] = payload
+        return {
+            "choices": [{"message": {"content": "ok"}}],
+            "usage": {"prompt_tokens": 2000, "completion_tokens": 5, "total_tokens": 2005, "prompt_tokens_details": {"cached_tokens": 1920}},
+        }
+
+    monkeypatch.setattr(openai_client, "post_json", fake_post_json)
+    client = OpenAIClient("key", "https://example.test/v1/chat/completions")
+    response = client.chat(
+        [
+            {"role": "system", "content": "base"},
+            {"role": "user", "content": "task"},
+        ],
+        model="gpt-test",
+    )
+
+    assert [msg["content"] for msg in seen["payload"]["messages"]] == ["base", "task"]
+    assert response.cached_tokens == 1920
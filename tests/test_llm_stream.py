@@ -0,0 +1,120 @@
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import json
+import threading
+
+import pytest
+
+from bookforge.llm.openai_client import OpenAIClient
+from bookforge.llm.transport import ConnectionPool
+from bookforge.llm.types import LLMResponse
+from bookforge.llm.utils import iter_sse_data
+from bookforge.pipeline.llm_ops import _chat_stream, _response_truncated
+from bookforge.pipeline.stream import _SceneStreamWatcher
+
+
+def _sse(events: list) -> bytes:
+    body = "".join(f"data: {json.dumps(event)}\n\n" for event in events)
+    return (body + "data: [DONE]\n\n").encode("utf-8")
+
+
+class _OpenAIStreamHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    events: list = []
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        request = json.loads(self.rfile.read(length))
+        assert request["stream"] is True
+        body = _sse(self.events)
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        return
+
+
+@pytest.fixture()
+def openai_server(monkeypatch: pytest.MonkeyPatch):
+    monkeypatch.setenv("no_proxy", "127.0.0.1")
+    _OpenAIStreamHandler.events = [
+        {"choices": [{"delta": {"content": "PROSE: Hello "}}]},
+        {"choices": [{"delta": {"content": "world."}}]},
+        {"choices": [{"delta": {}, "finish_reason": "length"}]},
+        {"choices": [], "usage": {"prompt_tokens": 7, "completion_tokens": 3, "total_tokens": 10}},
+    ]
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _OpenAIStreamHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        yield f"http://127.0.0.1:{server.server_address[1]}/v1/chat/completions"
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+def test_iter_sse_data_joins_multiline_events() -> None:
+    lines = [": keepalive", "data: {\"a\":", "data: 1}", "", "event: x", "data: [DONE]", ""]
+    assert list(iter_sse_data(lines)) == ['{"a":\n1}', "[DONE]"]
+
+
+def test_openai_chat_stream_assembles_response(openai_server: str) -> None:
+    client = OpenAIClient("key", openai_server, transport=ConnectionPool())
+    stream = client.chat_stream([{"role": "user", "content": "hi"}], model="m", max_tokens=10)
+    chunks = list(stream)
+    response = stream.response
+
+    assert chunks == ["PROSE: Hello ", "world."]
+    assert response.text == "PROSE: Hello world."
+    assert response.prompt_tokens == 7
+    assert response.total_tokens == 10
+    assert _response_truncated(response) is True
+
+
+def test_scene_stream_watcher_flushes_only_prose_before_the_patch(tmp_path) -> None:
+    partial = tmp_path / "write_prose.partial.txt"
+    watcher = _SceneStreamWatcher(partial, flush_chars=4)
+    pieces = ["PROSE: The door ", "opened.\nSTATE_", "PATCH: {\"a\": {\"b\": \"}\"}", "}", " trailing"]
+
+    assert not any(watcher.feed(piece) for piece in pieces)
+    watcher.finish()
+
+    assert watcher.text == "".join(pieces)
+    assert watcher.prose_text == "PROSE: The door opened.\n"
+    assert partial.read_text(encoding="utf-8") == "PROSE: The door opened.\n"
+    watcher.discard()
+    assert not partial.exists()
+
+
+def test_chat_stream_falls_back_to_chat_and_aborts_runaway(tmp_path) -> None:
+    class _Client:
+        key_slot = None
+
+        def chat(self, messages, model, temperature=0.7, max_tokens=1024):
+            return LLMResponse(text="x" * 50, raw={}, provider="test", model=model)
+
+    watcher = _SceneStreamWatcher(None, max_chars=10)
+    response = _chat_stream(tmp_path, "write_scene", _Client(), [], model="m", temperature=0.7, max_tokens=5, watcher=watcher)
+
+    assert response.text == "x" * 50
+    assert watcher.runaway is True
+
+
+def test_chat_stream_reads_to_the_end_for_usage(tmp_path, openai_server: str) -> None:
+    _OpenAIStreamHandler.events = [
+        {"choices": [{"delta": {"content": "PROSE: Done.\nSTATE_PATCH: {\"a\": 1}"}}]},
+        {"choices": [{"delta": {"content": "\n"}}]},
+        {"choices": [{"delta": {}, "finish_reason": "length"}]},
+        {"choices": [], "usage": {"prompt_tokens": 11, "completion_tokens": 4, "total_tokens": 15}},
+    ]
+    client = OpenAIClient("key", openai_server, transport=ConnectionPool())
+    watcher = _SceneStreamWatcher(None)
+    response = _chat_stream(tmp_path, "write_scene", client, [{"role": "user", "content": "hi"}], model="m", temperature=0.7, max_tokens=10, watcher=watcher)
+
+    assert response.text == "PROSE: Done.\nSTATE_PATCH: {\"a\": 1}\n"
+    assert watcher.prose_text == "PROSE: Done.\n"
+    assert response.prompt_tokens == 11
+    assert response.completion_tokens == 4
+    assert _response_truncated(response) is True
@@ -0,0 +1,69 @@
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import json
+import threading
+
+import pytest
+
+from bookforge.llm.transport import ConnectionPool
+from bookforge.llm.utils import post_json
+
+
+class _EchoHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        payload = json.loads(self.rfile.read(length) or b"{}")
+        body = json.dumps({"echo": payload}).encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        return
+
+
+@pytest.fixture()
+def echo_server(monkeypatch: pytest.MonkeyPatch):
+    monkeypatch.setenv("no_proxy", "127.0.0.1")
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _EchoHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        yield f"http://127.0.0.1:{server.server_address[1]}/chat"
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+def test_pool_reuses_keep_alive_connection(echo_server: str) -> None:
+    pool = ConnectionPool(max_idle_per_host=2)
+    first = post_json(echo_server, {"n": 1}, {"Content-Type": "application/json"}, timeout=5, pool=pool)
+    second = post_json(echo_server, {"n": 2}, {"Content-Type": "application/json"}, timeout=5, pool=pool)
+    pool.close()
+
+    assert first == {"echo": {"n": 1}}
+    assert second == {"echo": {"n": 2}}
+    stats = pool.stats()
+    assert stats.misses == 1
+    assert stats.hits == 1
+
+
+def test_pool_without_idle_capacity_discards_connections(echo_server: str) -> None:
+    pool = ConnectionPool(max_idle_per_host=0)
+    post_json(echo_server, {"n": 1}, {"Content-Type": "application/json"}, timeout=5, pool=pool)
+    post_json(echo_server, {"n": 2}, {"Content-Type": "application/json"}, timeout=5, pool=pool)
+
+    stats = pool.stats()
+    assert stats.hits == 0
+    assert stats.misses == 2
+    assert stats.discarded == 2
+
+
+def test_pool_rejects_unsupported_scheme() -> None:
+    pool = ConnectionPool()
+    with pytest.raises(ValueError):
+        with pool.request("POST", "ftp://example.invalid/x", b"", {}, timeout=1):
+            pass
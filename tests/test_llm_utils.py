@@ -1,5 +1,5 @@
-﻿import json
-import urllib.error
+﻿from contextlib import contextmanager
+import json
 
 import pytest
 
@@ -7,30 +7,32 @@ from bookforge.llm.utils import post_json
 
 
 class _FakeResponse:
-    def __init__(self, payload: dict) -> None:
+    def __init__(self, payload: dict, status: int = 200) -> None:
         self._payload = payload
-
-    def __enter__(self):
-        return self
-
-    def __exit__(self, exc_type, exc, tb):
-        return False
+        self.status = status
 
     def read(self) -> bytes:
         return json.dumps(self._payload).encode("utf-8")
 
 
-def test_post_json_retries_on_timeout_then_succeeds(monkeypatch: pytest.MonkeyPatch) -> None:
-    outcomes = [TimeoutError("read timed out"), _FakeResponse({"ok": True})]
-    sleeps: list[float] = []
+class _FakePool:
+    def __init__(self, outcomes: list) -> None:
+        self.outcomes = outcomes
+        self.calls: list[tuple[str, str, float]] = []
 
-    def _fake_urlopen(request, timeout):
-        current = outcomes.pop(0)
+    @contextmanager
+    def request(self, method, url, body, headers, timeout):
+        self.calls.append((method, url, timeout))
+        current = self.outcomes.pop(0)
         if isinstance(current, BaseException):
             raise current
-        return current
+        yield current
+
+
+def test_post_json_retries_on_timeout_then_succeeds(monkeypatch: pytest.MonkeyPatch) -> None:
+    pool = _FakePool([TimeoutError("read timed out"), _FakeResponse({"ok": True})])
+    sleeps: list[float] = []
 
-    monkeypatch.setattr("urllib.request.urlopen", _fake_urlopen)
     monkeypatch.setattr("time.sleep", lambda sec: sleeps.append(sec))
 
     result = post_json(
@@ -40,17 +42,16 @@ def test_post_json_retries_on_timeout_then_succeeds(monkeypatch: pytest.MonkeyPa
         timeout=600,
         max_retries=1,
         retry_backoff=0.5,
+        pool=pool,
     )
 
     assert result == {"ok": True}
     assert sleeps == [0.5]
+    assert len(pool.calls) == 2
 
 
 def test_post_json_raises_clear_timeout_on_exhausted_retries(monkeypatch: pytest.MonkeyPatch) -> None:
-    def _fake_urlopen(request, timeout):
-        raise urllib.error.URLError(TimeoutError("The read operation timed out"))
-
-    monkeypatch.setattr("urllib.request.urlopen", _fake_urlopen)
+    pool = _FakePool([TimeoutError("The read operation timed out"), TimeoutError("The read operation timed out")])
     monkeypatch.setattr("time.sleep", lambda _: None)
 
     with pytest.raises(RuntimeError) as excinfo:
@@ -61,9 +62,28 @@ def test_post_json_raises_clear_timeout_on_exhausted_retries(monkeypatch: pytest
             timeout=600,
             max_retries=1,
             retry_backoff=0.1,
+            pool=pool,
         )
 
     message = str(excinfo.value)
     assert "Transport timeout calling" in message
     assert "timeout=600s" in message
     assert "The read operation timed out" in message
+
+
+def test_post_json_raises_request_error_on_http_status(monkeypatch: pytest.MonkeyPatch) -> None:
+    body = {"error": {"message": "quota", "details": [{"@type": "type.googleapis.com/google.rpc.RetryInfo", "retryDelay": "3s"}]}}
+    pool = _FakePool([_FakeResponse(body, status=429), _FakeResponse({"ok": True})])
+    sleeps: list[float] = []
+    monkeypatch.setattr("time.sleep", lambda sec: sleeps.append(sec))
+
+    result = post_json(
+        url="https://example.invalid",
+        payload={"a": 1},
+        headers={"Content-Type": "application/json"},
+        max_retries=1,
+        pool=pool,
+    )
+
+    assert result == {"ok": True}
+    assert sleeps == [3.0]
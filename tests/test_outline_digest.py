@@ -0,0 +1,58 @@
+import json
+
+from bookforge.pipeline.prompts import _system_prompt_for_phase
+from bookforge.prompt.outline_digest import OutlineDigest, outline_savings_stats
+
+
+def _outline(chapters: int) -> dict:
+    return {
+        "schema_version": "1.1",
+        "threads": [{"thread_id": "THREAD_a", "label": "A", "status": "open"}],
+        "chapters": [
+            {
+                "chapter_id": idx,
+                "title": f"Chapter {idx}",
+                "goal": f"Goal {idx}",
+                "stakes_shift": "long text " * 20,
+                "sections": [
+                    {
+                        "section_id": 1,
+                        "scenes": [
+                            {"scene_id": 1, "summary": "s", "characters": ["CHAR_a"] + (["CHAR_b"] if idx == 5 else []), "threads": ["THREAD_a"] if idx % 2 else []}
+                        ],
+                    }
+                ],
+            }
+            for idx in range(1, chapters + 1)
+        ],
+    }
+
+
+def test_outline_digest_window_keeps_adjacent_chapters_in_full() -> None:
+    digest = OutlineDigest(_outline(6))
+    window = json.loads(digest.window(3, 1))
+
+    full = [entry["chapter_id"] for entry in window["chapters"] if "sections" in entry]
+    assert full == [2, 3, 4]
+    assert window["chapters"][0] == {"chapter_id": 1, "title": "Chapter 1", "goal": "Goal 1"}
+    assert window["thread_chapters"] == {"THREAD_a": [1, 3, 5]}
+    assert window["character_chapters"]["CHAR_b"] == [5]
+    assert window["threads"][0]["thread_id"] == "THREAD_a"
+    assert len(digest.window(3, 1)) < len(digest.full_text)
+    assert digest.window(3, -1) == digest.full_text
+
+
+def test_system_prompt_uses_chapter_window_and_reports_savings(tmp_path, monkeypatch) -> None:
+    system_path = tmp_path / "system.md"
+    system_path.write_text("# System\n", encoding="utf-8")
+    outline_path = tmp_path / "outline.json"
+    outline_path.write_text(json.dumps(_outline(8)), encoding="utf-8")
+
+    windowed = _system_prompt_for_phase(system_path, outline_path, "write", 4)
+    assert "chapter window" in windowed
+    assert _system_prompt_for_phase(system_path, outline_path, "write", "4") is windowed
+    assert outline_savings_stats()["write"]["sent_tokens"] < outline_savings_stats()["write"]["full_tokens"]
+
+    monkeypatch.setenv("BOOKFORGE_OUTLINE_WINDOW", "-1")
+    assert "Full Book Outline" in _system_prompt_for_phase(system_path, outline_path, "write", 4)
+    assert "Full Book Outline" in _system_prompt_for_phase(system_path, outline_path, "preflight")
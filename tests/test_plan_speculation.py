@@ -0,0 +1,144 @@
+import json
+import threading
+from pathlib import Path
+
+from bookforge.llm.types import LLMResponse
+from bookforge.phases.plan import SpeculativePlan, _plan_dependencies, adopt_speculative_plan, speculate_scene_card
+from bookforge.pipeline.state_apply import _apply_state_patch
+from bookforge.workspace import DEFAULT_BUDGETS
+from bookforge.pipeline import speculation
+from bookforge.pipeline.speculation import _SpeculativePlanner
+
+
+def _state(location="Harbor", facts=None, key_facts=None):
+    return {
+        "world": {"location": location, "cast_present": ["CHAR_A"], "open_threads": [], "recent_facts": facts or []},
+        "summary": {"chapter_so_far": ["They reached the harbor."], "key_facts_ring": key_facts or []},
+        "cursor": {"chapter": 1, "scene": 2},
+    }
+
+
+def test_plan_dependencies_ignore_bookkeeping_but_track_cast_and_world() -> None:
+    cast = [{"character_id": "CHAR_A", "inventory": [{"item": "ITEM_key"}], "updated_at": "t1", "history": []}]
+    base = _plan_dependencies(_state(), cast, [])
+
+    touched = [dict(cast[0], updated_at="t2", history=[{"scene": 1}])]
+    assert _plan_dependencies(dict(_state(facts=["a new fact"]), cursor={"chapter": 1, "scene": 3}), touched, []) == base
+
+    assert _plan_dependencies(_state(location="Tower"), cast, []) != base
+    moved = [dict(cast[0], inventory=[])]
+    assert _plan_dependencies(_state(), moved, []) != base
+    assert _plan_dependencies(_state(), cast, [{"code": "ui_gate_unknown"}]) != base
+
+
+def _planned_book(tmp_path):
+    book_root = tmp_path / "books" / "demo"
+    (book_root / "prompts").mkdir(parents=True)
+    (book_root / "outline").mkdir()
+    (book_root / "prompts" / "system_v1.md").write_text("System.", encoding="utf-8")
+    scenes = [
+        {"scene_id": idx, "summary": f"Scene {idx}.", "type": "setup", "outcome": "It moves on.", "characters": ["CHAR_A"]}
+        for idx in (1, 2)
+    ]
+    outline = {
+        "schema_version": "1.1",
+        "chapters": [{"chapter_id": 1, "title": "One", "goal": "Begin.", "sections": [{"section_id": 1, "title": "A", "scenes": scenes}]}],
+    }
+    (book_root / "outline" / "outline.json").write_text(json.dumps(outline), encoding="utf-8")
+    state = {
+        "schema_version": "1.0",
+        "status": "PLANNED",
+        "cursor": {"chapter": 1, "scene": 1},
+        "world": {"time": {}, "location": "Harbor", "cast_present": ["CHAR_A"], "open_threads": [], "recent_facts": []},
+        "summary": {
+            "last_scene": [], "chapter_so_far": [], "story_so_far": [],
+            "key_facts_ring": [], "must_stay_true": [], "pending_story_rollups": [],
+        },
+        "budgets": dict(DEFAULT_BUDGETS),
+        "duplication_warnings_in_row": 0,
+    }
+    (book_root / "state.json").write_text(json.dumps(state), encoding="utf-8")
+    return book_root, state
+
+
+def _commit_scene(book_root, state, world=None):
+    patch = {
+        "world_updates": dict({"recent_facts": ["The tide turned."]}, **(world or {})),
+        "summary_update": {
+            "last_scene": ["They reached the harbor."],
+            "chapter_so_far_add": ["They reached the harbor."],
+            "key_facts_ring_add": ["The key is lost."],
+        },
+    }
+    _apply_state_patch(state, patch)
+    state["cursor"] = {"chapter": 1, "scene": 2}
+    (book_root / "state.json").write_text(json.dumps(state), encoding="utf-8")
+
+
+class _CardClient:
+    def chat(self, messages, model, temperature=0.7, max_tokens=1024):
+        card = {
+            "schema_version": "1.1", "scene_id": "SC_001_002", "chapter": 1, "scene": 2,
+            "scene_target": "Scene 2.", "goal": "Press on.", "conflict": "The tide.",
+            "required_callbacks": [], "constraints": [], "end_condition": "They sail.",
+        }
+        return LLMResponse(text=json.dumps(card), raw={}, provider="dummy", model=model)
+
+
+def test_speculative_card_is_adopted_after_a_normal_commit(tmp_path) -> None:
+    book_root, state = _planned_book(tmp_path)
+    plan = speculate_scene_card(tmp_path, "demo", 1, 2, state, _CardClient(), "m")
+    assert not (book_root / "draft" / "chapters" / "ch_001" / "scene_002.meta.json").exists()
+
+    _commit_scene(book_root, state)
+
+    path = adopt_speculative_plan(tmp_path, "demo", plan)
+    assert path == book_root / "draft" / "chapters" / "ch_001" / "scene_002.meta.json"
+    assert json.loads(path.read_text(encoding="utf-8"))["goal"] == "Press on."
+
+
+def test_speculative_card_is_replanned_when_the_scene_moves(tmp_path) -> None:
+    book_root, state = _planned_book(tmp_path)
+    plan = speculate_scene_card(tmp_path, "demo", 1, 2, state, _CardClient(), "m")
+    _commit_scene(book_root, state, world={"location": "Tower"})
+    assert adopt_speculative_plan(tmp_path, "demo", plan) is None
+
+
+def test_speculative_planner_adopts_matching_plan(monkeypatch, tmp_path) -> None:
+    release = threading.Event()
+    seen = {}
+
+    def fake_speculate(workspace, book_id, chapter, scene, state, client, model):
+        release.wait(5)
+        seen["state"] = state
+        return SpeculativePlan(chapter=chapter, scene=scene, card={"scene": scene}, dependencies="deps")
+
+    def fake_adopt(workspace, book_id, plan):
+        return Path(f"scene_{plan.scene:03d}.meta.json") if plan.dependencies == "deps" else None
+
+    monkeypatch.setattr(speculation, "speculate_scene_card", fake_speculate)
+    monkeypatch.setattr(speculation, "adopt_speculative_plan", fake_adopt)
+    planner = _SpeculativePlanner(tmp_path, "book", client=None, model="m")
+
+    state = {"cursor": {"chapter": 1, "scene": 1}}
+    planner.start(1, 2, state)
+    state["cursor"]["scene"] = 99
+    release.set()
+
+    assert planner.take(1, 2) == Path("scene_002.meta.json")
+    assert seen["state"]["cursor"]["scene"] == 1
+    assert planner.take(1, 2) is None
+
+
+def test_speculative_planner_ignores_other_cursor_and_failures(monkeypatch, tmp_path) -> None:
+    def failing_speculate(*args, **kwargs):
+        raise RuntimeError("planner down")
+
+    monkeypatch.setattr(speculation, "speculate_scene_card", failing_speculate)
+    planner = _SpeculativePlanner(tmp_path, "book", client=None, model="m")
+
+    planner.start(1, 2, {})
+    assert planner.take(2, 1) is None
+
+    planner.start(1, 2, {})
+    assert planner.take(1, 2) is None
@@ -0,0 +1,109 @@
+import json
+
+from bookforge.pipeline.budget import _budgeted_prompt
+
+
+def _book(tmp_path, budgets):
+    book_root = tmp_path / "books" / "b1"
+    (book_root / "prompts").mkdir(parents=True)
+    (book_root / "prompts" / "registry.json").write_text(json.dumps({"version": "v1", "budgets": budgets}), encoding="utf-8")
+    template = tmp_path / "write.md"
+    template.write_text("STATE={{state}}\nCAST={{character_states}}\n", encoding="utf-8")
+    return book_root, template
+
+
+def _values():
+    history = [{"chapter": 1, "scene": idx, "changes": ["moved " * 20]} for idx in range(40)]
+    return {
+        "state": {"summary": {"key_facts_ring": [f"fact {idx} " * 10 for idx in range(30)], "story_so_far": []}},
+        "character_states": [
+            {"character_id": "CHAR_a", "name": "A", "history": list(history), "inventory": []},
+            {"character_id": "CHAR_b", "name": "B", "history": list(history), "appearance_current": {"summary": "tall"}},
+        ],
+    }
+
+
+def test_budgeted_prompt_shrinks_sections_in_rule_order(tmp_path) -> None:
+    book_root, template = _book(tmp_path, {"write": {"character_states": 300, "state": 0}})
+    values = _values()
+
+    prompt, report = _budgeted_prompt(book_root, "write", template, values, "SYSTEM", scene_card={"cast_present_ids": ["CHAR_a"]})
+
+    assert report["shrink"] == ["drop_history_tails", "summarize_off_cast_characters"]
+    assert report["budgets"]["character_states"] == 300
+    assert report["sections"]["character_states"] <= 300
+    assert not report["over_budget"]
+    assert '"off_cast_summary": true' in prompt
+    assert len(values["character_states"][0]["history"]) == 40
+    assert report["dynamic_payload_tokens"] * 4 >= len(prompt)
+
+
+def test_budgeted_prompt_trims_key_facts_when_payload_over_budget(tmp_path, monkeypatch) -> None:
+    book_root, template = _book(tmp_path, {"write": {"dynamic_payload": 50}})
+
+    _, report = _budgeted_prompt(book_root, "write", template, _values(), "SYSTEM")
+    assert report["shrink"][:2] == ["drop_history_tails", "trim_key_facts_ring"]
+    assert report["over_budget"]
+
+    monkeypatch.setenv("BOOKFORGE_PROMPT_BUDGET", "0")
+    _, report = _budgeted_prompt(book_root, "write", template, _values(), "SYSTEM")
+    assert report["shrink"] == [] and report["budgets"] == {}
+
+
+def test_budgeted_prompt_summarizes_off_scene_registry_entries(tmp_path) -> None:
+    book_root, template = _book(tmp_path, {"write": {"item_registry": 200}})
+    template.write_text("ITEMS={{item_registry}}\n", encoding="utf-8")
+    items = [
+        {"item_id": f"ITEM_{idx}", "name": f"Item {idx}", "custodian": "CHAR_z", "state_tags": [], "notes": "dusty " * 20}
+        for idx in range(20)
+    ]
+    items[0]["custodian"] = "CHAR_a"
+    items[1]["item_id"] = "ITEM_required"
+    values = {"item_registry": {"schema_version": "1.0", "items": items}}
+    scene_card = {"cast_present_ids": ["CHAR_a"], "required_in_custody": ["ITEM_required"]}
+
+    prompt, report = _budgeted_prompt(book_root, "write", template, values, "SYSTEM", scene_card=scene_card)
+
+    assert report["shrink"] == ["summarize_off_scene_registry_entries", "drop_off_scene_registry_entries"]
+    assert report["sections"]["item_registry"] <= 200
+    kept = json.loads(prompt[len("ITEMS="):])["items"]
+    assert [entry["item_id"] for entry in kept] == ["ITEM_0", "ITEM_required"]
+    assert all("notes" in entry for entry in kept)
+    assert len(items) == 20
+
+
+def test_budgeted_prompt_trims_lint_pre_and_post_sections_together(tmp_path) -> None:
+    book_root, template = _book(tmp_path, {"lint": {"post_summary": 100, "pre_summary": 0}})
+    template.write_text("PRE={{pre_summary}}\nPOST={{post_summary}}\n", encoding="utf-8")
+    facts = [f"fact {idx} " * 5 for idx in range(30)]
+    values = {"pre_summary": {"key_facts_ring": list(facts)}, "post_summary": {"key_facts_ring": facts + ["new fact"]}}
+
+    prompt, report = _budgeted_prompt(book_root, "lint", template, values, "SYSTEM")
+
+    assert "trim_key_facts_ring" in report["shrink"]
+    pre_text, post_text = prompt.split("\nPOST=")
+    pre = json.loads(pre_text[len("PRE="):])["key_facts_ring"]
+    post = json.loads(post_text)["key_facts_ring"]
+    assert pre == facts[-len(pre):]
+    assert post == pre + ["new fact"]
+
+
+def test_budgeted_prompt_keeps_pre_and_post_windows_aligned_when_a_fact_is_appended(tmp_path) -> None:
+    book_root, template = _book(tmp_path, {"lint": {"pre_state": 60, "post_state": 60}})
+    template.write_text("PRE={{pre_state}}\nPOST={{post_state}}\n", encoding="utf-8")
+    facts = [f"f{idx}" for idx in range(1, 21)]
+    values = {
+        "pre_state": {"summary": {"key_facts_ring": list(facts)}, "world": {"location": "Harbor"}},
+        "post_state": {"summary": {"key_facts_ring": facts + ["f21"]}, "world": {"location": "Tower"}},
+    }
+
+    prompt, report = _budgeted_prompt(book_root, "lint", template, values, "SYSTEM")
+
+    pre_text, post_text = prompt.split("\nPOST=")
+    pre = json.loads(pre_text[len("PRE="):])
+    post = json.loads(post_text)
+    pre_facts = pre["summary"]["key_facts_ring"]
+    assert "trim_story_summaries" in report["shrink"]
+    assert len(pre_facts) < len(facts)
+    assert post["summary"]["key_facts_ring"] == pre_facts + ["f21"]
+    assert post["world"]["location"] == "Tower"
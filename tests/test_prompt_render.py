@@ -1,5 +1,14 @@
-from bookforge.prompt.renderer import render_template
-from bookforge.prompt.serialization import dumps_json
+import os
+
+from bookforge.prompt.renderer import (
+    TemplateRenderReport,
+    load_compiled_template,
+    render_template,
+    render_template_file,
+    template_render_stats,
+    template_report,
+)
+from bookforge.prompt.serialization import dumps_json, serialization_stats
 
 
 def test_render_template_deterministic_order():
@@ -12,3 +21,44 @@ def test_render_template_serializes_objects():
     template = "DATA={{payload}}"
     rendered = render_template(template, {"payload": {"b": 2, "a": 1}})
     assert rendered.endswith(dumps_json({"a": 1, "b": 2}))
+
+
+def test_render_template_is_single_pass_and_keeps_unknown_placeholders():
+    template = "{{a}} {{b}} {{a}} {{missing}}"
+    rendered = render_template(template, {"a": "{{b}}", "b": [1]})
+    assert rendered == "{{b}} " + dumps_json([1]) + " {{b}} {{missing}}"
+
+
+def test_render_template_file_caches_compiled_template_and_reports_gaps(tmp_path):
+    path = tmp_path / "demo.md"
+    path.write_text("Hello {{name}} from {{place}}", encoding="utf-8")
+
+    assert render_template_file(path, {"name": "Ada", "extra": 1}) == "Hello Ada from {{place}}"
+    compiled = load_compiled_template(path)
+    assert load_compiled_template(path) is compiled
+    assert template_report(compiled, {"name": "Ada", "extra": 1}) == TemplateRenderReport(missing=("place",), unused=("extra",))
+
+    stats = template_render_stats()
+    assert stats["missing"]["demo.md"] == ["place"]
+    assert stats["unused"]["demo.md"] == ["extra"]
+
+    path.write_text("Bye {{name}}!", encoding="utf-8")
+    os.utime(path, ns=(path.stat().st_mtime_ns + 10**9,) * 2)
+    assert render_template_file(path, {"name": "Ada"}) == "Bye Ada!"
+
+
+def test_dumps_json_reuses_string_for_equal_content():
+    state = {"world": {"location": "Harbor"}, "cursor": [1, 2]}
+    before = serialization_stats()
+
+    first = dumps_json(state)
+    second = dumps_json({"cursor": [1, 2], "world": {"location": "Harbor"}})
+    assert second is first
+
+    state["world"]["location"] = "Tower"
+    changed = dumps_json(state)
+    assert '"Tower"' in changed and changed is not first
+
+    after = serialization_stats()
+    assert after["hits"] - before["hits"] >= 1
+    assert after["misses"] - before["misses"] >= 2
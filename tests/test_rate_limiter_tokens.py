@@ -0,0 +1,148 @@
+import json
+
+import pytest
+
+from bookforge.config.env import load_config
+from bookforge.llm import factory, rate_limiter
+from bookforge.llm.errors import LLMRequestError
+from bookforge.llm.rate_limiter import RateLimiter
+
+
+class _Clock:
+    def __init__(self) -> None:
+        self.now = 1000.0
+        self.sleeps = []
+
+    def monotonic(self) -> float:
+        return self.now
+
+    def sleep(self, seconds: float) -> None:
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    fake = _Clock()
+    monkeypatch.setattr(rate_limiter.time, "monotonic", fake.monotonic)
+    monkeypatch.setattr(rate_limiter.time, "sleep", fake.sleep)
+    return fake
+
+
+def test_token_budget_waits_for_window_and_reconciles_actual_usage(clock) -> None:
+    limiter = RateLimiter(0, tokens_per_minute=1000)
+
+    first = limiter.reserve(800)
+    limiter.reconcile(first, 300)
+    assert limiter.usage()["tokens_per_minute"] == 300
+
+    clock.now += 10
+    limiter.reserve(600)
+    assert clock.sleeps == []
+
+    clock.now += 10
+    limiter.reserve(500)
+    assert clock.sleeps == [pytest.approx(50.0)]
+    assert limiter.usage()["tokens_per_minute"] == 500
+
+
+def test_oversized_request_is_admitted_into_empty_window(clock) -> None:
+    limiter = RateLimiter(0, tokens_per_minute=1000)
+    limiter.reserve(5000)
+    assert clock.sleeps == []
+
+
+def test_daily_quota_raises_pausable_quota_error(clock) -> None:
+    limiter = RateLimiter(60, requests_per_day=2, label="gemini:writer")
+    limiter.reserve(10)
+    limiter.reserve(10)
+
+    with pytest.raises(LLMRequestError) as excinfo:
+        limiter.reserve(10)
+
+    error = excinfo.value
+    assert error.status_code == 429
+    assert error.quota_violations[0].quota_metric == "bookforge/requests_per_day"
+    assert error.quota_violations[0].quota_dimensions == {"scope": "gemini:writer"}
+    assert clock.sleeps == []
+
+
+def test_factory_applies_per_slot_limits_over_provider_defaults() -> None:
+    factory._RATE_LIMITERS.clear()
+    config = load_config(
+        env={
+            "LLM_PROVIDER": "openai",
+            "OPENAI_API_KEY": "x",
+            "WRITER_API_KEY": "w",
+            "OPENAI_TOKENS_PER_MINUTE": "20000",
+            "OPENAI_WRITER_TOKENS_PER_MINUTE": "90000",
+            "OPENAI_REQUESTS_PER_DAY": "500",
+        },
+        env_path=None,
+    )
+
+    writer = factory.get_llm_client(config, "writer").rate_limiter
+    linter = factory.get_llm_client(config, "linter").rate_limiter
+
+    assert writer.tokens_per_minute == 90000
+    assert linter.tokens_per_minute == 20000
+    assert writer.requests_per_day == linter.requests_per_day == 500
+    factory._RATE_LIMITERS.clear()
+
+
+def test_file_limiters_share_one_budget_across_instances(tmp_path, monkeypatch) -> None:
+    fake = _Clock()
+    monkeypatch.setattr(rate_limiter.time, "time", fake.monotonic)
+    monkeypatch.setattr(rate_limiter.time, "sleep", fake.sleep)
+    state_path = tmp_path / "gemini-writer.json"
+    first_process = rate_limiter.FileRateLimiter(2, tokens_per_minute=1000, state_path=state_path)
+    second_process = rate_limiter.FileRateLimiter(2, tokens_per_minute=1000, state_path=state_path)
+
+    reservation = first_process.reserve(900)
+    second_process.reconcile(reservation, 400)
+    second_process.reserve(500)
+    assert fake.sleeps == []
+    assert first_process.usage() == {"requests_per_minute": 2, "tokens_per_minute": 900}
+
+    fake.now += 5
+    first_process.reserve(10)
+    assert fake.sleeps == [pytest.approx(55.0)]
+
+
+def test_file_limiter_keeps_day_window_as_slots_and_skips_idle_writes(tmp_path, monkeypatch) -> None:
+    fake = _Clock()
+    monkeypatch.setattr(rate_limiter.time, "time", fake.monotonic)
+    state_path = tmp_path / "gemini-writer.json"
+    limiter = rate_limiter.FileRateLimiter(0, requests_per_day=500, tokens_per_day=100000, state_path=state_path)
+
+    reservations = []
+    for _ in range(120):
+        reservations.append(limiter.reserve(100))
+        fake.now += 1
+    limiter.reconcile(reservations[0], 40)
+
+    rows = json.loads(state_path.read_text(encoding="utf-8"))["windows"]["day"]
+    assert len(rows) == 3
+    assert sum(row[3] for row in rows) == 120
+    assert limiter.usage() == {"requests_per_day": 120, "tokens_per_day": 11940}
+
+    state_path.write_text(state_path.read_text(encoding="utf-8") + " ", encoding="utf-8")
+    limiter.usage()
+    assert state_path.read_text(encoding="utf-8").endswith(" ")
+
+
+def test_factory_uses_workspace_file_limiter_keyed_by_api_key(tmp_path) -> None:
+    factory._RATE_LIMITERS.clear()
+    config = load_config(
+        env={"LLM_PROVIDER": "gemini", "GEMINI_API_KEY": "k1", "GEMINI_REQUESTS_PER_MINUTE": "10"},
+        env_path=None,
+    )
+
+    limiter = factory.get_llm_client(config, "writer", workspace=tmp_path).rate_limiter
+
+    assert isinstance(limiter, rate_limiter.FileRateLimiter)
+    assert limiter.state_path.parent == (tmp_path / "cache" / "ratelimit").resolve()
+    assert limiter.state_path.name.startswith("gemini-default-")
+    limiter.wait()
+    assert limiter.state_path.exists()
+    factory._RATE_LIMITERS.clear()
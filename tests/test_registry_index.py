@@ -0,0 +1,42 @@
+from bookforge.memory.registry_index import ITEM_INDEX_FIELDS, RegistryIndex
+
+
+def _item(item_id, **fields):
+    entry = {"item_id": item_id}
+    entry.update(fields)
+    return entry
+
+
+def test_registry_index_tracks_secondary_fields_across_upserts() -> None:
+    index = RegistryIndex(
+        [
+            _item("ITEM_a", custodian="CHAR_x", linked_threads=["THREAD_1"]),
+            _item("ITEM_b", location_ref="Harbor"),
+        ],
+        "item_id",
+        ITEM_INDEX_FIELDS,
+    )
+
+    assert index.lookup("custodian", ["CHAR_x"]) == {"ITEM_a"}
+    assert index.lookup("linked_threads", {"THREAD_1", "THREAD_9"}) == {"ITEM_a"}
+
+    index.upsert(_item("ITEM_a", custodian="CHAR_y", location_ref="Harbor"))
+    index.upsert(_item("ITEM_c", carrier_ref="CHAR_x"))
+
+    assert index.lookup("custodian", ["CHAR_x"]) == set()
+    assert index.lookup("custodian", ["CHAR_y"]) == {"ITEM_a"}
+    assert index.lookup("linked_threads", ["THREAD_1"]) == set()
+    assert index.lookup("location_ref", ["Harbor"]) == {"ITEM_a", "ITEM_b"}
+    assert index.lookup_where("carrier_ref", lambda value: value.startswith("CHAR_")) == {"ITEM_c"}
+    assert [entry["item_id"] for entry in index.entries()] == ["ITEM_a", "ITEM_b", "ITEM_c"]
+
+
+def test_registry_index_keeps_unaddressable_entries_in_order() -> None:
+    first = _item("ITEM_a", custodian="CHAR_x")
+    duplicate = _item("ITEM_a", custodian="CHAR_z")
+    index = RegistryIndex([first, {"name": "no id"}, duplicate], "item_id", ITEM_INDEX_FIELDS)
+
+    assert index.get("ITEM_a") is first
+    assert index.lookup("custodian", ["CHAR_z"]) == set()
+    assert index.entries() == [first, {"name": "no id"}, duplicate]
+    assert index.ids() == ["ITEM_a"]
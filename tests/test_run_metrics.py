@@ -0,0 +1,126 @@
+import json
+
+from bookforge.llm.types import LLMResponse
+from bookforge.pipeline.metrics import (
+    _record_bytes_written,
+    _write_active_metrics,
+    attributed_to,
+    current_metrics,
+    start_run_metrics,
+    stop_run_metrics,
+)
+
+
+def test_run_metrics_buckets_by_scene_and_phase(tmp_path):
+    path = tmp_path / "run_x.metrics.json"
+    metrics = start_run_metrics("run_x", path)
+    assert current_metrics() is metrics
+
+    metrics.scene_start(1, 1)
+    metrics.phase("plan")
+    metrics.record_llm("plan", 0.5, LLMResponse(text="{}", raw={}, provider="openai", model="m", prompt_tokens=120, completion_tokens=30, cached_tokens=64))
+    metrics.record_llm("plan_json_retry1", 0.25, LLMResponse(text="{}", raw={}, provider="openai", model="m", prompt_tokens=100, completion_tokens=10))
+    metrics.phase("write")
+    metrics.record_llm("write", 1.0, error=True)
+    assert _record_bytes_written(42) == 42
+    metrics.scene_end()
+    assert not path.exists()
+
+    stopped = stop_run_metrics()
+    assert stopped is metrics
+    assert current_metrics() is None
+    data = json.loads(path.read_text(encoding="utf-8"))
+    assert data["run_id"] == "run_x"
+    scene = data["scenes"][0]
+    assert (scene["chapter"], scene["scene"]) == (1, 1)
+    plan = scene["phases"]["plan"]
+    assert plan["llm_calls"] == 2
+    assert plan["retries"] == 1
+    assert plan["prompt_tokens"] == 220
+    assert plan["cached_tokens"] == 64
+    write = scene["phases"]["write"]
+    assert write["errors"] == 1
+    assert write["bytes_written"] == 42
+    assert write["entries"] == 1
+
+    table = metrics.summary_table()
+    assert table.splitlines()[0].startswith("phase")
+    assert any(line.startswith("plan ") for line in table.splitlines())
+    assert table.splitlines()[-1].startswith("total")
+
+
+def test_run_metrics_calls_outside_scene_use_label_phase(tmp_path):
+    metrics = start_run_metrics("run_y", None)
+    metrics.record_llm("outline_generate_retry2", 0.1)
+    _record_bytes_written(10)
+    stop_run_metrics()
+    totals = metrics.phase_totals()
+    assert totals["outline_generate"]["llm_calls"] == 1
+    assert totals["outline_generate"]["retries"] == 1
+    assert totals["run"]["bytes_written"] == 10
+    assert _record_bytes_written(5) == 5
+
+
+def test_run_metrics_count_direct_client_calls(tmp_path):
+    from bookforge.llm.client import LLMClient
+
+    class _Client(LLMClient):
+        def chat(self, messages, model, temperature=0.7, max_tokens=1024):
+            messages = list(messages)
+            reservation = self._throttle(messages, max_tokens)
+            response = LLMResponse(text="{}", raw={}, provider="test", model=model, prompt_tokens=40, completion_tokens=8)
+            return self._settle(reservation, response, messages)
+
+    client = _Client(provider="test")
+    metrics = start_run_metrics("run_z", None)
+    try:
+        metrics.scene_start(1, 1)
+        metrics.phase("plan")
+        client.chat([{"role": "user", "content": "plan"}], model="m")
+        metrics.phase("characters")
+        client.chat([{"role": "user", "content": "cast"}], model="m")
+        client.chat([{"role": "user", "content": "cast"}], model="m")
+        metrics.scene_end()
+    finally:
+        stop_run_metrics()
+    client.chat([{"role": "user", "content": "after"}], model="m")
+
+    totals = metrics.phase_totals()
+    assert totals["plan"]["llm_calls"] == 1
+    assert totals["plan"]["prompt_tokens"] == 40
+    assert totals["characters"]["llm_calls"] == 2
+    assert totals["characters"]["completion_tokens"] == 16
+    assert sum(values["llm_calls"] for values in totals.values()) == 3
+
+
+def test_run_metrics_fold_in_counters_and_write_at_exit(tmp_path):
+    path = tmp_path / "run_c.metrics.json"
+    counts = {"hits": 0}
+    metrics = start_run_metrics("run_c", path, counters={"http_pool": lambda: dict(counts), "templates": lambda: {"missing": {"a.md": ["x"]}}})
+    try:
+        metrics.scene_start(1, 1)
+        counts["hits"] = 3
+        metrics.scene_end()
+        _write_active_metrics()
+        assert json.loads(path.read_text(encoding="utf-8"))["counters"]["http_pool"] == {"hits": 3}
+    finally:
+        stop_run_metrics()
+    table = metrics.summary_table().splitlines()
+    assert table[-2] == f"{'http_pool':<16}hits=3"
+    assert table[-1] == f"{'templates':<16}missing:a.md=x"
+
+
+def test_run_metrics_attribute_background_calls_to_their_own_phase(tmp_path):
+    metrics = start_run_metrics("run_s", None)
+    try:
+        metrics.scene_start(1, 1)
+        metrics.phase("write")
+        with attributed_to("plan"):
+            metrics.record_llm("llm", 0.2, LLMResponse(text="{}", raw={}, provider="openai", model="m", prompt_tokens=30))
+        metrics.record_llm("llm", 0.4, LLMResponse(text="x", raw={}, provider="openai", model="m", prompt_tokens=90))
+        metrics.scene_end()
+    finally:
+        stop_run_metrics()
+    totals = metrics.phase_totals()
+    assert totals["plan"]["prompt_tokens"] == 30
+    assert totals["write"]["prompt_tokens"] == 90
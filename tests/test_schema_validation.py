@@ -1,3 +1,5 @@
+import os
+
 import pytest
 
 from bookforge.util.schema import SchemaValidationError, validate_json
@@ -66,4 +68,26 @@ def test_plot_devices_schema_valid() -> None:
             }
         ],
     }
-    validate_json(data, "plot_devices")
\ No newline at end of file
+    validate_json(data, "plot_devices")
+
+def test_validators_are_cached_until_schema_changes(tmp_path, monkeypatch) -> None:
+    from bookforge.util import schema
+
+    schema_dir = tmp_path / "schemas"
+    schema_dir.mkdir()
+    path = schema_dir / "lint_report.schema.json"
+    path.write_text('{"type": "object", "required": ["status"]}', encoding="utf-8")
+    monkeypatch.setattr(schema, "_ROOT_DIR", tmp_path)
+    monkeypatch.setattr(schema, "_VALIDATORS", {})
+
+    first = schema._validator("lint_report")
+    assert schema._validator("lint_report") is first
+    assert schema.is_valid({"status": "pass"}, "lint_report")
+    assert not schema.is_valid({}, "lint_report")
+
+    path.write_text('{"type": "object", "required": ["status", "issues"]}', encoding="utf-8")
+    stat = path.stat()
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+    assert schema._validator("lint_report") is not first
+    with pytest.raises(SchemaValidationError, match="issues"):
+        validate_json({"status": "pass"}, "lint_report")
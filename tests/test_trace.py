@@ -0,0 +1,77 @@
+import json
+
+from bookforge.llm.rate_limiter import RateLimiter
+from bookforge.pipeline.metrics import start_run_metrics, stop_run_metrics
+from bookforge.pipeline.parse import _extract_json
+from bookforge.util.trace import _write_active_trace, current_trace, span, start_trace, stop_trace, traced
+
+
+def test_span_is_noop_without_trace():
+    assert current_trace() is None
+    with span("idle"):
+        pass
+
+    @traced("plain")
+    def plain(value):
+        return value + 1
+
+    assert plain(1) == 2
+
+
+def test_trace_exports_nested_chrome_events(tmp_path):
+    path = tmp_path / "run_x.trace.json"
+    start_trace(path)
+    metrics = start_run_metrics("run_x", None)
+    try:
+        metrics.scene_start(1, 2)
+        metrics.phase("write")
+        with span("llm:write_scene", "llm", attempt=0):
+            assert _extract_json('{"a": 1}') == {"a": 1}
+        metrics.scene_end()
+    finally:
+        stop_run_metrics()
+        assert stop_trace() == path
+
+    data = json.loads(path.read_text(encoding="utf-8"))
+    events = {event["name"]: event for event in data["traceEvents"]}
+    assert {"ch001 sc002", "write", "llm:write_scene", "parse_json"} <= set(events)
+    assert all(event["ph"] == "X" for event in events.values())
+    assert events["llm:write_scene"]["args"] == {"attempt": 0}
+
+    def contains(outer, inner):
+        return outer["ts"] <= inner["ts"] and round(inner["ts"] + inner["dur"], 3) <= round(outer["ts"] + outer["dur"], 3)
+
+    assert contains(events["ch001 sc002"], events["write"])
+    assert contains(events["write"], events["llm:write_scene"])
+    assert contains(events["llm:write_scene"], events["parse_json"])
+
+
+def test_trace_records_rate_limiter_wait(tmp_path, monkeypatch):
+    limiter = RateLimiter(requests_per_minute=1)
+    results = [(None, 0.01), (object(), 0.0)]
+    monkeypatch.setattr(limiter, "_try_reserve", lambda tokens: results.pop(0))
+    start_trace(tmp_path / "trace.json")
+    try:
+        limiter.reserve(5)
+    finally:
+        stop_trace()
+    data = json.loads((tmp_path / "trace.json").read_text(encoding="utf-8"))
+    waits_recorded = [event for event in data["traceEvents"] if event["name"] == "rate_limit_wait"]
+    assert len(waits_recorded) == 1
+    assert waits_recorded[0]["cat"] == "wait"
+    assert waits_recorded[0]["args"]["tokens"] == 5
+
+
+def test_active_trace_is_written_at_exit_without_stop(tmp_path):
+    path = tmp_path / "paused.trace.json"
+    start_trace(path)
+    try:
+        with span("ch001 sc001", "scene"):
+            pass
+        assert not path.exists()
+        _write_active_trace()
+    finally:
+        stop_trace()
+    _write_active_trace()
+    data = json.loads(path.read_text(encoding="utf-8"))
+    assert [event["name"] for event in data["traceEvents"]] == ["ch001 sc001"]